@@ -4,9 +4,59 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
 
 from app.db import Base
 from app.models import *
+from app.busca import eh_indice_de_busca, restaurar_triggers_de_busca
 
 # Configuração original do Alembic
 from alembic import context
 from sqlalchemy import engine_from_config, pool
 config = context.config
-target_metadata = Base.metadata
\ No newline at end of file
+target_metadata = Base.metadata
+
+# Usa a mesma URL do app (.env) em vez da fixa no alembic.ini
+from app.config import DATABASE_URL
+config.set_main_option("sqlalchemy.url", DATABASE_URL)
+
+
+def include_object(objeto, nome, tipo, refletido, comparado_com):
+    """Deixa de fora do autogenerate/check os índices de busca criados por SQL (FTS5, pg_trgm)."""
+    return not (tipo in ("table", "index") and eh_indice_de_busca(nome))
+
+
+def run_migrations_offline() -> None:
+    """Gera o SQL das migrações sem conectar no banco."""
+    context.configure(
+        url=config.get_main_option("sqlalchemy.url"),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=True,
+        include_object=include_object,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """Aplica as migrações conectando no banco configurado."""
+    connectable = engine_from_config(
+        config.get_section(config.config_ini_section, {}),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+    with connectable.connect() as connection:
+        # render_as_batch permite ALTER TABLE no SQLite
+        context.configure(
+            connection=connection, target_metadata=target_metadata,
+            render_as_batch=True, include_object=include_object,
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+            # Migrações em batch recriam a tabela no SQLite e perdem os triggers das
+            # tabelas FTS5 de busca: recria os que faltarem
+            restaurar_triggers_de_busca(connection)
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
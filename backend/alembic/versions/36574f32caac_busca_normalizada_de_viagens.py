@@ -0,0 +1,83 @@
+"""busca normalizada de viagens
+
+Revision ID: 36574f32caac
+Revises: 60be5586cc1e, xxxx_unificar_motoristas_passageiros
+Create Date: 2026-10-18 09:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '36574f32caac'
+# Também junta as duas revisões iniciais, que estavam como heads separadas
+down_revision: Union[str, Sequence[str], None] = ('60be5586cc1e', 'xxxx_unificar_motoristas_passageiros')
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Acentos removidos pelo backfill. Cópia congelada da regra de app.utils.normalizar_texto
+# restrita ao português (a migração não importa código do app, que pode mudar depois);
+# maiúsculas acentuadas entram na lista porque o lower() do SQLite só trata ASCII.
+_ACENTOS = {
+    "a": "áàâãäÁÀÂÃÄ",
+    "e": "éèêëÉÈÊË",
+    "i": "íìîïÍÌÎÏ",
+    "o": "óòôõöÓÒÔÕÖ",
+    "u": "úùûüÚÙÛÜ",
+    "c": "çÇ",
+    "n": "ñÑ",
+}
+
+
+def _substituir(expr, trocas: list):
+    for de, para in trocas:
+        expr = sa.func.replace(expr, de, para)
+    return expr
+
+
+def _preencher(tabela: str, colunas: dict) -> None:
+    """
+    Preenche as colunas normalizadas das linhas já existentes com UPDATEs em
+    conjunto: minúsculas, um UPDATE por grupo de acentos (aninhar todos os
+    replace() num só estoura a pilha do parser do SQLite) e espaços simples.
+    """
+    t = sa.table(tabela, *[sa.column(c) for c in colunas], *[sa.column(c) for c in colunas.values()])
+    op.execute(t.update().values({norm: sa.func.lower(sa.func.trim(t.c[orig])) for orig, norm in colunas.items()}))
+
+    etapas = [[(letra, sem_acento) for letra in letras] for sem_acento, letras in _ACENTOS.items()]
+    etapas.append([("  ", " ")] * 4)  # junta até 16 espaços seguidos
+    for trocas in etapas:
+        op.execute(t.update().values({norm: _substituir(t.c[norm], trocas) for norm in colunas.values()}))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("viagens") as batch:
+        batch.add_column(sa.Column("origem_norm", sa.String(), nullable=True))
+        batch.add_column(sa.Column("destino_norm", sa.String(), nullable=True))
+        batch.create_index("ix_viagens_origem_norm", ["origem_norm"])
+        batch.create_index("ix_viagens_destino_norm", ["destino_norm"])
+
+    with op.batch_alter_table("usuarios") as batch:
+        batch.add_column(sa.Column("nome_norm", sa.String(), nullable=True))
+        batch.create_index("ix_usuarios_nome_norm", ["nome_norm"])
+
+    _preencher("viagens", {"origem": "origem_norm", "destino": "destino_norm"})
+    _preencher("usuarios", {"nome": "nome_norm"})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("usuarios") as batch:
+        batch.drop_index("ix_usuarios_nome_norm")
+        batch.drop_column("nome_norm")
+
+    with op.batch_alter_table("viagens") as batch:
+        batch.drop_index("ix_viagens_destino_norm")
+        batch.drop_index("ix_viagens_origem_norm")
+        batch.drop_column("destino_norm")
+        batch.drop_column("origem_norm")
@@ -0,0 +1,63 @@
+"""reserva confirmada única por passageiro e viagem
+
+ATENÇÃO: altera dados de usuários. Reservas confirmadas repetidas (mesmo passageiro
+na mesma viagem) são canceladas, mantendo só a mais antiga, e as vagas delas voltam
+para a viagem; sem isso o índice único não pode ser criado. O downgrade remove o
+índice, mas não reativa as reservas canceladas.
+
+Revision ID: 9b1f3c2d7e45
+Revises: 36574f32caac
+Create Date: 2026-10-18 10:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b1f3c2d7e45'
+down_revision: Union[str, Sequence[str], None] = '36574f32caac'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Ids das reservas confirmadas repetidas (mesmo passageiro e viagem), exceto a mais antiga.
+# A tabela derivada ("duplicadas") permite usar a consulta no UPDATE da própria reservas no MySQL.
+DUPLICADAS = """
+    SELECT id FROM (
+        SELECT id FROM reservas WHERE status = 'confirmada' AND id NOT IN (
+            SELECT MIN(id) FROM reservas WHERE status = 'confirmada' GROUP BY viagem_id, passageiro_id
+        )
+    ) AS duplicadas
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Cancela duplicadas já existentes (devolvendo as vagas) para o índice único poder ser criado
+    op.execute(f"""
+        UPDATE viagens SET vagas_disponiveis = vagas_disponiveis + (
+            SELECT COUNT(*) FROM reservas WHERE reservas.viagem_id = viagens.id AND reservas.id IN ({DUPLICADAS})
+        )
+    """)
+    # Como no cancelamento pelo passageiro, horario_confirmacao passa a ser o momento do cancelamento
+    op.execute(f"""
+        UPDATE reservas SET status = 'cancelada', horario_confirmacao = CURRENT_TIMESTAMP
+        WHERE id IN ({DUPLICADAS})
+    """)
+
+    op.create_index(
+        "uq_reservas_viagem_passageiro_confirmada",
+        "reservas",
+        ["viagem_id", "passageiro_id"],
+        unique=True,
+        sqlite_where=sa.text("status = 'confirmada'"),
+        postgresql_where=sa.text("status = 'confirmada'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("uq_reservas_viagem_passageiro_confirmada", table_name="reservas")
@@ -0,0 +1,71 @@
+"""índices de trigramas para a busca por trecho
+
+Revision ID: a6d2f9c4e871
+Revises: f3a8c2e6b1d4
+Create Date: 2026-10-18 15:00:00.000000
+
+SQLite: tabelas FTS5 (tokenizer trigram) "external content" de viagens e usuarios,
+mantidas por triggers. Uma migração em modo batch nessas tabelas recria a tabela no
+SQLite e apaga os triggers; o alembic/env.py os recria (restaurar_triggers_de_busca)
+ao fim de cada `upgrade`/`downgrade`.
+Postgres: índices GIN com pg_trgm. MySQL: sem índice (a busca por trecho faz varredura).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d2f9c4e871'
+down_revision: Union[str, Sequence[str], None] = 'f3a8c2e6b1d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# tabela -> (tabela FTS, colunas normalizadas)
+TABELAS = {
+    "viagens": ("viagens_busca", ["origem_norm", "destino_norm"]),
+    "usuarios": ("usuarios_busca", ["nome_norm"]),
+}
+
+
+def _upgrade_sqlite(tabela: str, fts: str, colunas: list) -> None:
+    lista = ", ".join(colunas)
+    novos = ", ".join(f"new.{c}" for c in colunas)
+    antigos = ", ".join(f"old.{c}" for c in colunas)
+    inserir = f"INSERT INTO {fts}(rowid, {lista}) VALUES (new.id, {novos});"
+    remover = f"INSERT INTO {fts}({fts}, rowid, {lista}) VALUES ('delete', old.id, {antigos});"
+
+    op.execute(f"CREATE VIRTUAL TABLE {fts} USING fts5({lista}, content='{tabela}', content_rowid='id', tokenize='trigram')")
+    op.execute(f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {tabela} BEGIN {inserir} END")
+    op.execute(f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {tabela} BEGIN {remover} END")
+    op.execute(f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {lista} ON {tabela} BEGIN {remover} {inserir} END")
+    # Indexa as linhas existentes a partir da tabela de conteúdo
+    op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialeto = op.get_bind().dialect.name
+    if dialeto == "sqlite":
+        for tabela, (fts, colunas) in TABELAS.items():
+            _upgrade_sqlite(tabela, fts, colunas)
+    elif dialeto == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for tabela, (_, colunas) in TABELAS.items():
+            for c in colunas:
+                op.execute(f"CREATE INDEX IF NOT EXISTS ix_{tabela}_{c}_trgm ON {tabela} USING gin ({c} gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialeto = op.get_bind().dialect.name
+    if dialeto == "sqlite":
+        for tabela, (fts, _) in TABELAS.items():
+            for sufixo in ("ai", "ad", "au"):
+                op.execute(f"DROP TRIGGER IF EXISTS {fts}_{sufixo}")
+            op.execute(f"DROP TABLE IF EXISTS {fts}")
+    elif dialeto == "postgresql":
+        for tabela, (_, colunas) in TABELAS.items():
+            for c in colunas:
+                op.execute(f"DROP INDEX IF EXISTS ix_{tabela}_{c}_trgm")
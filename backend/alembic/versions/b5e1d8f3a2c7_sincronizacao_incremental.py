@@ -0,0 +1,57 @@
+"""sincronização incremental: atualizado_em e exclusões
+
+Revision ID: b5e1d8f3a2c7
+Revises: 7a3c9e1b5d20
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e1d8f3a2c7'
+down_revision: Union[str, Sequence[str], None] = '7a3c9e1b5d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for tabela in ("viagens", "reservas", "tickets_suporte"):
+        with op.batch_alter_table(tabela) as batch:
+            batch.add_column(sa.Column("atualizado_em", sa.DateTime(), nullable=True))
+        # Linhas existentes entram na primeira sincronização de todo cliente
+        op.execute(f"UPDATE {tabela} SET atualizado_em = CURRENT_TIMESTAMP")
+
+    op.create_index("ix_viagens_atualizado_id", "viagens", ["atualizado_em", "id"], unique=False)
+    op.create_index("ix_reservas_passageiro_atualizado", "reservas", ["passageiro_id", "atualizado_em", "id"], unique=False)
+    op.create_index("ix_tickets_suporte_usuario_atualizado", "tickets_suporte", ["usuario_id", "atualizado_em", "id"], unique=False)
+
+    op.create_table(
+        'exclusoes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('tabela', sa.String(), nullable=False),
+        sa.Column('registro_id', sa.Integer(), nullable=False),
+        sa.Column('usuario_id', sa.Integer(), nullable=True),
+        sa.Column('excluido_em', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_exclusoes_id'), 'exclusoes', ['id'], unique=False)
+    op.create_index('ix_exclusoes_excluido_id', 'exclusoes', ['excluido_em', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_exclusoes_excluido_id', table_name='exclusoes')
+    op.drop_index(op.f('ix_exclusoes_id'), table_name='exclusoes')
+    op.drop_table('exclusoes')
+
+    op.drop_index("ix_tickets_suporte_usuario_atualizado", table_name="tickets_suporte")
+    op.drop_index("ix_reservas_passageiro_atualizado", table_name="reservas")
+    op.drop_index("ix_viagens_atualizado_id", table_name="viagens")
+    for tabela in ("viagens", "reservas", "tickets_suporte"):
+        with op.batch_alter_table(tabela) as batch:
+            batch.drop_column("atualizado_em")
@@ -0,0 +1,49 @@
+"""índices por padrão de consulta
+
+Revision ID: c4e8a1f05b92
+Revises: 9b1f3c2d7e45
+Create Date: 2026-10-18 11:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8a1f05b92'
+down_revision: Union[str, Sequence[str], None] = '9b1f3c2d7e45'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (nome, tabela, colunas) — espelha os Index/index=True de app/models.py
+INDICES = [
+    ("ix_usuarios_tipo_id", "usuarios", ["tipo", "id"]),
+    ("ix_viagens_origem_destino_horario", "viagens", ["origem_norm", "destino_norm", "horario_partida"]),
+    ("ix_viagens_motorista_horario", "viagens", ["motorista_id", "horario_partida"]),
+    ("ix_viagens_horario_partida", "viagens", ["horario_partida"]),
+    ("ix_reservas_passageiro_viagem", "reservas", ["passageiro_id", "viagem_id"]),
+    ("ix_reservas_viagem_status", "reservas", ["viagem_id", "status"]),
+    ("ix_tickets_suporte_usuario_criado", "tickets_suporte", ["usuario_id", "criado_em"]),
+    ("ix_avaliacoes_motoristas_motorista_id", "avaliacoes_motoristas", ["motorista_id"]),
+    ("ix_avaliacoes_motoristas_passageiro_id", "avaliacoes_motoristas", ["passageiro_id"]),
+    ("ix_avaliacoes_passageiros_passageiro_id", "avaliacoes_passageiros", ["passageiro_id"]),
+    ("ix_avaliacoes_passageiros_motorista_id", "avaliacoes_passageiros", ["motorista_id"]),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Coberto pelo índice composto (origem_norm, destino_norm, horario_partida)
+    op.drop_index("ix_viagens_origem_norm", table_name="viagens")
+    for nome, tabela, colunas in INDICES:
+        op.create_index(nome, tabela, colunas)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for nome, tabela, _ in reversed(INDICES):
+        op.drop_index(nome, table_name=tabela)
+    op.create_index("ix_viagens_origem_norm", "viagens", ["origem_norm"])
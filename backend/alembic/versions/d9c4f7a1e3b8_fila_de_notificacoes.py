@@ -0,0 +1,45 @@
+"""fila de notificações (outbox)
+
+Revision ID: d9c4f7a1e3b8
+Revises: b5e1d8f3a2c7
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9c4f7a1e3b8'
+down_revision: Union[str, Sequence[str], None] = 'b5e1d8f3a2c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'notificacoes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('usuario_id', sa.Integer(), nullable=False),
+        sa.Column('tipo', sa.String(), nullable=False),
+        sa.Column('viagem_id', sa.Integer(), nullable=True),
+        sa.Column('reserva_id', sa.Integer(), nullable=True),
+        sa.Column('criada_em', sa.DateTime(), nullable=False),
+        sa.Column('enviada_em', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+        sa.ForeignKeyConstraint(['viagem_id'], ['viagens.id'], ),
+        sa.ForeignKeyConstraint(['reserva_id'], ['reservas.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_notificacoes_id'), 'notificacoes', ['id'], unique=False)
+    op.create_index('ix_notificacoes_enviada_id', 'notificacoes', ['enviada_em', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_notificacoes_enviada_id', table_name='notificacoes')
+    op.drop_index(op.f('ix_notificacoes_id'), table_name='notificacoes')
+    op.drop_table('notificacoes')
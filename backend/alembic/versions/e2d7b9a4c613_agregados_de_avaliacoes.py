@@ -0,0 +1,47 @@
+"""agregados de avaliações em usuarios
+
+Revision ID: e2d7b9a4c613
+Revises: c4e8a1f05b92
+Create Date: 2026-10-18 12:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2d7b9a4c613'
+down_revision: Union[str, Sequence[str], None] = 'c4e8a1f05b92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("usuarios") as batch:
+        batch.add_column(sa.Column("avaliacoes_quantidade", sa.Integer(), nullable=False, server_default="0"))
+        batch.add_column(sa.Column("avaliacoes_soma", sa.Float(), nullable=False, server_default="0"))
+        batch.add_column(sa.Column("avaliacao_media", sa.Float(), nullable=True))
+
+    # Backfill (mesma lógica de app.avaliacoes.recalcular_agregados)
+    for tipo, tabela, coluna in [
+        ("motorista", "avaliacoes_motoristas", "motorista_id"),
+        ("passageiro", "avaliacoes_passageiros", "passageiro_id"),
+    ]:
+        op.execute(f"""
+            UPDATE usuarios SET
+                avaliacoes_quantidade = (SELECT COUNT(*) FROM {tabela} a WHERE a.{coluna} = usuarios.id),
+                avaliacoes_soma = (SELECT COALESCE(SUM(a.nota), 0) FROM {tabela} a WHERE a.{coluna} = usuarios.id),
+                avaliacao_media = (SELECT AVG(a.nota) FROM {tabela} a WHERE a.{coluna} = usuarios.id)
+            WHERE tipo = '{tipo}'
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("usuarios") as batch:
+        batch.drop_column("avaliacao_media")
+        batch.drop_column("avaliacoes_soma")
+        batch.drop_column("avaliacoes_quantidade")
@@ -0,0 +1,35 @@
+"""média de avaliações calculada na leitura
+
+Revision ID: f3a8c2e6b1d4
+Revises: d9c4f7a1e3b8
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a8c2e6b1d4'
+down_revision: Union[str, Sequence[str], None] = 'd9c4f7a1e3b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A média passa a ser avaliacoes_soma / avaliacoes_quantidade (ver models.Usuario)
+    with op.batch_alter_table("usuarios") as batch:
+        batch.drop_column("avaliacao_media")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("usuarios") as batch:
+        batch.add_column(sa.Column("avaliacao_media", sa.Float(), nullable=True))
+    op.execute("""
+        UPDATE usuarios SET avaliacao_media = avaliacoes_soma / avaliacoes_quantidade
+        WHERE avaliacoes_quantidade > 0
+    """)
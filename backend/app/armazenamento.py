@@ -0,0 +1,158 @@
+import hashlib
+import os
+import re
+import tempfile
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+from .config import ARMAZENAMENTO_BACKEND, UPLOAD_DIR, UPLOAD_TAMANHO_MAXIMO_MB
+
+# Lê/escreve o upload em pedaços de 1 MB (memória constante, qualquer tamanho)
+TAMANHO_PEDACO = 1024 * 1024
+TAMANHO_MAXIMO = UPLOAD_TAMANHO_MAXIMO_MB * 1024 * 1024
+
+
+def _erro_tamanho():
+    return HTTPException(
+        status_code=413,
+        detail=f"Arquivo maior que o limite de {UPLOAD_TAMANHO_MAXIMO_MB} MB"
+    )
+
+
+def _extensao(nome_arquivo: str) -> str:
+    """Extensão do nome enviado pelo cliente, só letras/números (ex.: ".pdf")."""
+    extensao = os.path.splitext(nome_arquivo or "")[1].lower()
+    return extensao if re.fullmatch(r"\.[a-z0-9]{1,8}", extensao) else ""
+
+
+# --------------------------------
+# Backends
+# --------------------------------
+class ArmazenamentoLocal:
+    """
+    Guarda os arquivos em disco, endereçados pelo conteúdo:
+    `<raiz>/<pasta>/ab/cd/<sha256>.<ext>`. O nome enviado pelo cliente não é usado
+    no caminho, então dois arquivos nunca se sobrescrevem, e o mesmo arquivo
+    enviado duas vezes ocupa espaço uma vez só.
+    """
+
+    def __init__(self, raiz: str):
+        self.raiz = raiz
+
+    def salvar(self, arquivo, pasta: str, extensao: str) -> str:
+        destino_tmp = os.path.join(self.raiz, "tmp")
+        os.makedirs(destino_tmp, exist_ok=True)
+
+        sha256 = hashlib.sha256()
+        tamanho = 0
+        fd, caminho_tmp = tempfile.mkstemp(dir=destino_tmp)
+        try:
+            # Calcula o hash enquanto escreve: uma única passada pelo arquivo
+            with os.fdopen(fd, "wb") as saida:
+                while pedaco := arquivo.read(TAMANHO_PEDACO):
+                    tamanho += len(pedaco)
+                    if tamanho > TAMANHO_MAXIMO:
+                        raise _erro_tamanho()
+                    sha256.update(pedaco)
+                    saida.write(pedaco)
+
+            digest = sha256.hexdigest()
+            caminho = os.path.join(self.raiz, pasta, digest[:2], digest[2:4], digest + extensao)
+            if os.path.exists(caminho):
+                os.remove(caminho_tmp)  # conteúdo já armazenado
+            else:
+                os.makedirs(os.path.dirname(caminho), exist_ok=True)
+                os.replace(caminho_tmp, caminho)  # atômico: nunca expõe arquivo pela metade
+            return caminho
+        except BaseException:
+            if os.path.exists(caminho_tmp):
+                os.remove(caminho_tmp)
+            raise
+
+
+_BACKENDS = {
+    "local": lambda: ArmazenamentoLocal(UPLOAD_DIR),
+}
+
+if ARMAZENAMENTO_BACKEND not in _BACKENDS:
+    raise ValueError(f"ARMAZENAMENTO_BACKEND desconhecido: {ARMAZENAMENTO_BACKEND}")
+
+armazenamento = _BACKENDS[ARMAZENAMENTO_BACKEND]()
+
+
+# --------------------------------
+# Limite antes de ler o corpo
+# --------------------------------
+# Folga para os outros campos do formulário e os cabeçalhos do multipart
+_FOLGA_FORMULARIO = 64 * 1024
+
+
+class LimiteDeUpload:
+    """
+    Middleware ASGI que recusa com 413 requisições multipart maiores que o limite
+    de upload antes de o formulário ser lido: pelo Content-Length, sem ler nada
+    do corpo, ou, se ele não vier (chunked), assim que os bytes recebidos passam
+    do limite.
+    """
+
+    def __init__(self, app, limite: int = TAMANHO_MAXIMO + _FOLGA_FORMULARIO):
+        self.app = app
+        self.limite = limite
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._multipart(scope):
+            return await self.app(scope, receive, send)
+
+        tamanho = self._content_length(scope)
+        if tamanho is not None and tamanho > self.limite:
+            return await JSONResponse({"detail": _erro_tamanho().detail}, status_code=413)(scope, receive, send)
+
+        recebido = 0
+
+        async def receber():
+            nonlocal recebido
+            mensagem = await receive()
+            if mensagem["type"] == "http.request":
+                recebido += len(mensagem.get("body", b""))
+                if recebido > self.limite:
+                    raise _erro_tamanho()  # interrompe a leitura do formulário
+            return mensagem
+
+        await self.app(scope, receber, send)
+
+    @staticmethod
+    def _multipart(scope) -> bool:
+        for nome, valor in scope["headers"]:
+            if nome == b"content-type":
+                return valor.lower().startswith(b"multipart/")
+        return False
+
+    @staticmethod
+    def _content_length(scope):
+        for nome, valor in scope["headers"]:
+            if nome == b"content-length":
+                return int(valor) if valor.isdigit() else None
+        return None
+
+
+# --------------------------------
+# Uso nas rotas
+# --------------------------------
+def salvar_upload(upload: UploadFile, pasta: str) -> str:
+    """
+    Salva um UploadFile no backend configurado e devolve o caminho/URL gravado.
+
+    Chamar a partir de rotas `def` (síncronas): a cópia roda no threadpool, fora
+    do event loop. Requisições grandes demais já são barradas por LimiteDeUpload
+    antes do formulário ser lido; aqui o limite vale para o arquivo em si.
+
+    Limitação aceita: o Starlette lê o formulário inteiro antes da rota e guarda o
+    arquivo num SpooledTemporaryFile (memória até 1 MB, depois disco), então o
+    upload é escrito duas vezes: no spool e, já com o hash, no destino. Ler
+    `request.stream()` direto evitaria a primeira cópia, mas exigiria um parser
+    multipart próprio no lugar dos parâmetros Form/File do registro (validação e
+    /docs). O custo está medido em benchmarks/uploads.py.
+    """
+    if upload.size is not None and upload.size > TAMANHO_MAXIMO:
+        raise _erro_tamanho()
+    upload.file.seek(0)
+    return armazenamento.salvar(upload.file, pasta, _extensao(upload.filename))
@@ -0,0 +1,68 @@
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from . import models
+
+# Nota "bayesiana": puxa a média de quem tem poucas avaliações para uma média
+# global, para 1 avaliação 5.0 não valer mais que 200 avaliações 4.8
+NOTA_PRIORI = 4.0
+PESO_PRIORI = 5
+
+
+def registrar_nota(db: Session, usuario_id: int, nota: float) -> None:
+    """
+    Atualiza contagem e soma do usuário avaliado com um único UPDATE atômico.
+    Deve ser chamada na mesma transação do insert da avaliação.
+
+    A média não é gravada: `Usuario.avaliacao_media` é calculada na leitura a
+    partir de soma/quantidade. Gravá-la no mesmo SET dependeria da ordem de
+    avaliação das atribuições, e o MySQL usa os valores já atualizados.
+    """
+    u = models.Usuario
+    db.query(u).filter(u.id == usuario_id).update(
+        {
+            u.avaliacoes_quantidade: u.avaliacoes_quantidade + 1,
+            u.avaliacoes_soma: u.avaliacoes_soma + nota,
+        },
+        synchronize_session=False,
+    )
+
+
+def nota_bayesiana(quantidade: int, soma: float) -> float:
+    return round((NOTA_PRIORI * PESO_PRIORI + (soma or 0)) / (PESO_PRIORI + (quantidade or 0)), 2)
+
+
+def resumo(usuario: models.Usuario) -> dict:
+    """Resumo das avaliações a partir das colunas já carregadas (sem consulta extra)."""
+    return {
+        "media": round(usuario.avaliacao_media, 2) if usuario.avaliacao_media is not None else None,
+        "quantidade": usuario.avaliacoes_quantidade or 0,
+        "nota_bayesiana": nota_bayesiana(usuario.avaliacoes_quantidade, usuario.avaliacoes_soma),
+    }
+
+
+def recalcular_agregados(db: Session) -> None:
+    """Recalcula os agregados de todos os usuários a partir das tabelas de avaliações."""
+    u = models.Usuario
+    for tipo, avaliacao, coluna in [
+        ("motorista", models.AvaliacaoMotorista, models.AvaliacaoMotorista.motorista_id),
+        ("passageiro", models.AvaliacaoPassageiro, models.AvaliacaoPassageiro.passageiro_id),
+    ]:
+        quantidade = select(func.count(avaliacao.id)).where(coluna == u.id).scalar_subquery()
+        soma = select(func.coalesce(func.sum(avaliacao.nota), 0)).where(coluna == u.id).scalar_subquery()
+        db.query(u).filter(u.tipo == tipo).update(
+            {u.avaliacoes_quantidade: quantidade, u.avaliacoes_soma: soma},
+            synchronize_session=False,
+        )
+    db.commit()
+
+
+if __name__ == "__main__":
+    # Backfill: python -m app.avaliacoes
+    from .db import SessionLocal
+
+    db = SessionLocal()
+    try:
+        recalcular_agregados(db)
+        print("Agregados de avaliações recalculados.")
+    finally:
+        db.close()
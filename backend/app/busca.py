@@ -0,0 +1,182 @@
+import threading
+from sqlalchemy import column, literal_column, select, table, text
+from .cache import CacheTTL
+from .config import CACHE_BUSCA_TTL_SEGUNDOS, CACHE_BUSCA_TAMANHO
+from .db import engine
+from .utils import normalizar_texto
+
+# Caractere "máximo": "termo" <= valor <= "termo\uffff" equivale a "começa com termo"
+_FIM_PREFIXO = "\uffff"
+
+
+def filtro_prefixo(coluna, termo: str):
+    """
+    Filtro "começa com" escrito como intervalo (BETWEEN), para usar o índice B-tree
+    da coluna normalizada em qualquer banco (LIKE 'x%' nem sempre usa índice no SQLite).
+    """
+    return coluna.between(termo, termo + _FIM_PREFIXO)
+
+
+def filtro_contem(coluna, termo: str):
+    """Filtro "contém" (LIKE '%x%'). No Postgres usa o índice GIN de trigramas; nos demais bancos, varredura."""
+    return coluna.contains(termo, autoescape=True)
+
+
+# --------------------------------
+# Índices de trigramas (busca por trecho)
+# --------------------------------
+# Termos com menos letras que isso não formam trigramas: buscam só pelo início
+TAMANHO_MINIMO_TRECHO = 3
+
+# Tabela FTS5 (tokenizer trigram) de cada tabela com colunas normalizadas, no SQLite.
+# São tabelas "external content": guardam só o índice e são mantidas por triggers.
+_TABELAS_FTS = {
+    "viagens": ("viagens_busca", ["origem_norm", "destino_norm"]),
+    "usuarios": ("usuarios_busca", ["nome_norm"]),
+}
+
+
+def _triggers_sqlite(tabela: str) -> list:
+    fts, colunas = _TABELAS_FTS[tabela]
+    lista = ", ".join(colunas)
+    novos = ", ".join(f"new.{c}" for c in colunas)
+    antigos = ", ".join(f"old.{c}" for c in colunas)
+    inserir = f"INSERT INTO {fts}(rowid, {lista}) VALUES (new.id, {novos});"
+    remover = f"INSERT INTO {fts}({fts}, rowid, {lista}) VALUES ('delete', old.id, {antigos});"
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {tabela} BEGIN {inserir} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {tabela} BEGIN {remover} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {lista} ON {tabela} BEGIN {remover} {inserir} END",
+    ]
+
+
+def _existe_sqlite(conexao, tipo: str, nome: str) -> bool:
+    return conexao.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = :tipo AND name = :nome"), {"tipo": tipo, "nome": nome}
+    ).first() is not None
+
+
+def restaurar_triggers_de_busca(conexao) -> None:
+    """
+    SQLite: recria os triggers das tabelas FTS5 que existem mas perderam algum
+    trigger e reindexa a tabela. Uma migração em modo batch (render_as_batch)
+    recria `viagens`/`usuarios` copiando a tabela, e o DROP da tabela antiga leva
+    os triggers junto; o alembic/env.py chama esta função depois das migrações.
+    """
+    if conexao.dialect.name != "sqlite":
+        return
+    for tabela, (fts, _) in _TABELAS_FTS.items():
+        if not _existe_sqlite(conexao, "table", fts):
+            continue
+        if all(_existe_sqlite(conexao, "trigger", f"{fts}_{sufixo}") for sufixo in ("ai", "ad", "au")):
+            continue
+        for comando in _triggers_sqlite(tabela):
+            conexao.execute(text(comando))
+        # Linhas alteradas enquanto os triggers não existiam: reindexa a partir da tabela
+        conexao.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+
+
+def eh_indice_de_busca(nome: str) -> bool:
+    """
+    Tabelas FTS5 (e as tabelas internas delas, `<fts>_data`, `<fts>_idx`...) e
+    índices pg_trgm: ficam fora do Base.metadata, então o autogenerate do Alembic
+    precisa ignorá-los para não propor removê-los.
+    """
+    if nome.endswith("_trgm"):
+        return True
+    return any(nome == fts or nome.startswith(fts + "_") for fts, _ in _TABELAS_FTS.values())
+
+
+def criar_indices_de_busca(bind) -> None:
+    """
+    Cria os índices de trigramas que faltarem (chamada depois do create_all;
+    bancos migrados pelo Alembic já os têm). SQLite: tabelas FTS5 + triggers,
+    preenchidas na criação. Postgres: índices GIN com pg_trgm. Outros bancos
+    (MySQL) ficam sem índice de trecho e a busca por trecho faz varredura.
+    """
+    with bind.begin() as conexao:
+        if conexao.dialect.name == "sqlite":
+            for tabela, (fts, colunas) in _TABELAS_FTS.items():
+                if not _existe_sqlite(conexao, "table", fts):
+                    lista = ", ".join(colunas)
+                    conexao.execute(text(
+                        f"CREATE VIRTUAL TABLE {fts} USING fts5({lista}, content='{tabela}', content_rowid='id', tokenize='trigram')"
+                    ))
+            restaurar_triggers_de_busca(conexao)
+        elif conexao.dialect.name == "postgresql":
+            conexao.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            for tabela, (_, colunas) in _TABELAS_FTS.items():
+                for c in colunas:
+                    conexao.execute(text(
+                        f"CREATE INDEX IF NOT EXISTS ix_{tabela}_{c}_trgm ON {tabela} USING gin ({c} gin_trgm_ops)"
+                    ))
+
+
+def filtro_trecho(coluna, termo: str):
+    """
+    Filtro "contém" servido pelo índice de trigramas: no SQLite, consulta a tabela
+    FTS5 (MATCH de uma frase encontra o trecho em qualquer posição) e filtra pelo id;
+    nos outros bancos, LIKE '%x%' (ver criar_indices_de_busca).
+    """
+    if engine.dialect.name != "sqlite":
+        return filtro_contem(coluna, termo)
+    fts, _ = _TABELAS_FTS[coluna.table.name]
+    frase = '"' + termo.replace('"', '""') + '"'
+    encontrados = (
+        select(column("rowid"))
+        .select_from(table(fts))
+        .where(literal_column(fts).op("MATCH")(f"{coluna.name} : {frase}"))
+    )
+    return coluna.table.c.id.in_(encontrados)
+
+
+def condicoes_de_busca(filtros: dict) -> list:
+    """
+    Planejador da busca textual. Recebe {coluna_normalizada: texto digitado} e
+    devolve uma condição por termo, escolhendo o índice pelo tamanho do termo:
+
+    - menos de TAMANHO_MINIMO_TRECHO letras -> prefixo (range scan no B-tree;
+      cobre o match exato e evita varrer tudo por "contém 'a'")
+    - a partir disso                         -> trecho em qualquer posição
+      (índice de trigramas), que também encontra sobrenomes e palavras do meio
+    """
+    condicoes = []
+    for coluna, texto in filtros.items():
+        termo = normalizar_texto(texto) if texto else None
+        if not termo:
+            continue
+        if len(termo) < TAMANHO_MINIMO_TRECHO:
+            condicoes.append(filtro_prefixo(coluna, termo))
+        else:
+            condicoes.append(filtro_trecho(coluna, termo))
+    return condicoes
+
+
+# --------------------------------
+# Cache de respostas da busca
+# --------------------------------
+# As chaves carregam uma "versão": buscas com data usam a versão daquele dia,
+# buscas sem data usam a versão geral. Uma escrita numa viagem incrementa a versão
+# do dia dela e a geral, então só as buscas afetadas deixam de ser encontradas
+# (as entradas antigas saem do cache pelo LRU/TTL).
+cache_busca = CacheTTL(CACHE_BUSCA_TAMANHO, CACHE_BUSCA_TTL_SEGUNDOS)
+
+_versoes = {}  # data (date) ou None (geral) -> versão
+_versoes_lock = threading.Lock()
+
+
+def chave_busca(filtros: dict, dia=None, *extras) -> tuple:
+    """
+    Chave de cache de uma busca: filtros de texto normalizados, o dia filtrado
+    (ou None), extras (ex.: cursor, limite) e a versão atual desse dia.
+    Calcular a chave ANTES de consultar o banco.
+    """
+    textos = tuple(sorted((nome, normalizar_texto(texto) or "") for nome, texto in filtros.items()))
+    return (textos, dia, extras, _versoes.get(dia, 0))
+
+
+def invalidar_busca(*horarios) -> None:
+    """Chamar depois do commit de qualquer escrita que altere as viagens desses horários."""
+    with _versoes_lock:
+        for dia in {h.date() for h in horarios if h is not None} | {None}:
+            _versoes[dia] = _versoes.get(dia, 0) + 1
@@ -0,0 +1,56 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheTTL:
+    """
+    Cache LRU em memória com expiração por tempo (TTL), seguro entre threads.
+    Guarda contadores de acertos/erros para acompanhar a taxa de acerto.
+    """
+
+    def __init__(self, tamanho_maximo: int, ttl_segundos: float):
+        self.tamanho_maximo = tamanho_maximo
+        self.ttl_segundos = ttl_segundos
+        self._itens = OrderedDict()  # chave -> (expira_em, valor)
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.erros = 0
+
+    def obter(self, chave):
+        """Retorna o valor guardado ou None se não existir / tiver expirado."""
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None or item[0] < time.monotonic():
+                if item is not None:
+                    del self._itens[chave]
+                self.erros += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return item[1]
+
+    def guardar(self, chave, valor) -> None:
+        with self._lock:
+            self._itens[chave] = (time.monotonic() + self.ttl_segundos, valor)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.tamanho_maximo:
+                self._itens.popitem(last=False)  # remove o menos usado
+
+    def remover(self, chave) -> None:
+        with self._lock:
+            self._itens.pop(chave, None)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._itens.clear()
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            total = self.acertos + self.erros
+            return {
+                "itens": len(self._itens),
+                "acertos": self.acertos,
+                "erros": self.erros,
+                "taxa_acerto": round(self.acertos / total, 4) if total else 0.0,
+            }
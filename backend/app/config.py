@@ -1,12 +1,71 @@
+import os
 from decouple import config
 
 # Segurança / JWT
 SECRET_KEY = config("SECRET_KEY", default="chave_insegura_dev")
 ALGORITHM = config("ALGORITHM", default="HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = config("ACCESS_TOKEN_EXPIRE_MINUTES", cast=int, default=60)
+# Refresh token: renova o access token sem reenviar a senha (cada uso gera um novo)
+REFRESH_TOKEN_EXPIRE_DAYS = config("REFRESH_TOKEN_EXPIRE_DAYS", cast=int, default=30)
+
+# Cache do usuário autenticado (evita buscar no banco a cada requisição)
+CACHE_USUARIOS_TTL_SEGUNDOS = config("CACHE_USUARIOS_TTL_SEGUNDOS", cast=int, default=60)
+CACHE_USUARIOS_TAMANHO = config("CACHE_USUARIOS_TAMANHO", cast=int, default=10000)
+
+# Cache da busca pública de viagens (GET /viagens/), invalidado a cada escrita
+CACHE_BUSCA_TTL_SEGUNDOS = config("CACHE_BUSCA_TTL_SEGUNDOS", cast=int, default=30)
+CACHE_BUSCA_TAMANHO = config("CACHE_BUSCA_TAMANHO", cast=int, default=2000)
+
+# Hash de senhas (bcrypt) em processos separados
+HASH_PROCESSOS = config("HASH_PROCESSOS", cast=int, default=os.cpu_count() or 1)
+# Máximo de hashes em andamento/fila; acima disso login/cadastro respondem 429
+HASH_MAX_PENDENTES = config("HASH_MAX_PENDENTES", cast=int, default=4 * HASH_PROCESSOS)
 
 # Banco de dados
 DATABASE_URL = config("DATABASE_URL", default="sqlite:///./rota_certa.db")
+# Modo assíncrono (AsyncSession + aiosqlite/asyncpg) nas rotas de viagens, reservas e suporte
+DB_ASYNC = config("DB_ASYNC", cast=bool, default=False)
+
+# Pool de conexões (ajustar conforme o número de workers do uvicorn)
+DB_POOL_SIZE = config("DB_POOL_SIZE", cast=int, default=5)
+DB_MAX_OVERFLOW = config("DB_MAX_OVERFLOW", cast=int, default=10)
+DB_POOL_TIMEOUT = config("DB_POOL_TIMEOUT", cast=float, default=30)
+DB_POOL_RECYCLE = config("DB_POOL_RECYCLE", cast=int, default=1800)
+DB_POOL_PRE_PING = config("DB_POOL_PRE_PING", cast=bool, default=True)
+# SQLite: quanto esperar (ms) por um lock de escrita antes de falhar
+SQLITE_BUSY_TIMEOUT_MS = config("SQLITE_BUSY_TIMEOUT_MS", cast=int, default=5000)
+
+# Paginação (listagens com cursor)
+PAGINA_TAMANHO_PADRAO = config("PAGINA_TAMANHO_PADRAO", cast=int, default=50)
+PAGINA_TAMANHO_MAXIMO = config("PAGINA_TAMANHO_MAXIMO", cast=int, default=200)
+
+# Duração estimada de uma viagem (min): duas viagens do mesmo motorista com partidas
+# mais próximas que isso são recusadas por conflito de horário
+DURACAO_VIAGEM_PADRAO_MIN = config("DURACAO_VIAGEM_PADRAO_MIN", cast=int, default=120)
+
+# Criação de viagens em lote (POST /viagens/lote): máximo de viagens por requisição
+VIAGENS_LOTE_MAXIMO = config("VIAGENS_LOTE_MAXIMO", cast=int, default=2000)
+
+# Sincronização incremental (GET /sync)
+SYNC_LIMITE_PADRAO = config("SYNC_LIMITE_PADRAO", cast=int, default=500)
+SYNC_LIMITE_MAXIMO = config("SYNC_LIMITE_MAXIMO", cast=int, default=2000)
+# Folga para transações ainda não confirmadas: alterações dos últimos N segundos
+# são reenviadas no próximo sync (o cliente só sobrescreve, então repetir não faz mal)
+SYNC_MARGEM_SEGUNDOS = config("SYNC_MARGEM_SEGUNDOS", cast=int, default=5)
+# Respostas acima deste tamanho (bytes) vão comprimidas com gzip, se o cliente aceitar
+GZIP_TAMANHO_MINIMO = config("GZIP_TAMANHO_MINIMO", cast=int, default=1000)
+
+# Notificações (outbox): intervalo do worker e quantas envia por vez
+NOTIFICACOES_INTERVALO_SEGUNDOS = config("NOTIFICACOES_INTERVALO_SEGUNDOS", cast=float, default=2)
+NOTIFICACOES_LOTE = config("NOTIFICACOES_LOTE", cast=int, default=500)
+
+# Exportação em streaming (NDJSON/CSV): linhas buscadas do banco por vez
+EXPORTACAO_LOTE = config("EXPORTACAO_LOTE", cast=int, default=1000)
+
+# Armazenamento de uploads (documentos dos motoristas)
+ARMAZENAMENTO_BACKEND = config("ARMAZENAMENTO_BACKEND", default="local")  # por enquanto só "local"
+UPLOAD_DIR = config("UPLOAD_DIR", default="uploads")
+UPLOAD_TAMANHO_MAXIMO_MB = config("UPLOAD_TAMANHO_MAXIMO_MB", cast=int, default=10)
 
 # CORS (origens permitidas para chamadas externas)
 ALLOWED_ORIGINS = config(
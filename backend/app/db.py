@@ -1,15 +1,133 @@
-from sqlalchemy import create_engine
+import contextvars
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+from fastapi import Depends
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from .config import DATABASE_URL
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from .config import (
+    DATABASE_URL, DB_ASYNC,
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING,
+    SQLITE_BUSY_TIMEOUT_MS,
+)
+from .metricas import Histograma
+
+# --------------------------------
+# Pool de conexões instrumentado
+# --------------------------------
+# Tempo que as requisições esperam para conseguir uma conexão do pool
+espera_pool = Histograma()
+
+
+class _MedeEspera:
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            espera_pool.observar(time.perf_counter() - inicio)
+
+
+class PoolInstrumentado(_MedeEspera, QueuePool):
+    pass
+
+
+class PoolAsyncInstrumentado(_MedeEspera, AsyncAdaptedQueuePool):
+    pass
+
+
+SQLITE = DATABASE_URL.startswith("sqlite")
+SQLITE_MEMORIA = SQLITE and (DATABASE_URL in ("sqlite://", "sqlite:///") or ":memory:" in DATABASE_URL)
+
+
+def _opcoes_engine(poolclass) -> dict:
+    opcoes = {"pool_pre_ping": DB_POOL_PRE_PING}
+    if SQLITE_MEMORIA:
+        return opcoes  # banco em memória usa pool próprio de conexão única
+    opcoes.update(
+        poolclass=poolclass,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+    return opcoes
+
+
+def _pragmas_sqlite(dbapi_conn, registro):
+    """WAL permite leituras durante uma escrita; NORMAL é seguro com WAL e bem mais rápido."""
+    cursor = dbapi_conn.cursor()
+    if not SQLITE_MEMORIA:
+        cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
+
 
 # Cria engine adaptando para SQLite ou outros bancos (Postgres, MySQL etc.)
-if DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+if SQLITE:
+    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False}, **_opcoes_engine(PoolInstrumentado))
+    event.listen(engine, "connect", _pragmas_sqlite)
 else:
-    engine = create_engine(DATABASE_URL)
+    engine = create_engine(DATABASE_URL, **_opcoes_engine(PoolInstrumentado))
+
+# expire_on_commit=False: as respostas são montadas depois do commit com os valores
+# que já estão no objeto (id vem do INSERT), sem um SELECT extra por objeto
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+
+# --------------------------------
+# Contagem de consultas SQL
+# --------------------------------
+class ContadorConsultas:
+    def __init__(self):
+        self.total = 0
+        self.tempo = 0.0  # segundos gastos no banco
+
+
+_contador_atual = contextvars.ContextVar("contador_consultas", default=None)
+
+
+@contextmanager
+def contar_consultas():
+    """
+    Conta as consultas SQL (e o tempo no banco) executadas dentro do bloco,
+    inclusive em threads/greenlets que herdam o contexto. Útil para checar se
+    um endpoint respeita seu "orçamento" de consultas.
+
+        with contar_consultas() as contador:
+            client.get("/viagens/")
+        assert contador.total <= 2
+    """
+    contador = ContadorConsultas()
+    token = _contador_atual.set(contador)
+    try:
+        yield contador
+    finally:
+        _contador_atual.reset(token)
+
+
+def _inicio_consulta(conn, cursor, statement, parameters, context, executemany):
+    context._inicio_consulta = time.perf_counter()
+
+
+def _fim_consulta(conn, cursor, statement, parameters, context, executemany):
+    contador = _contador_atual.get()
+    if contador is not None:
+        contador.total += 1
+        contador.tempo += time.perf_counter() - context._inicio_consulta
+
+
+def instrumentar_engine(eng) -> None:
+    event.listen(eng, "before_cursor_execute", _inicio_consulta)
+    event.listen(eng, "after_cursor_execute", _fim_consulta)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+instrumentar_engine(engine)
 
 Base = declarative_base()
 
@@ -19,3 +137,123 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# --------------------------------
+# Modo assíncrono (opcional, DB_ASYNC=True)
+# --------------------------------
+def _url_async(url: str) -> str:
+    """Troca o driver síncrono da URL pelo equivalente assíncrono."""
+    if url.startswith("sqlite"):
+        return "sqlite+aiosqlite" + url[url.index(":"):]
+    if url.startswith("postgresql"):
+        return "postgresql+asyncpg" + url[url.index(":"):]
+    return url
+
+
+async_engine = None
+AsyncSessionLocal = None
+
+if DB_ASYNC:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    async_engine = create_async_engine(_url_async(DATABASE_URL), **_opcoes_engine(PoolAsyncInstrumentado))
+    if SQLITE:
+        event.listen(async_engine.sync_engine, "connect", _pragmas_sqlite)
+    instrumentar_engine(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Sessão das rotas `async def` nativas: AsyncSession com DB_ASYNC ligado, Session caso contrário
+get_db_configurado = get_async_db if DB_ASYNC else get_db
+
+
+def _executar_carregado(db, instrucao):
+    # freeze() lê todas as linhas ainda no threadpool; o Result devolvido não toca mais o banco
+    return db.execute(instrucao).freeze()()
+
+
+async def executar(db, instrucao):
+    """
+    Executa um `select()` do SQLAlchemy 2.0 numa rota `async def` sem bloquear o
+    event loop: com AsyncSession, `await db.execute` direto no driver assíncrono
+    (aiosqlite/asyncpg); com Session, a consulta vai para o threadpool. Nos dois
+    casos o Result volta com as linhas já carregadas.
+    """
+    if DB_ASYNC:
+        return await db.execute(instrucao)
+    return await run_in_threadpool(_executar_carregado, db, instrucao)
+
+
+def _consultar_sync(instrucao) -> list:
+    with engine.connect() as conexao:
+        return conexao.execute(instrucao).all()
+
+
+async def consultar(instrucao) -> list:
+    """
+    Leitura curta numa conexão própria, devolvida ao pool assim que as linhas chegam.
+    Para dependências (ex.: carregar o usuário autenticado): usar a sessão da
+    requisição prenderia a conexão enquanto a rota espera sua vez no threadpool.
+    """
+    if DB_ASYNC:
+        async with async_engine.connect() as conexao:
+            return (await conexao.execute(instrucao)).all()
+    return await run_in_threadpool(_consultar_sync, instrucao)
+
+
+def estatisticas_pool() -> dict:
+    """Situação atual do(s) pool(s) de conexões, para dimensionar pool x workers."""
+    def _resumo(eng):
+        pool = eng.pool
+        if not isinstance(pool, QueuePool):
+            return {"tipo": type(pool).__name__}
+        return {
+            "tamanho": pool.size(),
+            "em_uso": pool.checkedout(),
+            "ociosas": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "max_overflow": DB_MAX_OVERFLOW,
+        }
+
+    estatisticas = {"sync": _resumo(engine), "espera_segundos": espera_pool.resumo()}
+    if async_engine is not None:
+        estatisticas["async"] = _resumo(async_engine.sync_engine)
+    return estatisticas
+
+
+def suporta_db_async(funcao):
+    """
+    Decorator para endpoints/dependências síncronos que recebem `db: Session`.
+
+    Com DB_ASYNC ligado, a função vira `async def` e recebe uma AsyncSession; o corpo
+    original roda dentro de `AsyncSession.run_sync`. Limitação: só a espera pelo
+    driver é assíncrona; o corpo continua síncrono, num greenlet sobre o event loop,
+    e todo o trabalho do ORM entre as consultas ocupa o loop. Fica para as escritas
+    e rotas menos usadas; as leituras mais frequentes (autenticação, busca de
+    viagens, listagens do usuário) são `async def` nativas que usam `executar`.
+    Com DB_ASYNC desligado, a função é devolvida sem mudanças.
+    """
+    if not DB_ASYNC:
+        return funcao
+
+    assinatura = inspect.signature(funcao)
+    parametros = [
+        p.replace(default=Depends(get_async_db)) if p.name == "db" else p
+        for p in assinatura.parameters.values()
+    ]
+
+    @functools.wraps(funcao)
+    async def wrapper(*args, **kwargs):
+        db = kwargs.pop("db")
+        return await db.run_sync(lambda sessao: funcao(*args, db=sessao, **kwargs))
+
+    # Sem __wrapped__ o FastAPI enxerga a assinatura/corrotina do wrapper, não a original
+    del wrapper.__wrapped__
+    wrapper.__signature__ = assinatura.replace(parameters=parametros)
+    return wrapper
@@ -0,0 +1,84 @@
+import csv
+import io
+import json
+from datetime import datetime
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from .db import SessionLocal
+
+NDJSON = "application/x-ndjson"
+CSV = "text/csv"
+
+_EXTENSOES = {NDJSON: "ndjson", CSV: "csv"}
+
+# Junta as linhas em blocos de ~64 KB antes de enviar (menos chamadas de escrita no socket)
+_TAMANHO_BLOCO = 64 * 1024
+
+
+def formato_exportacao(request: Request):
+    """
+    Retorna o formato de exportação pedido no cabeçalho Accept
+    (`application/x-ndjson` ou `text/csv`), ou None para a resposta JSON paginada normal.
+    """
+    for parte in request.headers.get("accept", "").split(","):
+        tipo = parte.split(";")[0].strip().lower()
+        if tipo in _EXTENSOES:
+            return tipo
+    return None
+
+
+def _valor(valor):
+    return valor.isoformat() if isinstance(valor, datetime) else valor
+
+
+def _ndjson(linhas):
+    for linha in linhas:
+        yield json.dumps({k: _valor(v) for k, v in linha.items()}, ensure_ascii=False) + "\n"
+
+
+def _csv(linhas):
+    buffer = io.StringIO()
+    escritor = None
+    for linha in linhas:
+        if escritor is None:
+            escritor = csv.DictWriter(buffer, fieldnames=list(linha))
+            escritor.writeheader()
+        escritor.writerow({k: _valor(v) for k, v in linha.items()})
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def _em_blocos(pedacos):
+    bloco, tamanho = [], 0
+    for pedaco in pedacos:
+        bloco.append(pedaco)
+        tamanho += len(pedaco)
+        if tamanho >= _TAMANHO_BLOCO:
+            yield "".join(bloco)
+            bloco, tamanho = [], 0
+    if bloco:
+        yield "".join(bloco)
+
+
+def exportar(formato: str, nome: str, gerar_linhas) -> StreamingResponse:
+    """
+    Resposta em streaming para exportações grandes.
+
+    `gerar_linhas(db)` recebe uma sessão própria (a da requisição já terá sido
+    fechada quando o corpo for enviado) e deve produzir dicts planos, de preferência
+    a partir de uma consulta com `yield_per`, para a memória não crescer com o resultado.
+    """
+    def corpo():
+        db = SessionLocal()
+        try:
+            linhas = gerar_linhas(db)
+            yield from _em_blocos(_ndjson(linhas) if formato == NDJSON else _csv(linhas))
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        corpo(),
+        media_type=formato,
+        headers={"Content-Disposition": f'attachment; filename="{nome}.{_EXTENSOES[formato]}"'},
+    )
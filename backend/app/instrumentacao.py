@@ -0,0 +1,88 @@
+import time
+from fastapi import Request
+from .db import contar_consultas, estatisticas_pool, espera_pool
+from .metricas import MetricasRotas, formatar_rotulos
+
+metricas_rotas = MetricasRotas()
+
+
+# --------------------------------
+# Middleware
+# --------------------------------
+async def medir_requisicao(request: Request, call_next):
+    """
+    Mede cada requisição: latência total, nº de consultas SQL e tempo no banco.
+    Registra por rota (o caminho declarado, ex.: `/viagens/{viagem_id}/status`, para
+    não criar uma série por id) e devolve o cabeçalho `Server-Timing`, que aparece
+    na aba Network do navegador.
+
+    Em respostas em streaming, mede até o início do envio do corpo.
+    """
+    inicio = time.perf_counter()
+    with contar_consultas() as contador:
+        response = await call_next(request)
+    duracao = time.perf_counter() - inicio
+
+    rota = request.scope.get("route")
+    caminho = rota.path if rota is not None else "desconhecida"
+    metricas_rotas.registrar(
+        request.method, caminho, response.status_code, duracao, contador.total, contador.tempo
+    )
+
+    response.headers["Server-Timing"] = (
+        f"app;dur={duracao * 1000:.1f}, "
+        f'db;dur={contador.tempo * 1000:.1f};desc="{contador.total} consultas"'
+    )
+    return response
+
+
+# --------------------------------
+# Exposição no formato Prometheus
+# --------------------------------
+def _metrica(linhas: list, nome: str, tipo: str, ajuda: str) -> None:
+    linhas.append(f"# HELP {nome} {ajuda}")
+    linhas.append(f"# TYPE {nome} {tipo}")
+
+
+def texto_prometheus(caches: dict) -> str:
+    """Texto para GET /metrics. `caches`: {nome: CacheTTL} cujas estatísticas serão expostas."""
+    rotas = metricas_rotas.itens()
+    linhas = []
+
+    _metrica(linhas, "http_requests_total", "counter", "Requisições por rota e status")
+    for (metodo, caminho), m in rotas:
+        for status, total in sorted(m.por_status.items()):
+            linhas.append(f"http_requests_total{formatar_rotulos({'method': metodo, 'route': caminho, 'status': status})} {total}")
+
+    _metrica(linhas, "http_request_duration_seconds", "histogram", "Latência das requisições")
+    for (metodo, caminho), m in rotas:
+        linhas += m.latencia.prometheus("http_request_duration_seconds", {"method": metodo, "route": caminho})
+
+    _metrica(linhas, "db_request_time_seconds", "histogram", "Tempo gasto no banco por requisição")
+    for (metodo, caminho), m in rotas:
+        linhas += m.tempo_db.prometheus("db_request_time_seconds", {"method": metodo, "route": caminho})
+
+    _metrica(linhas, "db_queries_total", "counter", "Consultas SQL executadas, por rota")
+    for (metodo, caminho), m in rotas:
+        linhas.append(f"db_queries_total{formatar_rotulos({'method': metodo, 'route': caminho})} {m.consultas}")
+
+    pool = estatisticas_pool()
+    _metrica(linhas, "db_pool_connections", "gauge", "Conexões do pool por estado")
+    for engine, dados in pool.items():
+        if engine == "espera_segundos" or "em_uso" not in dados:
+            continue
+        for estado in ("em_uso", "ociosas", "overflow"):
+            linhas.append(f"db_pool_connections{formatar_rotulos({'engine': engine, 'estado': estado})} {dados[estado]}")
+    _metrica(linhas, "db_pool_wait_seconds", "histogram", "Espera por uma conexão do pool")
+    linhas += espera_pool.prometheus("db_pool_wait_seconds")
+
+    _metrica(linhas, "cache_requests_total", "counter", "Consultas aos caches em memória")
+    for nome, cache in caches.items():
+        estatisticas = cache.estatisticas()
+        linhas.append(f"cache_requests_total{formatar_rotulos({'cache': nome, 'resultado': 'acerto'})} {estatisticas['acertos']}")
+        linhas.append(f"cache_requests_total{formatar_rotulos({'cache': nome, 'resultado': 'erro'})} {estatisticas['erros']}")
+    _metrica(linhas, "cache_items", "gauge", "Itens guardados em cada cache")
+    for nome, cache in caches.items():
+        linhas.append(f"cache_items{formatar_rotulos({'cache': nome})} {cache.estatisticas()['itens']}")
+
+    return "\n".join(linhas) + "\n"
@@ -1,14 +1,22 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .config import ALLOWED_ORIGINS
-from .routers import motoristas, passageiros, viagens, reservas, suporte, auth
-from .db import Base, engine
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import PlainTextResponse
+from .config import ALLOWED_ORIGINS, GZIP_TAMANHO_MINIMO
+from .routers import motoristas, passageiros, viagens, reservas, suporte, auth, sincronizacao
+from .db import Base, engine, estatisticas_pool
+from .senhas import encerrar_pool
+from .notificacoes import iniciar_worker, parar_worker
+from .busca import cache_busca, criar_indices_de_busca
+from .instrumentacao import medir_requisicao, texto_prometheus
+from .armazenamento import LimiteDeUpload
 from fastapi.openapi.utils import get_openapi
 
 # --------------------------------
 # Criar tabelas automaticamente
 # --------------------------------
 Base.metadata.create_all(bind=engine)
+criar_indices_de_busca(engine)
 
 app = FastAPI(
     title="Rota Certa API",
@@ -16,6 +24,17 @@ app = FastAPI(
     version="0.5"
 )
 
+# Finaliza o pool de processos de hash de senha ao desligar
+app.on_event("shutdown")(encerrar_pool)
+
+# Worker que envia as notificações da fila (outbox)
+app.on_event("startup")(iniciar_worker)
+app.on_event("shutdown")(parar_worker)
+
+# Uploads acima de UPLOAD_TAMANHO_MAXIMO_MB: 413 antes de ler o formulário
+# (adicionado antes do CORS para que a resposta 413 também leve os cabeçalhos de CORS)
+app.add_middleware(LimiteDeUpload)
+
 # Configuração de CORS
 app.add_middleware(
     CORSMiddleware,
@@ -25,6 +44,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compressão das respostas maiores (listagens, /sync) para clientes com conexão lenta
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_TAMANHO_MINIMO)
+
+# Latência / consultas SQL por rota + cabeçalho Server-Timing (ver GET /metrics)
+app.middleware("http")(medir_requisicao)
+
 # Rotas
 app.include_router(auth.router)
 app.include_router(motoristas.router, tags=["Motoristas"])
@@ -32,6 +57,28 @@ app.include_router(passageiros.router, tags=["Passageiros"])
 app.include_router(viagens.router, tags=["Viagens"])
 app.include_router(reservas.router, tags=["Reservas"])
 app.include_router(suporte.router, tags=["Suporte"])
+app.include_router(sincronizacao.router)
+
+
+@app.get("/status/pool", tags=["Status"], summary="Estatísticas do pool de conexões")
+def status_pool():
+    return estatisticas_pool()
+
+
+@app.get("/status/cache", tags=["Status"], summary="Acertos/erros dos caches em memória")
+def status_cache():
+    return {"usuarios": auth.cache_usuarios.estatisticas(), "busca_viagens": cache_busca.estatisticas()}
+
+
+@app.get(
+    "/metrics",
+    tags=["Status"],
+    summary="Métricas no formato Prometheus",
+    response_class=PlainTextResponse,
+)
+def metrics():
+    texto = texto_prometheus({"usuarios": auth.cache_usuarios, "busca_viagens": cache_busca})
+    return PlainTextResponse(texto, media_type="text/plain; version=0.0.4")
 
 
 # 🔹 Swagger customizado com OAuth2 password flow
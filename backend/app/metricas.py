@@ -0,0 +1,90 @@
+import bisect
+import threading
+
+
+class Histograma:
+    """
+    Histograma no estilo Prometheus: conta quantas observações caem abaixo de
+    cada limite (buckets cumulativos), além da soma e do total.
+    """
+
+    LIMITES_PADRAO = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, limites=LIMITES_PADRAO):
+        self.limites = tuple(limites)
+        self._contagens = [0] * (len(self.limites) + 1)  # último = acima do maior limite
+        self._lock = threading.Lock()
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float) -> None:
+        indice = bisect.bisect_left(self.limites, valor)
+        with self._lock:
+            self._contagens[indice] += 1
+            self.soma += valor
+            self.total += 1
+
+    def resumo(self) -> dict:
+        with self._lock:
+            acumulado, buckets = 0, {}
+            for limite, contagem in zip(self.limites, self._contagens):
+                acumulado += contagem
+                buckets[str(limite)] = acumulado
+            buckets["+Inf"] = self.total
+            return {"total": self.total, "soma": round(self.soma, 6), "buckets": buckets}
+
+    def prometheus(self, nome: str, rotulos: dict = None) -> list:
+        """Linhas no formato de exposição do Prometheus (_bucket, _sum, _count)."""
+        rotulos = rotulos or {}
+        resumo = self.resumo()
+        linhas = [
+            f"{nome}_bucket{formatar_rotulos({**rotulos, 'le': limite})} {contagem}"
+            for limite, contagem in resumo["buckets"].items()
+        ]
+        linhas.append(f"{nome}_sum{formatar_rotulos(rotulos)} {resumo['soma']}")
+        linhas.append(f"{nome}_count{formatar_rotulos(rotulos)} {resumo['total']}")
+        return linhas
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def formatar_rotulos(rotulos: dict) -> str:
+    """{"rota": "/x", "le": 0.5} -> '{rota="/x",le="0.5"}' (vazio se não houver rótulos)."""
+    if not rotulos:
+        return ""
+    return "{" + ",".join(f'{chave}="{_escapar(valor)}"' for chave, valor in rotulos.items()) + "}"
+
+
+# --------------------------------
+# Métricas por rota
+# --------------------------------
+class MetricasRota:
+    def __init__(self):
+        self.latencia = Histograma()
+        self.tempo_db = Histograma()
+        self.consultas = 0
+        self.por_status = {}
+
+
+class MetricasRotas:
+    """Latência, tempo de banco, nº de consultas e status HTTP por (método, rota)."""
+
+    def __init__(self):
+        self._rotas = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, metodo: str, rota: str, status: int, duracao: float, consultas: int, tempo_db: float) -> None:
+        with self._lock:
+            metricas = self._rotas.get((metodo, rota))
+            if metricas is None:
+                metricas = self._rotas[(metodo, rota)] = MetricasRota()
+            metricas.consultas += consultas
+            metricas.por_status[status] = metricas.por_status.get(status, 0) + 1
+        metricas.latencia.observar(duracao)
+        metricas.tempo_db.observar(tempo_db)
+
+    def itens(self) -> list:
+        with self._lock:
+            return list(self._rotas.items())
@@ -1,15 +1,22 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Float
-from sqlalchemy.orm import relationship
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Float, Index, text, event, insert, case
+from sqlalchemy.orm import relationship, validates, column_property
 from .db import Base
+from .utils import normalizar_texto
 
 # -------------------------------
 # Usuário único (Motorista ou Passageiro)
 # -------------------------------
 class Usuario(Base):
     __tablename__ = "usuarios"
+    __table_args__ = (
+        # listar_motoristas / listar_passageiros: WHERE tipo = ? ORDER BY id
+        Index("ix_usuarios_tipo_id", "tipo", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     nome = Column(String, nullable=False)
+    nome_norm = Column(String, index=True)  # nome sem acento/minúsculo, usado na busca
     email = Column(String, unique=True, index=True, nullable=False)
     senha_hash = Column(String, nullable=False)
     tipo = Column(String, nullable=False)  # "motorista" ou "passageiro"
@@ -21,42 +28,92 @@ class Usuario(Base):
     placa_carro = Column(String, nullable=True)
     documento_url = Column(String, nullable=True)
 
+    # Agregados das avaliações recebidas (motorista: avaliacoes_motoristas;
+    # passageiro: avaliacoes_passageiros). Mantidos por app.avaliacoes.registrar_nota
+    avaliacoes_quantidade = Column(Integer, nullable=False, default=0, server_default="0")
+    avaliacoes_soma = Column(Float, nullable=False, default=0, server_default="0")
+    # Calculada na leitura (não é coluna): None enquanto não houver avaliações
+    avaliacao_media = column_property(
+        case((avaliacoes_quantidade > 0, avaliacoes_soma / avaliacoes_quantidade))
+    )
+
     # Relacionamentos
     viagens = relationship("Viagem", back_populates="motorista")
     reservas = relationship("Reserva", back_populates="passageiro")
     avaliacoes_motorista = relationship("AvaliacaoMotorista", back_populates="motorista", foreign_keys="AvaliacaoMotorista.motorista_id")
     avaliacoes_passageiro = relationship("AvaliacaoPassageiro", back_populates="passageiro", foreign_keys="AvaliacaoPassageiro.passageiro_id")
 
+    @validates("nome")
+    def _sincronizar_nome_norm(self, chave, valor):
+        self.nome_norm = normalizar_texto(valor)
+        return valor
+
 
 # -------------------------------
 # Viagem
 # -------------------------------
 class Viagem(Base):
     __tablename__ = "viagens"
+    __table_args__ = (
+        # Busca por origem (+ destino) e data, já na ordem da paginação;
+        # também atende buscas só por origem (prefixo do índice)
+        Index("ix_viagens_origem_destino_horario", "origem_norm", "destino_norm", "horario_partida"),
+        # Viagens de um motorista em ordem de partida
+        Index("ix_viagens_motorista_horario", "motorista_id", "horario_partida"),
+        # GET /sync: viagens alteradas depois de um instante
+        Index("ix_viagens_atualizado_id", "atualizado_em", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     origem = Column(String)
     destino = Column(String)
-    horario_partida = Column(DateTime)
+    # Versões normalizadas (minúsculas, sem acento) indexadas para a busca
+    origem_norm = Column(String)
+    destino_norm = Column(String, index=True)
+    horario_partida = Column(DateTime, index=True)  # filtro por data e ordem da listagem
     vagas_disponiveis = Column(Integer)
     status = Column(String, default="agendada")  # agendada, cancelada, concluída
     motorista_id = Column(Integer, ForeignKey("usuarios.id"))
+    # Última alteração (inclusive pelos UPDATEs em lote); base da sincronização incremental
+    atualizado_em = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     motorista = relationship("Usuario", back_populates="viagens")
     reservas = relationship("Reserva", back_populates="viagem")
 
+    @validates("origem", "destino")
+    def _sincronizar_cidade_norm(self, chave, valor):
+        setattr(self, f"{chave}_norm", normalizar_texto(valor))
+        return valor
+
 
 # -------------------------------
 # Reserva
 # -------------------------------
 class Reserva(Base):
     __tablename__ = "reservas"
+    __table_args__ = (
+        # Um passageiro só pode ter uma reserva confirmada por viagem
+        Index(
+            "uq_reservas_viagem_passageiro_confirmada",
+            "viagem_id", "passageiro_id",
+            unique=True,
+            sqlite_where=text("status = 'confirmada'"),
+            postgresql_where=text("status = 'confirmada'"),
+        ),
+        # Reservas do passageiro (listar_minhas_reservas)
+        Index("ix_reservas_passageiro_viagem", "passageiro_id", "viagem_id"),
+        # Reservas de uma viagem, por status (contagens e cancelamento em lote)
+        Index("ix_reservas_viagem_status", "viagem_id", "status"),
+        # GET /sync: reservas do passageiro alteradas depois de um instante
+        Index("ix_reservas_passageiro_atualizado", "passageiro_id", "atualizado_em", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     viagem_id = Column(Integer, ForeignKey("viagens.id"))
     passageiro_id = Column(Integer, ForeignKey("usuarios.id"))
     status = Column(String, default="confirmada")  # confirmada, cancelada
     horario_confirmacao = Column(DateTime, nullable=True)
+    atualizado_em = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     viagem = relationship("Viagem", back_populates="reservas")
     passageiro = relationship("Usuario", back_populates="reservas")
@@ -69,8 +126,8 @@ class AvaliacaoMotorista(Base):
     __tablename__ = "avaliacoes_motoristas"
 
     id = Column(Integer, primary_key=True, index=True)
-    motorista_id = Column(Integer, ForeignKey("usuarios.id"))
-    passageiro_id = Column(Integer, ForeignKey("usuarios.id"))
+    motorista_id = Column(Integer, ForeignKey("usuarios.id"), index=True)
+    passageiro_id = Column(Integer, ForeignKey("usuarios.id"), index=True)
     nota = Column(Float)
     comentario = Column(Text, nullable=True)
 
@@ -85,8 +142,8 @@ class AvaliacaoPassageiro(Base):
     __tablename__ = "avaliacoes_passageiros"
 
     id = Column(Integer, primary_key=True, index=True)
-    passageiro_id = Column(Integer, ForeignKey("usuarios.id"))
-    motorista_id = Column(Integer, ForeignKey("usuarios.id"))
+    passageiro_id = Column(Integer, ForeignKey("usuarios.id"), index=True)
+    motorista_id = Column(Integer, ForeignKey("usuarios.id"), index=True)
     nota = Column(Float)
     comentario = Column(Text, nullable=True)
 
@@ -99,6 +156,12 @@ class AvaliacaoPassageiro(Base):
 # -------------------------------
 class TicketSuporte(Base):
     __tablename__ = "tickets_suporte"
+    __table_args__ = (
+        # listar_tickets: WHERE usuario_id = ? ORDER BY criado_em, id
+        Index("ix_tickets_suporte_usuario_criado", "usuario_id", "criado_em"),
+        # GET /sync: tickets do usuário alterados depois de um instante
+        Index("ix_tickets_suporte_usuario_atualizado", "usuario_id", "atualizado_em", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     usuario_id = Column(Integer, ForeignKey("usuarios.id"))
@@ -107,5 +170,85 @@ class TicketSuporte(Base):
     mensagem = Column(Text)
     status = Column(String, default="aberto")  # aberto, fechado
     criado_em = Column(DateTime)
+    atualizado_em = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     usuario = relationship("Usuario")
+
+
+# -------------------------------
+# Notificações (outbox)
+# -------------------------------
+class Notificacao(Base):
+    """
+    Fila de saída de notificações aos usuários: gravada na mesma transação da
+    mudança que a originou e enviada depois por app.notificacoes (worker em background).
+    """
+    __tablename__ = "notificacoes"
+    __table_args__ = (
+        # Worker: pendentes em ordem de criação
+        Index("ix_notificacoes_enviada_id", "enviada_em", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    usuario_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False)
+    tipo = Column(String, nullable=False)  # ex.: "viagem_cancelada"
+    viagem_id = Column(Integer, ForeignKey("viagens.id"), nullable=True)
+    reserva_id = Column(Integer, ForeignKey("reservas.id"), nullable=True)
+    criada_em = Column(DateTime, nullable=False)
+    enviada_em = Column(DateTime, nullable=True)
+
+
+# -------------------------------
+# Exclusões (tombstones) para a sincronização
+# -------------------------------
+class Exclusao(Base):
+    """
+    Registro de uma linha apagada de viagens, reservas ou tickets_suporte, para que
+    GET /sync avise os clientes que já tinham a linha guardada.
+    """
+    __tablename__ = "exclusoes"
+    __table_args__ = (
+        Index("ix_exclusoes_excluido_id", "excluido_em", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    tabela = Column(String, nullable=False)  # "viagens", "reservas" ou "tickets_suporte"
+    registro_id = Column(Integer, nullable=False)
+    usuario_id = Column(Integer, nullable=True)  # dono da linha; None = visível a todos (viagens)
+    excluido_em = Column(DateTime, nullable=False)
+
+
+# Só exclusões feitas pelo ORM (db.delete) passam por aqui; um DELETE em lote
+# nessas tabelas precisa registrar as exclusões por conta própria.
+def _registrar_exclusao(usuario_id_de):
+    def registrar(mapper, connection, alvo):
+        connection.execute(insert(Exclusao).values(
+            tabela=alvo.__tablename__,
+            registro_id=alvo.id,
+            usuario_id=usuario_id_de(alvo),
+            excluido_em=datetime.utcnow(),
+        ))
+    return registrar
+
+
+event.listen(Viagem, "after_delete", _registrar_exclusao(lambda viagem: None))
+event.listen(Reserva, "after_delete", _registrar_exclusao(lambda reserva: reserva.passageiro_id))
+event.listen(TicketSuporte, "after_delete", _registrar_exclusao(lambda ticket: ticket.usuario_id))
+
+
+# -------------------------------
+# Refresh token (sessões de login)
+# -------------------------------
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    usuario_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False, index=True)
+    # SHA-256 do token; o token em si só existe no cliente
+    token_hash = Column(String(64), nullable=False, unique=True, index=True)
+    # Todos os tokens gerados a partir do mesmo login (rotação) compartilham a família
+    familia = Column(String(32), nullable=False, index=True)
+    criado_em = Column(DateTime, nullable=False)
+    expira_em = Column(DateTime, nullable=False)
+    usado_em = Column(DateTime, nullable=True)  # preenchido quando é trocado por um novo
+    revogado_em = Column(DateTime, nullable=True)
@@ -0,0 +1,99 @@
+import asyncio
+import logging
+from datetime import datetime
+from sqlalchemy import insert, literal, select, update
+from sqlalchemy.orm import Session
+from . import models
+from .db import SessionLocal
+from .config import NOTIFICACOES_INTERVALO_SEGUNDOS, NOTIFICACOES_LOTE
+
+logger = logging.getLogger(__name__)
+
+
+# --------------------------------
+# Enfileiramento (dentro da transação da rota)
+# --------------------------------
+def enfileirar_viagem_cancelada(db: Session, viagem_id: int, agora: datetime) -> None:
+    """
+    Uma notificação por reserva confirmada da viagem, num único INSERT ... SELECT.
+    Deve rodar antes de as reservas serem canceladas (usa o status `confirmada`).
+    """
+    R = models.Reserva
+    db.execute(
+        insert(models.Notificacao).from_select(
+            ["usuario_id", "tipo", "viagem_id", "reserva_id", "criada_em"],
+            select(R.passageiro_id, literal("viagem_cancelada"), R.viagem_id, R.id, literal(agora))
+            .where(R.viagem_id == viagem_id, R.status == "confirmada"),
+        )
+    )
+
+
+# --------------------------------
+# Envio
+# --------------------------------
+def enviar(notificacoes: list) -> None:
+    """Ponto de integração com push/e-mail/SMS; por enquanto só registra no log."""
+    for n in notificacoes:
+        logger.info("notificação %s para usuário %s (viagem %s, reserva %s)", n.tipo, n.usuario_id, n.viagem_id, n.reserva_id)
+
+
+def drenar_pendentes(lote: int = NOTIFICACOES_LOTE) -> int:
+    """
+    Envia um lote de notificações pendentes e marca como enviadas (um UPDATE por lote).
+    Entrega "pelo menos uma vez": se o processo cair entre o envio e o commit, o lote
+    é reenviado; com vários workers do uvicorn, um mesmo lote pode sair duas vezes.
+    """
+    N = models.Notificacao
+    with SessionLocal() as db:
+        pendentes = db.execute(
+            select(N.id, N.usuario_id, N.tipo, N.viagem_id, N.reserva_id)
+            .where(N.enviada_em.is_(None))
+            .order_by(N.id)
+            .limit(lote)
+        ).all()
+        if not pendentes:
+            return 0
+
+        enviar(pendentes)
+        db.execute(
+            update(N)
+            .where(N.id.in_([n.id for n in pendentes]), N.enviada_em.is_(None))
+            .values(enviada_em=datetime.utcnow())
+        )
+        db.commit()
+    return len(pendentes)
+
+
+# --------------------------------
+# Worker em background
+# --------------------------------
+_tarefa = None
+
+
+async def _drenar_continuamente() -> None:
+    while True:
+        try:
+            enviadas = await asyncio.to_thread(drenar_pendentes)
+        except Exception:
+            logger.exception("Falha ao enviar notificações pendentes")
+            enviadas = 0
+        # Lote cheio: provavelmente há mais na fila, continua sem esperar
+        if enviadas < NOTIFICACOES_LOTE:
+            await asyncio.sleep(NOTIFICACOES_INTERVALO_SEGUNDOS)
+
+
+async def iniciar_worker() -> None:
+    global _tarefa
+    if _tarefa is None:
+        _tarefa = asyncio.create_task(_drenar_continuamente())
+
+
+async def parar_worker() -> None:
+    global _tarefa
+    if _tarefa is not None:
+        _tarefa.cancel()
+        try:
+            await _tarefa
+        except asyncio.CancelledError:
+            pass
+        _tarefa = None
@@ -0,0 +1,133 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from fastapi import HTTPException, Query
+from sqlalchemy import DateTime, and_, or_
+from .config import PAGINA_TAMANHO_PADRAO, PAGINA_TAMANHO_MAXIMO
+from .db import executar
+
+
+# --------------------------------
+# Cursor opaco
+# --------------------------------
+def codificar_cursor(dados: dict) -> str:
+    """Serializa o cursor (JSON em base64 url-safe). O cliente só devolve o valor."""
+    bruto = json.dumps(dados, separators=(",", ":"), default=lambda v: v.isoformat())
+    return base64.urlsafe_b64encode(bruto.encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str) -> dict:
+    try:
+        bruto = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        dados = json.loads(bruto)
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Cursor de paginação inválido")
+    if not isinstance(dados, dict) or not isinstance(dados.get("k"), list):
+        raise HTTPException(status_code=400, detail="Cursor de paginação inválido")
+    return dados
+
+
+# --------------------------------
+# Parâmetros comuns das listagens
+# --------------------------------
+class Pagina:
+    """Dependência com os parâmetros `?cursor=&limite=` aceitos por todas as listagens."""
+
+    def __init__(
+        self,
+        cursor: str = Query(None, description="Valor de `next_cursor` da página anterior"),
+        limite: int = Query(
+            PAGINA_TAMANHO_PADRAO, ge=1, le=PAGINA_TAMANHO_MAXIMO,
+            description=f"Itens por página (máximo {PAGINA_TAMANHO_MAXIMO})"
+        ),
+    ):
+        self.cursor = cursor
+        self.limite = limite
+        self.contexto = decodificar_cursor(cursor) if cursor else {}
+
+
+# --------------------------------
+# Paginação por chave (keyset)
+# --------------------------------
+def _depois_de(colunas: list, valores: list):
+    """(a, b) > (va, vb)  ==>  a > va OR (a = va AND b > vb)"""
+    condicoes = []
+    for i, coluna in enumerate(colunas):
+        iguais = [c == v for c, v in zip(colunas[:i], valores[:i])]
+        condicoes.append(and_(*iguais, coluna > valores[i]))
+    return or_(*condicoes)
+
+
+def _converter_valores(colunas: list, valores: list) -> list:
+    if len(valores) != len(colunas):
+        raise HTTPException(status_code=400, detail="Cursor de paginação inválido")
+    try:
+        return [
+            datetime.fromisoformat(v) if v is not None and isinstance(c.type, DateTime) else v
+            for c, v in zip(colunas, valores)
+        ]
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Cursor de paginação inválido")
+
+
+def _a_partir_do_cursor(query, colunas: list, pagina: Pagina):
+    """Filtro keyset + ordenação + limite (um item a mais, só para saber se há próxima página)."""
+    if pagina.cursor:
+        valores = _converter_valores(colunas, pagina.contexto["k"])
+        query = query.filter(_depois_de(colunas, valores))
+    return query.order_by(*colunas).limit(pagina.limite + 1)
+
+
+def _cortar_pagina(itens: list, colunas: list, pagina: Pagina, chave, contexto: dict):
+    proximo = None
+    if len(itens) > pagina.limite:
+        itens = itens[:pagina.limite]
+        ultimo = itens[-1]
+        valores = chave(ultimo) if chave else [getattr(ultimo, c.key) for c in colunas]
+        proximo = codificar_cursor({"k": list(valores), **contexto})
+    return itens, proximo
+
+
+def paginar(query, colunas: list, pagina: Pagina, chave=None, **contexto):
+    """
+    Aplica ordenação + keyset em `query` e busca no máximo `pagina.limite` itens.
+
+    - `colunas`: chave de ordenação única, ex.: [Viagem.horario_partida, Viagem.id]
+    - `chave`: extrai os valores dessas colunas de um item (padrão: atributos de mesmo nome)
+    - `contexto`: dados extras guardados no cursor para as próximas páginas
+
+    Retorna (itens, next_cursor), com next_cursor = None na última página.
+    """
+    itens = _a_partir_do_cursor(query, colunas, pagina).all()
+    return _cortar_pagina(itens, colunas, pagina, chave, contexto)
+
+
+async def paginar_async(db, consulta, colunas: list, pagina: Pagina, chave=None, **contexto):
+    """`paginar` para as rotas `async def`: `consulta` é um `select()` de uma entidade, executado com `executar`."""
+    resultado = await executar(db, _a_partir_do_cursor(consulta, colunas, pagina))
+    return _cortar_pagina(resultado.scalars().all(), colunas, pagina, chave, contexto)
+
+
+def alteracoes_depois_de(query, colunas: list, posicao: list, limite: int):
+    """
+    Versão da paginação usada na sincronização: busca até `limite` itens depois de
+    `posicao` (valores das `colunas` vindos do token, ou None para começar do início).
+
+    Retorna (itens, ultima_posicao, tem_mais); `ultima_posicao` fica igual à
+    recebida quando não há nada novo.
+    """
+    if posicao is not None:
+        posicao = _converter_valores(colunas, posicao)
+        query = query.filter(_depois_de(colunas, posicao))
+
+    itens = query.order_by(*colunas).limit(limite + 1).all()
+    tem_mais = len(itens) > limite
+    itens = itens[:limite]
+    if itens:
+        posicao = [getattr(itens[-1], c.key) for c in colunas]
+    return itens, posicao, tem_mais
+
+
+def resposta_paginada(itens: list, proximo: str) -> dict:
+    return {"itens": itens, "next_cursor": proximo}
@@ -1,32 +1,34 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from sqlalchemy import event, select, update, delete
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from jose import jwt, JWTError
-from passlib.context import CryptContext
-import os, shutil
+import hashlib
+import secrets
 
-from ..db import get_db
+from ..db import get_db, consultar
 from .. import models, schemas
-from ..config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
+from ..senhas import gerar_hash, verificar_senha
+from ..cache import CacheTTL
+from ..armazenamento import salvar_upload
+from ..config import (
+    SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS,
+    CACHE_USUARIOS_TTL_SEGUNDOS, CACHE_USUARIOS_TAMANHO,
+)
 
 router = APIRouter(prefix="/auth", tags=["Autenticação"])
 
 # -------------------------------
 # Segurança / Criptografia
 # -------------------------------
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hash/verificação de senha ficam em ..senhas (pool de processos). Login e registro
+# são `async def`: aguardam o bcrypt sem ocupar thread e só mandam para o threadpool
+# os trechos que usam o banco (Session síncrona) ou copiam o upload.
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 
-def gerar_hash(senha: str) -> str:
-    return pwd_context.hash(senha)
-
-
-def verificar_senha(senha: str, senha_hash: str) -> bool:
-    return pwd_context.verify(senha, senha_hash)
-
-
 def criar_token(data: dict, expires_minutes: int = ACCESS_TOKEN_EXPIRE_MINUTES) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=expires_minutes)
@@ -34,40 +36,154 @@ def criar_token(data: dict, expires_minutes: int = ACCESS_TOKEN_EXPIRE_MINUTES)
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
+# -------------------------------
+# Refresh tokens
+# -------------------------------
+# Token opaco e aleatório; no banco fica só o SHA-256 (busca direta pelo índice,
+# sem bcrypt: o token já tem 256 bits de entropia). Cada uso troca o token por
+# um novo da mesma família; se um token já trocado aparecer de novo, alguém o
+# copiou, e a família inteira é revogada.
+def _hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def emitir_refresh_token(db: Session, usuario_id: int, familia: str = None) -> str:
+    """Cria um refresh token (sem commit). Sem `familia`, inicia uma nova sessão."""
+    token = secrets.token_urlsafe(32)
+    agora = datetime.utcnow()
+    db.add(models.RefreshToken(
+        usuario_id=usuario_id,
+        token_hash=_hash_refresh_token(token),
+        familia=familia or secrets.token_hex(16),
+        criado_em=agora,
+        expira_em=agora + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    return token
+
+
+def _revogar_familia(db: Session, familia: str) -> None:
+    db.execute(
+        update(models.RefreshToken)
+        .where(models.RefreshToken.familia == familia, models.RefreshToken.revogado_em.is_(None))
+        .values(revogado_em=datetime.utcnow())
+    )
+
+
+def _resposta_token(usuario, refresh_token: str) -> dict:
+    return {
+        "access_token": criar_token({"sub": usuario.email, "id": usuario.id, "tipo": usuario.tipo}),
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+        "usuario": {"id": usuario.id, "nome": usuario.nome, "email": usuario.email, "tipo": usuario.tipo},
+    }
+
+
+# -------------------------------
+# Cache do usuário autenticado
+# -------------------------------
+# Guarda um "retrato" leve do usuário (id, nome, email, tipo) por id,
+# para não consultar a tabela usuarios em toda requisição autenticada.
+cache_usuarios = CacheTTL(CACHE_USUARIOS_TAMANHO, CACHE_USUARIOS_TTL_SEGUNDOS)
+
+
+@event.listens_for(models.Usuario, "after_update")
+@event.listens_for(models.Usuario, "after_delete")
+def _invalidar_cache_usuario(mapper, connection, usuario):
+    cache_usuarios.remover(usuario.id)
+
+
+def _retrato(usuario) -> schemas.UsuarioResponse:
+    retrato = schemas.UsuarioResponse(id=usuario.id, nome=usuario.nome, email=usuario.email, tipo=usuario.tipo)
+    cache_usuarios.guardar(retrato.id, retrato)
+    return retrato
+
+
+def _carregar_usuario(claims: dict, db: Session) -> schemas.UsuarioResponse:
+    usuario = cache_usuarios.obter(claims["id"])
+    if usuario is None:
+        encontrado = db.get(models.Usuario, claims["id"])
+        if not encontrado:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuário não encontrado")
+        usuario = _retrato(encontrado)
+    return usuario
+
+
+async def _carregar_usuario_async(claims: dict) -> schemas.UsuarioResponse:
+    """Igual a `_carregar_usuario`, para as dependências async (conexão própria, ver `consultar`)."""
+    usuario = cache_usuarios.obter(claims["id"])
+    if usuario is None:
+        consulta = (
+            select(models.Usuario.id, models.Usuario.nome, models.Usuario.email, models.Usuario.tipo)
+            .where(models.Usuario.id == claims["id"])
+        )
+        linhas = await consultar(consulta)
+        if not linhas:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuário não encontrado")
+        usuario = _retrato(linhas[0])
+    return usuario
+
+
 # -------------------------------
 # Dependências de autenticação
 # -------------------------------
-def get_usuario_atual(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> models.Usuario:
+def get_claims(token: str = Depends(oauth2_scheme)) -> dict:
+    """Valida o JWT e devolve os dados (claims) que ele carrega: sub, id e tipo."""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email = payload.get("sub")
-        if email is None:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token inválido")
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token inválido")
-    usuario = db.query(models.Usuario).filter(models.Usuario.email == email).first()
-    if not usuario:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuário não encontrado")
-    return usuario
+    if payload.get("sub") is None or payload.get("id") is None or payload.get("tipo") is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token inválido")
+    return payload
+
 
+# Rodam em toda requisição autenticada: async nativas (a consulta só acontece sem cache)
+async def get_usuario_atual(claims: dict = Depends(get_claims)) -> schemas.UsuarioResponse:
+    return await _carregar_usuario_async(claims)
 
-def somente_motorista(usuario: models.Usuario = Depends(get_usuario_atual)) -> models.Usuario:
-    if usuario.tipo != "motorista":
+
+# As checagens de perfil usam o "tipo" do token (já verificado) antes de carregar o usuário
+async def somente_motorista(claims: dict = Depends(get_claims)) -> schemas.UsuarioResponse:
+    if claims["tipo"] != "motorista":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acesso permitido apenas a motoristas")
-    return usuario
+    return await _carregar_usuario_async(claims)
 
 
-def somente_passageiro(usuario: models.Usuario = Depends(get_usuario_atual)) -> models.Usuario:
-    if usuario.tipo != "passageiro":
+async def somente_passageiro(claims: dict = Depends(get_claims)) -> schemas.UsuarioResponse:
+    if claims["tipo"] != "passageiro":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acesso permitido apenas a passageiros")
-    return usuario
+    return await _carregar_usuario_async(claims)
 
 
 # -------------------------------
 # Rotas de autenticação
 # -------------------------------
+# Trechos com banco usados pelas rotas async (rodam no threadpool)
+def _buscar_por_email(db: Session, email: str):
+    return db.query(models.Usuario).filter(models.Usuario.email == email).first()
+
+
+def _salvar(db: Session, usuario) -> None:
+    db.add(usuario)
+    db.commit()
+
+
+def _abrir_sessao(db: Session, usuario_id: int) -> str:
+    # Aproveita o login para descartar sessões expiradas do usuário
+    db.execute(
+        delete(models.RefreshToken).where(
+            models.RefreshToken.usuario_id == usuario_id,
+            models.RefreshToken.expira_em < datetime.utcnow(),
+        )
+    )
+    refresh_token = emitir_refresh_token(db, usuario_id)
+    db.commit()
+    return refresh_token
+
+
 @router.post(
     "/registrar",
+    response_model=schemas.RegistroResponse,
     summary="Registrar novo usuário",
     description="""
     Permite criar um **motorista** ou **passageiro**.
@@ -76,7 +192,7 @@ def somente_passageiro(usuario: models.Usuario = Depends(get_usuario_atual)) ->
     - Motorista: além disso, precisa enviar CNH, modelo do carro, placa e documento escaneado.  
     """,
 )
-def registrar(
+async def registrar(
     nome: str = Form(..., description="Nome completo do usuário", example="Carlos Costa"),
     email: str = Form(..., description="E-mail de login", example="carloscosta@rotacerta.com"),
     senha: str = Form(..., description="Senha de acesso", example="123456"),
@@ -88,8 +204,7 @@ def registrar(
     documento: UploadFile = File(None, description="Documento do motorista em PDF ou imagem"),
     db: Session = Depends(get_db)
 ):
-    existente = db.query(models.Usuario).filter(models.Usuario.email == email).first()
-    if existente:
+    if await run_in_threadpool(_buscar_por_email, db, email):
         raise HTTPException(status_code=400, detail="E-mail já cadastrado")
 
     documento_url = None
@@ -99,17 +214,12 @@ def registrar(
                 status_code=400,
                 detail="Motorista precisa informar CNH, modelo do carro, placa e enviar documento"
             )
-        pasta = "uploads/documentos"
-        os.makedirs(pasta, exist_ok=True)
-        caminho_arquivo = os.path.join(pasta, documento.filename)
-        with open(caminho_arquivo, "wb") as buffer:
-            shutil.copyfileobj(documento.file, buffer)
-        documento_url = caminho_arquivo
+        documento_url = await run_in_threadpool(salvar_upload, documento, "documentos")
 
     user = models.Usuario(
         nome=nome,
         email=email,
-        senha_hash=gerar_hash(senha),
+        senha_hash=await gerar_hash(senha),
         telefone=telefone,
         tipo=tipo.value,
         numero_cnh=numero_cnh,
@@ -117,9 +227,7 @@ def registrar(
         placa_carro=placa_carro,
         documento_url=documento_url
     )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    await run_in_threadpool(_salvar, db, user)
 
     return {
         "mensagem": "Usuário registrado com sucesso",
@@ -139,19 +247,85 @@ def registrar(
 
 @router.post(
     "/login",
+    response_model=schemas.TokenResponse,
     summary="Login do usuário",
     description="Faz login com **e-mail e senha** e retorna um token JWT para autenticação.",
 )
-def login(
+async def login(
     form: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
-    usuario = db.query(models.Usuario).filter(models.Usuario.email == form.username).first()
-    if not usuario or not verificar_senha(form.password, usuario.senha_hash):
+    usuario = await run_in_threadpool(_buscar_por_email, db, form.username)
+    if not usuario or not await verificar_senha(form.password, usuario.senha_hash):
         raise HTTPException(status_code=401, detail="Credenciais inválidas")
-    token = criar_token({"sub": usuario.email, "id": usuario.id, "tipo": usuario.tipo})
-    return {
-        "access_token": token,
-        "token_type": "bearer",
-        "usuario": {"id": usuario.id, "nome": usuario.nome, "email": usuario.email, "tipo": usuario.tipo}
-    }
+
+    refresh_token = await run_in_threadpool(_abrir_sessao, db, usuario.id)
+    return _resposta_token(usuario, refresh_token)
+
+
+@router.get(
+    "/me",
+    response_model=schemas.UsuarioResponse,
+    summary="Dados do usuário autenticado",
+    description="Retorna id, nome, e-mail e tipo do dono do token (sem consultar o banco quando o usuário está em cache).",
+)
+def usuario_autenticado(usuario = Depends(get_usuario_atual)):
+    return usuario
+
+
+@router.post(
+    "/refresh",
+    response_model=schemas.TokenResponse,
+    summary="Renovar o token de acesso",
+    description="""
+    Troca um **refresh token** por um novo access token, sem reenviar a senha.
+
+    - Cada refresh token só pode ser usado uma vez: a resposta traz um novo.  
+    - Reusar um token já trocado encerra a sessão inteira (todos os tokens daquele login).  
+    """,
+)
+def renovar_token(
+    refresh_token: str = Form(..., description="Refresh token recebido no login ou na última renovação"),
+    db: Session = Depends(get_db)
+):
+    registro = db.query(models.RefreshToken).filter(
+        models.RefreshToken.token_hash == _hash_refresh_token(refresh_token)
+    ).first()
+    agora = datetime.utcnow()
+    if not registro or registro.revogado_em is not None or registro.expira_em < agora:
+        raise HTTPException(status_code=401, detail="Refresh token inválido ou expirado")
+
+    # Marca como usado só se ninguém usou antes (duas renovações simultâneas: só uma vence)
+    marcado = db.execute(
+        update(models.RefreshToken)
+        .where(models.RefreshToken.id == registro.id, models.RefreshToken.usado_em.is_(None))
+        .values(usado_em=agora)
+    ).rowcount
+    if not marcado:
+        _revogar_familia(db, registro.familia)
+        db.commit()
+        raise HTTPException(status_code=401, detail="Refresh token reutilizado; faça login novamente")
+
+    usuario = _carregar_usuario({"id": registro.usuario_id}, db)
+    novo = emitir_refresh_token(db, registro.usuario_id, registro.familia)
+    db.commit()
+    return _resposta_token(usuario, novo)
+
+
+@router.post(
+    "/logout",
+    response_model=schemas.MensagemResponse,
+    summary="Encerrar a sessão",
+    description="Revoga o refresh token informado e todos os outros gerados a partir do mesmo login.",
+)
+def logout(
+    refresh_token: str = Form(..., description="Refresh token da sessão a encerrar"),
+    db: Session = Depends(get_db)
+):
+    registro = db.query(models.RefreshToken).filter(
+        models.RefreshToken.token_hash == _hash_refresh_token(refresh_token)
+    ).first()
+    if registro:
+        _revogar_familia(db, registro.familia)
+        db.commit()
+    return {"mensagem": "Sessão encerrada"}
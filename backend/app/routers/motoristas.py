@@ -1,65 +1,35 @@
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from .. import models
+from .. import models, schemas
 from ..db import get_db
-import shutil
-import os
+from ..avaliacoes import registrar_nota
+from ..paginacao import Pagina, paginar, resposta_paginada
 
 router = APIRouter(prefix="/motoristas", tags=["Motoristas"])
 
-UPLOAD_DIR = "uploads/documentos_motoristas"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-
-
-@router.post(
-    "/",
-    summary="Cadastrar motorista",
-    description="""
-    Permite o **cadastro de um motorista** com os dados do carro e upload de documento (CNH).  
-
-    - Os arquivos enviados são salvos em `uploads/documentos_motoristas/`.  
-    - Retorna os dados completos do motorista cadastrado.  
-    """,
-)
-def criar_motorista(
-    nome: str,
-    telefone: str,
-    numero_cnh: str,
-    modelo_carro: str,
-    placa_carro: str,
-    documento: UploadFile = File(...),
-    db: Session = Depends(get_db)
-):
-    # Salvar documento enviado
-    doc_path = os.path.join(UPLOAD_DIR, documento.filename)
-    with open(doc_path, "wb") as buffer:
-        shutil.copyfileobj(documento.file, buffer)
-
-    motorista = models.Motorista(
-        nome=nome,
-        telefone=telefone,
-        numero_cnh=numero_cnh,
-        modelo_carro=modelo_carro,
-        placa_carro=placa_carro,
-        documento_url=doc_path
-    )
-    db.add(motorista)
-    db.commit()
-    db.refresh(motorista)
-    return motorista
-
 
 @router.get(
     "/",
+    response_model=schemas.PaginaResponse[schemas.MotoristaListagem],
     summary="Listar motoristas",
-    description="Retorna a lista de **todos os motoristas cadastrados** no sistema."
+    description="Retorna a lista de **motoristas cadastrados** no sistema, paginada por `id` (use `next_cursor`)."
 )
-def listar_motoristas(db: Session = Depends(get_db)):
-    return db.query(models.Usuario).filter(models.Usuario.tipo == "motorista").all()
+def listar_motoristas(pagina: Pagina = Depends(), db: Session = Depends(get_db)):
+    # Só as colunas exibidas (nada de senha_hash, CNH ou caminho de documento)
+    query = db.query(
+        models.Usuario.id,
+        models.Usuario.nome,
+        models.Usuario.email,
+        models.Usuario.modelo_carro,
+        models.Usuario.avaliacao_media,
+    ).filter(models.Usuario.tipo == "motorista")
+    usuarios, proximo = paginar(query, [models.Usuario.id], pagina)
+    return resposta_paginada(usuarios, proximo)
 
 
 @router.post(
     "/{motorista_id}/avaliar",
+    response_model=schemas.AvaliacaoMotoristaRegistrada,
     summary="Avaliar motorista",
     description="""
     Permite que um passageiro **avalie um motorista** após uma viagem.  
@@ -70,12 +40,16 @@ def listar_motoristas(db: Session = Depends(get_db)):
 )
 def avaliar_motorista(
     motorista_id: int,
-    nota: float,
+    nota: float = Query(..., ge=0, le=5),
     comentario: str = None,
     passageiro_id: int = None,
     db: Session = Depends(get_db)
 ):
-    motorista = db.query(models.Motorista).filter(models.Motorista.id == motorista_id).first()
+    motorista = (
+        db.query(models.Usuario.id)
+        .filter(models.Usuario.id == motorista_id, models.Usuario.tipo == "motorista")
+        .first()
+    )
     if not motorista:
         raise HTTPException(status_code=404, detail="Motorista não encontrado")
 
@@ -86,6 +60,6 @@ def avaliar_motorista(
         comentario=comentario
     )
     db.add(avaliacao)
+    registrar_nota(db, motorista_id, nota)
     db.commit()
-    db.refresh(avaliacao)
     return {"mensagem": "Avaliação registrada com sucesso", "avaliacao": avaliacao}
@@ -1,49 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from .. import models
+from .. import models, schemas
 from ..db import get_db
+from ..avaliacoes import registrar_nota
+from ..paginacao import Pagina, paginar, resposta_paginada
 
 router = APIRouter(prefix="/passageiros", tags=["Passageiros"])
 
 
-@router.post(
-    "/",
-    summary="Cadastrar passageiro",
-    description="""
-    Permite o **cadastro de um passageiro** no sistema.  
-
-    - Deve informar nome, telefone e e-mail.  
-    - Retorna os dados completos do passageiro cadastrado.  
-    """
-)
-def criar_passageiro(
-    nome: str,
-    telefone: str,
-    email: str,
-    db: Session = Depends(get_db)
-):
-    passageiro = models.Passageiro(
-        nome=nome,
-        telefone=telefone,
-        email=email
-    )
-    db.add(passageiro)
-    db.commit()
-    db.refresh(passageiro)
-    return passageiro
-
-
 @router.get(
     "/",
+    response_model=schemas.PaginaResponse[schemas.PassageiroListagem],
     summary="Listar passageiros",
-    description="Retorna a lista de **todos os passageiros cadastrados** no sistema."
+    description="Retorna a lista de **passageiros cadastrados** no sistema, paginada por `id` (use `next_cursor`)."
 )
-def listar_passageiros(db: Session = Depends(get_db)):
-    return db.query(models.Usuario).filter(models.Usuario.tipo == "passageiro").all()
+def listar_passageiros(pagina: Pagina = Depends(), db: Session = Depends(get_db)):
+    query = db.query(models.Usuario.id, models.Usuario.nome, models.Usuario.email).filter(
+        models.Usuario.tipo == "passageiro"
+    )
+    usuarios, proximo = paginar(query, [models.Usuario.id], pagina)
+    return resposta_paginada(usuarios, proximo)
 
 
 @router.post(
     "/{passageiro_id}/avaliar_motorista",
+    response_model=schemas.AvaliacaoMotoristaRegistrada,
     summary="Passageiro avalia motorista",
     description="""
     Permite que um passageiro **avalie um motorista** após uma viagem.  
@@ -56,15 +37,23 @@ def listar_passageiros(db: Session = Depends(get_db)):
 def avaliar_motorista(
     passageiro_id: int,
     motorista_id: int,
-    nota: float,
+    nota: float = Query(..., ge=0, le=5),
     comentario: str = None,
     db: Session = Depends(get_db)
 ):
-    passageiro = db.query(models.Passageiro).filter(models.Passageiro.id == passageiro_id).first()
+    passageiro = (
+        db.query(models.Usuario.id)
+        .filter(models.Usuario.id == passageiro_id, models.Usuario.tipo == "passageiro")
+        .first()
+    )
     if not passageiro:
         raise HTTPException(status_code=404, detail="Passageiro não encontrado")
 
-    motorista = db.query(models.Motorista).filter(models.Motorista.id == motorista_id).first()
+    motorista = (
+        db.query(models.Usuario.id)
+        .filter(models.Usuario.id == motorista_id, models.Usuario.tipo == "motorista")
+        .first()
+    )
     if not motorista:
         raise HTTPException(status_code=404, detail="Motorista não encontrado")
 
@@ -75,6 +64,6 @@ def avaliar_motorista(
         comentario=comentario
     )
     db.add(avaliacao)
+    registrar_nota(db, motorista_id, nota)
     db.commit()
-    db.refresh(avaliacao)
     return {"mensagem": "Avaliação registrada com sucesso", "avaliacao": avaliacao}
@@ -1,15 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import select
+from sqlalchemy.orm import Session, contains_eager
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime
-from .. import models
-from ..db import get_db
+from .. import models, schemas
+from ..db import get_db, get_db_configurado, suporta_db_async
+from ..avaliacoes import registrar_nota
+from ..busca import invalidar_busca
+from ..paginacao import Pagina, paginar_async, resposta_paginada
+from ..exportacao import formato_exportacao, exportar
+from ..config import EXPORTACAO_LOTE
 from .auth import somente_passageiro, somente_motorista, get_usuario_atual
 
 router = APIRouter(prefix="/reservas", tags=["Reservas"])
 
 
+def _invalidar_busca_da_viagem(db: Session, viagem_id: int) -> None:
+    """As vagas da viagem mudaram: descarta as buscas em cache do dia dela."""
+    horario = db.query(models.Viagem.horario_partida).filter(models.Viagem.id == viagem_id).scalar()
+    invalidar_busca(horario)
+
+
 @router.post(
     "/",
+    response_model=schemas.ReservaCriadaResponse,
     summary="Criar reserva de viagem",
     description="""
     Permite que um **passageiro** faça uma reserva em uma viagem.  
@@ -19,16 +33,33 @@ router = APIRouter(prefix="/reservas", tags=["Reservas"])
     - Retorna os detalhes da reserva criada.  
     """
 )
+@suporta_db_async
 def criar_reserva(
     viagem_id: int,
     db: Session = Depends(get_db),
     usuario = Depends(somente_passageiro)
 ):
-    viagem = db.query(models.Viagem).filter(models.Viagem.id == viagem_id).first()
-    if not viagem:
-        raise HTTPException(status_code=404, detail="Viagem não encontrada")
-
-    if viagem.vagas_disponiveis <= 0:
+    # Decremento condicional e atômico: sob concorrência, só uma transação
+    # consegue pegar a última vaga (o banco trava a linha durante o UPDATE)
+    vaga_reservada = (
+        db.query(models.Viagem)
+        .filter(
+            models.Viagem.id == viagem_id,
+            models.Viagem.status == "agendada",
+            models.Viagem.vagas_disponiveis > 0,
+        )
+        .update(
+            {models.Viagem.vagas_disponiveis: models.Viagem.vagas_disponiveis - 1},
+            synchronize_session=False
+        )
+    )
+    if not vaga_reservada:
+        db.rollback()
+        viagem = db.query(models.Viagem.status).filter(models.Viagem.id == viagem_id).first()
+        if not viagem:
+            raise HTTPException(status_code=404, detail="Viagem não encontrada")
+        if viagem.status != "agendada":
+            raise HTTPException(status_code=400, detail="Esta viagem não está mais disponível para reservas")
         raise HTTPException(status_code=400, detail="Não há vagas disponíveis")
 
     reserva = models.Reserva(
@@ -37,17 +68,22 @@ def criar_reserva(
         status="confirmada",
         horario_confirmacao=datetime.utcnow()
     )
-    viagem.vagas_disponiveis -= 1
-
     db.add(reserva)
-    db.commit()
-    db.refresh(reserva)
+
+    # Reserva + decremento na mesma transação: se a reserva falhar, a vaga volta
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Você já possui uma reserva confirmada nesta viagem")
+    _invalidar_busca_da_viagem(db, viagem_id)
 
     return {"mensagem": "Reserva realizada com sucesso", "reserva": reserva}
 
 
 @router.put(
     "/{reserva_id}/cancelar",
+    response_model=schemas.MensagemResponse,
     summary="Cancelar reserva (passageiro)",
     description="""
     Permite que o **passageiro** cancele a própria reserva.  
@@ -57,6 +93,7 @@ def criar_reserva(
     - Impede múltiplos cancelamentos da mesma reserva.  
     """
 )
+@suporta_db_async
 def cancelar_reserva(
     reserva_id: int,
     db: Session = Depends(get_db),
@@ -69,32 +106,46 @@ def cancelar_reserva(
     if reserva.passageiro_id != usuario.id:
         raise HTTPException(status_code=403, detail="Você só pode cancelar suas próprias reservas")
 
-    # 🔹 impede cancelar duas vezes
-    if reserva.status == "cancelada":
+    # 🔹 impede cancelar duas vezes (condição no próprio UPDATE, segura sob concorrência)
+    cancelada = (
+        db.query(models.Reserva)
+        .filter(models.Reserva.id == reserva_id, models.Reserva.status != "cancelada")
+        .update(
+            {
+                models.Reserva.status: "cancelada",
+                models.Reserva.horario_confirmacao: datetime.utcnow()  # registra quando foi cancelada
+            },
+            synchronize_session=False
+        )
+    )
+    if not cancelada:
+        db.rollback()
         raise HTTPException(status_code=400, detail="Essa reserva já foi cancelada")
 
-    # devolve vaga apenas 1 vez
-    viagem = reserva.viagem
-    viagem.vagas_disponiveis += 1
-
-    reserva.status = "cancelada"
-    reserva.horario_confirmacao = datetime.utcnow()  # registra quando foi cancelada
+    # devolve vaga apenas 1 vez, com incremento atômico no banco
+    db.query(models.Viagem).filter(models.Viagem.id == reserva.viagem_id).update(
+        {models.Viagem.vagas_disponiveis: models.Viagem.vagas_disponiveis + 1},
+        synchronize_session=False
+    )
 
     db.commit()
-    db.refresh(reserva)
+    _invalidar_busca_da_viagem(db, reserva.viagem_id)
     return {"mensagem": "Reserva cancelada com sucesso"}
 
 
 @router.put(
     "/{reserva_id}/status",
+    response_model=schemas.MensagemResponse,
     summary="Alterar status da reserva (motorista)",
     description="""
     Permite que o **motorista** altere o status de uma reserva em sua viagem.  
 
     - Status permitidos: `confirmada` ou `cancelada`.  
     - Apenas o motorista da viagem pode alterar.  
+    - Cancelar devolve a vaga à viagem; reconfirmar ocupa uma vaga (400 se a viagem estiver lotada).  
     """
 )
+@suporta_db_async
 def alterar_status_reserva(
     reserva_id: int,
     status: str,
@@ -111,15 +162,63 @@ def alterar_status_reserva(
     if status not in ["confirmada", "cancelada"]:
         raise HTTPException(status_code=400, detail="Status inválido")
 
-    reserva.status = status
+    # Troca o status só se ele mudar (condição no próprio UPDATE, segura sob
+    # concorrência): a vaga é devolvida/ocupada uma única vez
+    try:
+        alterada = (
+            db.query(models.Reserva)
+            .filter(models.Reserva.id == reserva_id, models.Reserva.status != status)
+            .update(
+                {models.Reserva.status: status, models.Reserva.horario_confirmacao: datetime.utcnow()},
+                synchronize_session=False
+            )
+        )
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="O passageiro já possui outra reserva confirmada nesta viagem")
+    if not alterada:
+        db.rollback()
+        return {"mensagem": "Status da reserva atualizado com sucesso"}
+
+    vagas = db.query(models.Viagem).filter(models.Viagem.id == reserva.viagem_id)
+    if status == "cancelada":
+        # devolve a vaga com incremento atômico, como em cancelar_reserva
+        vagas.update(
+            {models.Viagem.vagas_disponiveis: models.Viagem.vagas_disponiveis + 1},
+            synchronize_session=False
+        )
+    else:
+        # reconfirmar ocupa uma vaga: mesmo decremento condicional de criar_reserva
+        vaga_reservada = (
+            vagas.filter(models.Viagem.status == "agendada", models.Viagem.vagas_disponiveis > 0)
+            .update(
+                {models.Viagem.vagas_disponiveis: models.Viagem.vagas_disponiveis - 1},
+                synchronize_session=False
+            )
+        )
+        if not vaga_reservada:
+            db.rollback()
+            raise HTTPException(status_code=400, detail="Não há vagas disponíveis para reconfirmar esta reserva")
+
     db.commit()
-    db.refresh(reserva)
+    _invalidar_busca_da_viagem(db, reserva.viagem_id)
 
     return {"mensagem": "Status da reserva atualizado com sucesso"}
 
 
+def _participantes_da_reserva(db: Session, reserva_id: int):
+    """Passageiro e motorista de uma reserva em uma consulta (sem carregar os objetos)."""
+    return (
+        db.query(models.Reserva.passageiro_id, models.Viagem.motorista_id)
+        .join(models.Reserva.viagem)
+        .filter(models.Reserva.id == reserva_id)
+        .first()
+    )
+
+
 @router.post(
     "/{reserva_id}/avaliar_motorista",
+    response_model=schemas.AvaliacaoMotoristaRegistrada,
     summary="Avaliar motorista (passageiro)",
     description="""
     Após a viagem, o passageiro pode **avaliar o motorista**.  
@@ -128,32 +227,34 @@ def alterar_status_reserva(
     - `comentario` é opcional.  
     """
 )
+@suporta_db_async
 def avaliar_motorista(
     reserva_id: int,
-    nota: float,
+    nota: float = Query(..., ge=0, le=5),
     comentario: str = None,
     db: Session = Depends(get_db),
     usuario = Depends(somente_passageiro)
 ):
-    reserva = db.query(models.Reserva).filter(models.Reserva.id == reserva_id).first()
+    reserva = _participantes_da_reserva(db, reserva_id)
     if not reserva or reserva.passageiro_id != usuario.id:
         raise HTTPException(status_code=404, detail="Reserva inválida")
 
     avaliacao = models.AvaliacaoMotorista(
-        motorista_id=reserva.viagem.motorista_id,
+        motorista_id=reserva.motorista_id,
         passageiro_id=usuario.id,
         nota=nota,
         comentario=comentario
     )
     db.add(avaliacao)
+    registrar_nota(db, avaliacao.motorista_id, nota)
     db.commit()
-    db.refresh(avaliacao)
 
     return {"mensagem": "Avaliação registrada com sucesso", "avaliacao": avaliacao}
 
 
 @router.post(
     "/{reserva_id}/avaliar_passageiro",
+    response_model=schemas.AvaliacaoPassageiroRegistrada,
     summary="Avaliar passageiro (motorista)",
     description="""
     Após a viagem, o motorista pode **avaliar o passageiro**.  
@@ -162,15 +263,16 @@ def avaliar_motorista(
     - `comentario` é opcional.  
     """
 )
+@suporta_db_async
 def avaliar_passageiro(
     reserva_id: int,
-    nota: float,
+    nota: float = Query(..., ge=0, le=5),
     comentario: str = None,
     db: Session = Depends(get_db),
     usuario = Depends(somente_motorista)
 ):
-    reserva = db.query(models.Reserva).filter(models.Reserva.id == reserva_id).first()
-    if not reserva or reserva.viagem.motorista_id != usuario.id:
+    reserva = _participantes_da_reserva(db, reserva_id)
+    if not reserva or reserva.motorista_id != usuario.id:
         raise HTTPException(status_code=404, detail="Reserva inválida")
 
     avaliacao = models.AvaliacaoPassageiro(
@@ -180,29 +282,61 @@ def avaliar_passageiro(
         comentario=comentario
     )
     db.add(avaliacao)
+    registrar_nota(db, avaliacao.passageiro_id, nota)
     db.commit()
-    db.refresh(avaliacao)
 
     return {"mensagem": "Avaliação registrada com sucesso", "avaliacao": avaliacao}
 
 
 @router.get(
     "/minhas",
+    response_model=schemas.PaginaResponse[schemas.MinhaReserva],
     summary="Listar minhas reservas (passageiro)",
-    description="Permite que o passageiro logado veja todas as viagens que ele reservou.",
+    description="Permite que o passageiro logado veja as viagens que ele reservou, paginadas por horário de partida. Com `Accept: application/x-ndjson` ou `text/csv`, exporta todas em streaming.",
 )
-def listar_minhas_reservas(
-    db: Session = Depends(get_db),
+async def listar_minhas_reservas(
+    request: Request,
+    pagina: Pagina = Depends(),
+    db = Depends(get_db_configurado),
     usuario = Depends(somente_passageiro)
 ):
-    reservas = (
-        db.query(models.Reserva)
-        .join(models.Viagem, models.Reserva.viagem_id == models.Viagem.id)
+    formato = formato_exportacao(request)
+    if formato:
+        def linhas(sessao):
+            query = (
+                sessao.query(
+                    models.Reserva.id.label("reserva_id"),
+                    models.Viagem.id.label("viagem_id"),
+                    models.Viagem.origem,
+                    models.Viagem.destino,
+                    models.Viagem.horario_partida,
+                    models.Reserva.status.label("status_reserva"),
+                    models.Viagem.status.label("status_viagem"),
+                )
+                .join(models.Reserva.viagem)
+                .filter(models.Reserva.passageiro_id == usuario.id)
+                .order_by(models.Viagem.horario_partida, models.Reserva.id)
+            )
+            return (linha._asdict() for linha in query.yield_per(EXPORTACAO_LOTE))
+
+        return exportar(formato, "reservas", linhas)
+
+    # contains_eager carrega r.viagem a partir do próprio JOIN (evita N+1)
+    query = (
+        select(models.Reserva)
+        .join(models.Reserva.viagem)
+        .options(contains_eager(models.Reserva.viagem))
         .filter(models.Reserva.passageiro_id == usuario.id)
-        .all()
+    )
+    reservas, proximo = await paginar_async(
+        db,
+        query,
+        [models.Viagem.horario_partida, models.Reserva.id],
+        pagina,
+        chave=lambda r: (r.viagem.horario_partida, r.id),
     )
 
-    return [
+    return resposta_paginada([
         {
             "reserva_id": r.id,
             "viagem_id": r.viagem.id,
@@ -213,4 +347,4 @@ def listar_minhas_reservas(
             "status_viagem": r.viagem.status    # Status da viagem (agendada, cancelada, etc)
         }
         for r in reservas
-    ]
+    ], proximo)
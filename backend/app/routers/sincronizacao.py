@@ -0,0 +1,104 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from .. import models, schemas
+from ..db import get_db, suporta_db_async
+from ..paginacao import codificar_cursor, decodificar_cursor, alteracoes_depois_de
+from ..config import SYNC_LIMITE_PADRAO, SYNC_LIMITE_MAXIMO, SYNC_MARGEM_SEGUNDOS
+from .auth import get_usuario_atual
+
+router = APIRouter(prefix="/sync", tags=["Sincronização"])
+
+V, R, T, E = models.Viagem, models.Reserva, models.TicketSuporte, models.Exclusao
+
+
+# --------------------------------
+# Token `since`
+# --------------------------------
+# Guarda, para cada lista (viagens, reservas, tickets, exclusões), a posição
+# (atualizado_em, id) da última linha já entregue ao cliente.
+def _ler_since(since: str) -> list:
+    posicoes = decodificar_cursor(since)["k"]
+    if len(posicoes) != 4 or any(p is not None and not isinstance(p, list) for p in posicoes):
+        raise HTTPException(status_code=400, detail="Token de sincronização inválido")
+    return posicoes
+
+
+def _posicao_final(posicao: list, tem_mais: bool, corte: datetime):
+    """
+    Lista em dia: recua a posição até o `corte`, para que linhas de transações
+    que ainda não tinham sido confirmadas apareçam no próximo sync.
+    """
+    if tem_mais or posicao is None:
+        return posicao
+    return min(posicao, [corte, 0])
+
+
+@router.get(
+    "/",
+    response_model=schemas.SyncResponse,
+    summary="Sincronização incremental",
+    description="""
+    Devolve só o que mudou desde a última sincronização, para o app funcionar com
+    conexão ruim sem baixar as listagens completas a cada tela.
+
+    - Sem `since`: envia tudo (viagens, reservas e tickets do usuário).
+    - Guarde `next_since` e envie como `?since=` na próxima vez.
+    - Se `tem_mais` vier `true`, chame de novo com o `next_since` recebido.
+    - `exclusoes` lista as linhas apagadas (`tabela` + `registro_id`) que o cliente deve remover.
+    - A mesma linha pode vir mais de uma vez; o cliente deve apenas sobrescrever pelo `id`.
+    """
+)
+@suporta_db_async
+def sincronizar(
+    since: str = Query(None, description="Valor de `next_since` da sincronização anterior"),
+    limite: int = Query(
+        SYNC_LIMITE_PADRAO, ge=1, le=SYNC_LIMITE_MAXIMO,
+        description=f"Máximo de linhas de cada lista por chamada (máximo {SYNC_LIMITE_MAXIMO})"
+    ),
+    db: Session = Depends(get_db),
+    usuario = Depends(get_usuario_atual)
+):
+    corte = datetime.utcnow() - timedelta(seconds=SYNC_MARGEM_SEGUNDOS)
+    if since:
+        pos_viagens, pos_reservas, pos_tickets, pos_exclusoes = _ler_since(since)
+    else:
+        # Cliente novo não tem nada para apagar: exclusões só a partir de agora
+        pos_viagens = pos_reservas = pos_tickets = None
+        pos_exclusoes = [corte.isoformat(), 0]
+
+    viagens, pos_viagens, mais_viagens = alteracoes_depois_de(
+        db.query(V.id, V.origem, V.destino, V.horario_partida, V.vagas_disponiveis, V.status,
+                 V.motorista_id, V.atualizado_em),
+        [V.atualizado_em, V.id], pos_viagens, limite
+    )
+    reservas, pos_reservas, mais_reservas = alteracoes_depois_de(
+        db.query(R.id, R.viagem_id, R.status, R.horario_confirmacao, R.atualizado_em)
+        .filter(R.passageiro_id == usuario.id),
+        [R.atualizado_em, R.id], pos_reservas, limite
+    )
+    tickets, pos_tickets, mais_tickets = alteracoes_depois_de(
+        db.query(*T.__table__.columns).filter(T.usuario_id == usuario.id),
+        [T.atualizado_em, T.id], pos_tickets, limite
+    )
+    exclusoes, pos_exclusoes, mais_exclusoes = alteracoes_depois_de(
+        db.query(E.tabela, E.registro_id, E.excluido_em, E.id)
+        .filter(or_(E.usuario_id.is_(None), E.usuario_id == usuario.id)),
+        [E.excluido_em, E.id], pos_exclusoes, limite
+    )
+
+    posicoes = [
+        _posicao_final(pos_viagens, mais_viagens, corte),
+        _posicao_final(pos_reservas, mais_reservas, corte),
+        _posicao_final(pos_tickets, mais_tickets, corte),
+        _posicao_final(pos_exclusoes, mais_exclusoes, corte),
+    ]
+    return {
+        "viagens": viagens,
+        "reservas": reservas,
+        "tickets": tickets,
+        "exclusoes": exclusoes,
+        "next_since": codificar_cursor({"k": posicoes}),
+        "tem_mais": mais_viagens or mais_reservas or mais_tickets or mais_exclusoes,
+    }
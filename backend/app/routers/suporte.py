@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from datetime import datetime
-from .. import models
-from ..db import get_db
+from .. import models, schemas
+from ..db import get_db, get_db_configurado, suporta_db_async
+from ..paginacao import Pagina, paginar_async, resposta_paginada
+from ..exportacao import formato_exportacao, exportar
+from ..config import EXPORTACAO_LOTE
 from .auth import get_usuario_atual
 
 router = APIRouter(prefix="/suporte", tags=["Suporte"])
@@ -10,6 +14,7 @@ router = APIRouter(prefix="/suporte", tags=["Suporte"])
 
 @router.post(
     "/",
+    response_model=schemas.TicketSuporteCriadoResponse,
     summary="Abrir ticket de suporte",
     description="""
     Permite que **qualquer usuário autenticado** abra um ticket de suporte.  
@@ -18,6 +23,7 @@ router = APIRouter(prefix="/suporte", tags=["Suporte"])
     - O ticket ficará com status **aberto** até ser respondido.  
     """
 )
+@suporta_db_async
 def abrir_ticket(
     assunto: str,
     mensagem: str,
@@ -33,31 +39,48 @@ def abrir_ticket(
     )
     db.add(ticket)
     db.commit()
-    db.refresh(ticket)
 
     return {"mensagem": "Ticket de suporte criado com sucesso", "ticket": ticket}
 
 
 @router.get(
     "/",
+    response_model=schemas.PaginaResponse[schemas.TicketSuporteResponse],
     summary="Listar tickets do usuário",
     description="""
     Permite que o **usuário autenticado** veja seus tickets de suporte.  
 
-    - Retorna todos os tickets associados ao usuário.  
+    - Retorna os tickets associados ao usuário, do mais antigo para o mais novo.  
     - Inclui status e possíveis respostas.  
+    - Paginado: use `next_cursor` para buscar a próxima página.  
+    - Com `Accept: application/x-ndjson` ou `text/csv`, exporta todos em streaming.  
     """
 )
-def listar_tickets(
-    db: Session = Depends(get_db),
+async def listar_tickets(
+    request: Request,
+    pagina: Pagina = Depends(),
+    db = Depends(get_db_configurado),
     usuario = Depends(get_usuario_atual)
 ):
-    tickets = db.query(models.TicketSuporte).filter(models.TicketSuporte.usuario_id == usuario.id).all()
-    return tickets
+    query = select(models.TicketSuporte).filter(models.TicketSuporte.usuario_id == usuario.id)
+
+    formato = formato_exportacao(request)
+    if formato:
+        def linhas(sessao):
+            colunas = query.with_only_columns(
+                *[c for c in models.TicketSuporte.__table__.columns]
+            ).order_by(models.TicketSuporte.criado_em, models.TicketSuporte.id)
+            return (linha._asdict() for linha in sessao.execute(colunas, execution_options={"yield_per": EXPORTACAO_LOTE}))
+
+        return exportar(formato, "tickets", linhas)
+
+    tickets, proximo = await paginar_async(db, query, [models.TicketSuporte.criado_em, models.TicketSuporte.id], pagina)
+    return resposta_paginada(tickets, proximo)
 
 
 @router.put(
     "/{ticket_id}/responder",
+    response_model=schemas.TicketSuporteCriadoResponse,
     summary="Responder ticket (somente admin)",
     description="""
     Permite que um **administrador** responda um ticket de suporte.  
@@ -66,6 +89,7 @@ def listar_tickets(
     - A resposta é armazenada.  
     """
 )
+@suporta_db_async
 def responder_ticket(
     ticket_id: int,
     resposta: str,
@@ -85,5 +109,4 @@ def responder_ticket(
     ticket.respondido_em = datetime.utcnow()
 
     db.commit()
-    db.refresh(ticket)
     return {"mensagem": "Resposta registrada com sucesso", "ticket": ticket}
@@ -1,14 +1,70 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from .. import models
-from ..db import get_db
-from ..utils import parse_datetime, format_datetime
+import bisect
+from datetime import datetime, time, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session, contains_eager
+from .. import models, schemas
+from ..db import get_db, get_db_configurado, executar, suporta_db_async
+from ..utils import parse_datetime, format_datetime, normalizar_texto, responder_com_etag
+from ..busca import condicoes_de_busca, cache_busca, chave_busca, invalidar_busca
+from ..avaliacoes import resumo as resumo_avaliacoes
+from ..paginacao import Pagina, paginar, paginar_async, resposta_paginada
+from ..exportacao import formato_exportacao, exportar
+from ..notificacoes import enfileirar_viagem_cancelada
+from ..config import EXPORTACAO_LOTE, VIAGENS_LOTE_MAXIMO, DURACAO_VIAGEM_PADRAO_MIN
 from .auth import somente_motorista
 
 router = APIRouter(tags=["Viagens"])
 
+# Intervalo máximo aceito pelo calendário (pouco mais de dois meses)
+CALENDARIO_MAX_DIAS = 62
 
-@router.post("/viagens/", summary="Criar uma nova viagem", description="Permite que um **motorista autenticado** cadastre uma nova viagem.")
+
+def _horarios_em_conflito(db: Session, motorista_id: int, horarios: list, ignorar_viagem_id: int = None) -> list:
+    """
+    Horários de `horarios` (ordenados) que se sobrepõem a outra viagem não cancelada
+    do motorista ou a outro horário da própria lista. Toda viagem é considerada com
+    DURACAO_VIAGEM_PADRAO_MIN de duração: há conflito se as partidas distam menos que isso.
+
+    Uma consulta por intervalo no índice (motorista_id, horario_partida), só da
+    janela afetada, e busca binária para cada horário novo. `ignorar_viagem_id`
+    tira da comparação a própria viagem quando ela já existe (reativação).
+    """
+    duracao = timedelta(minutes=DURACAO_VIAGEM_PADRAO_MIN)
+    consulta = db.query(models.Viagem.horario_partida).filter(
+        models.Viagem.motorista_id == motorista_id,
+        models.Viagem.status != "cancelada",
+        models.Viagem.horario_partida > horarios[0] - duracao,
+        models.Viagem.horario_partida < horarios[-1] + duracao,
+    )
+    if ignorar_viagem_id is not None:
+        consulta = consulta.filter(models.Viagem.id != ignorar_viagem_id)
+    existentes = [h for (h,) in consulta.order_by(models.Viagem.horario_partida)]
+
+    conflitos = set()
+    for h in horarios:
+        # primeira viagem existente que parte depois de (h - duração)
+        i = bisect.bisect_right(existentes, h - duracao)
+        if i < len(existentes) and existentes[i] < h + duracao:
+            conflitos.add(h)
+    for anterior, seguinte in zip(horarios, horarios[1:]):
+        if seguinte - anterior < duracao:
+            conflitos.update((anterior, seguinte))
+    return sorted(conflitos)
+
+
+def _recusar_conflitos(conflitos: list) -> None:
+    if conflitos:
+        lista = ", ".join(format_datetime(h) for h in conflitos[:10])
+        raise HTTPException(
+            status_code=400,
+            detail=f"Conflito de horário: {len(conflitos)} partida(s) a menos de {DURACAO_VIAGEM_PADRAO_MIN} min "
+                   f"de outra viagem sua: {lista}"
+        )
+
+
+@router.post("/viagens/", response_model=schemas.ViagemCriadaResponse, summary="Criar uma nova viagem", description="Permite que um **motorista autenticado** cadastre uma nova viagem.")
+@suporta_db_async
 def criar_viagem(
     origem: str = Query(..., description="Cidade de origem da viagem", example="Salvador"),
     destino: str = Query(..., description="Cidade de destino da viagem", example="Serrinha"),
@@ -18,6 +74,7 @@ def criar_viagem(
     usuario = Depends(somente_motorista)
 ):
     horario_partida_dt = parse_datetime(horario_partida)
+    _recusar_conflitos(_horarios_em_conflito(db, usuario.id, [horario_partida_dt]))
 
     viagem = models.Viagem(
         origem=origem,
@@ -28,7 +85,7 @@ def criar_viagem(
     )
     db.add(viagem)
     db.commit()
-    db.refresh(viagem)
+    invalidar_busca(viagem.horario_partida)
     return {
         "mensagem": "Viagem criada com sucesso",
         "viagem": {
@@ -43,49 +100,166 @@ def criar_viagem(
     }
 
 
-@router.get("/viagens/", summary="Listar viagens", description="Filtra viagens por motorista, origem, destino e data.")
-def listar_viagens(
+def _expandir_recorrencia(recorrencia: schemas.RecorrenciaSemanal) -> list:
+    """Datas/horas de partida de uma recorrência semanal, de `inicio` a `fim` (inclusive)."""
+    if not recorrencia.dias_semana or any(d not in range(7) for d in recorrencia.dias_semana):
+        raise HTTPException(status_code=400, detail="`dias_semana` deve ter valores de 0 (segunda) a 6 (domingo)")
+    try:
+        hora = time.fromisoformat(recorrencia.hora)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="`hora` deve estar no formato HH:MM")
+    dia = parse_datetime(recorrencia.inicio).date()
+    fim = parse_datetime(recorrencia.fim).date()
+    if fim < dia:
+        raise HTTPException(status_code=400, detail="`fim` deve ser igual ou posterior a `inicio`")
+
+    dias_semana = set(recorrencia.dias_semana)
+    horarios = []
+    while dia <= fim:
+        if dia.weekday() in dias_semana:
+            horarios.append(datetime.combine(dia, hora))
+            if len(horarios) > VIAGENS_LOTE_MAXIMO:
+                break  # o limite é verificado por quem chamou
+        dia += timedelta(days=1)
+    return horarios
+
+
+@router.post(
+    "/viagens/lote",
+    response_model=schemas.ViagensLoteResponse,
+    summary="Criar várias viagens de uma vez",
+    description=f"""
+    Permite que um **motorista autenticado** cadastre a mesma rota em vários horários.
+
+    - `horarios`: lista explícita de datas/horas (mesmos formatos da criação de viagem).  
+    - `recorrencia`: dias da semana (0 = segunda ... 6 = domingo), hora e período, ex.: toda segunda a sexta às 06:00 de março a junho.  
+    - Horários que conflitam com outra viagem do motorista (ou entre si) são recusados.  
+    - Tudo ou nada: havendo qualquer erro, nenhuma viagem é criada. Máximo de {VIAGENS_LOTE_MAXIMO} viagens.  
+    """
+)
+@suporta_db_async
+def criar_viagens_em_lote(
+    dados: schemas.ViagensLoteRequest,
+    db: Session = Depends(get_db),
+    usuario = Depends(somente_motorista)
+):
+    if (dados.horarios is None) == (dados.recorrencia is None):
+        raise HTTPException(status_code=400, detail="Informe `horarios` ou `recorrencia` (apenas um dos dois)")
+    if dados.horarios is not None:
+        horarios = [parse_datetime(h) for h in dados.horarios[:VIAGENS_LOTE_MAXIMO + 1]]
+    else:
+        horarios = _expandir_recorrencia(dados.recorrencia)
+    if not horarios:
+        raise HTTPException(status_code=400, detail="Nenhum horário gerado")
+    if len(horarios) > VIAGENS_LOTE_MAXIMO:
+        raise HTTPException(status_code=400, detail=f"Máximo de {VIAGENS_LOTE_MAXIMO} viagens por requisição")
+    horarios.sort()
+
+    _recusar_conflitos(_horarios_em_conflito(db, usuario.id, horarios))
+
+    # INSERT em lote pelo Core: os @validates do modelo não rodam, então as colunas
+    # normalizadas da busca são preenchidas aqui
+    origem_norm, destino_norm = normalizar_texto(dados.origem), normalizar_texto(dados.destino)
+    db.execute(insert(models.Viagem), [
+        {
+            "origem": dados.origem,
+            "destino": dados.destino,
+            "origem_norm": origem_norm,
+            "destino_norm": destino_norm,
+            "horario_partida": h,
+            "vagas_disponiveis": dados.vagas_disponiveis,
+            "motorista_id": usuario.id,
+        } for h in horarios
+    ])
+    db.commit()
+    invalidar_busca(*horarios)
+    return {
+        "mensagem": "Viagens criadas com sucesso",
+        "quantidade": len(horarios),
+        "primeira_partida": format_datetime(horarios[0]),
+        "ultima_partida": format_datetime(horarios[-1]),
+    }
+
+
+def _linhas_exportacao_viagens(sessao: Session, consulta):
+    """Linhas da exportação: só as colunas necessárias, lidas do banco em lotes."""
+    colunas = consulta.with_only_columns(
+        models.Viagem.id,
+        models.Viagem.origem,
+        models.Viagem.destino,
+        models.Viagem.horario_partida,
+        models.Viagem.vagas_disponiveis,
+        models.Viagem.status,
+        models.Usuario.id.label("motorista_id"),
+        models.Usuario.nome.label("motorista_nome"),
+    ).order_by(models.Viagem.horario_partida, models.Viagem.id)
+
+    for linha in sessao.execute(colunas, execution_options={"yield_per": EXPORTACAO_LOTE}):
+        yield linha._asdict()
+
+
+@router.get("/viagens/", response_model=schemas.PaginaResponse[schemas.ViagemListagem], summary="Listar viagens", description="Filtra viagens por motorista, origem, destino e data. A busca ignora acentos e maiúsculas e encontra o texto em qualquer parte do nome (ex.: `silva` encontra João da Silva); termos de 1 ou 2 letras buscam só pelo início. Resultado paginado por `horario_partida`: use `next_cursor` para a próxima página. As respostas ficam alguns segundos em cache e são invalidadas quando viagens ou reservas mudam. Com `Accept: application/x-ndjson` ou `text/csv`, exporta todas as viagens filtradas em streaming (sem paginação).")
+async def listar_viagens(
+    request: Request,
     motorista: str = Query(None, description="Nome do motorista", example="João"),
     origem: str = Query(None, description="Cidade de origem", example="Salvador"),
     destino: str = Query(None, description="Cidade de destino", example="Serrinha"),
     data: str = Query(None, description="Data da viagem. Formatos: `DD/MM`, `DD/MM/YYYY`, `DD/MM/YYYY HH:MM`, `YYYY-MM-DDTHH:MM`", example="18/08/2025"),
-    db: Session = Depends(get_db)
+    pagina: Pagina = Depends(),
+    db = Depends(get_db_configurado)
 ):
-    from datetime import datetime
-
-    query = db.query(models.Viagem).join(models.Usuario)
+    # Rota mais acessada do app: async nativa (ver db.executar)
+    query = select(models.Viagem).join(models.Viagem.motorista)
 
-    # Filtro por nome do motorista
-    if motorista:
-        query = query.filter(models.Usuario.nome.ilike(f"%{motorista}%"))
-
-    # Filtro por origem
-    if origem:
-        query = query.filter(models.Viagem.origem.ilike(f"%{origem}%"))
-
-    # Filtro por destino
-    if destino:
-        query = query.filter(models.Viagem.destino.ilike(f"%{destino}%"))
+    # Filtros de texto (motorista, origem, destino) usam as colunas normalizadas
+    # e os índices escolhidos por condicoes_de_busca (prefixo ou trigramas)
+    query = query.filter(*condicoes_de_busca({
+        models.Usuario.nome_norm: motorista,
+        models.Viagem.origem_norm: origem,
+        models.Viagem.destino_norm: destino,
+    }))
 
     # Filtro por data
+    dia, horario_exato = None, None
     if data:
         try:
             data_dt = parse_datetime(data)
+            dia = data_dt.date()
 
             # Se a string contém hora (ex: "20:30"), assume horário exato
             if ":" in data:
+                horario_exato = data_dt
                 query = query.filter(models.Viagem.horario_partida == data_dt)
             else:
                 inicio_dia = datetime.combine(data_dt.date(), datetime.min.time())
                 fim_dia = datetime.combine(data_dt.date(), datetime.max.time())
                 query = query.filter(models.Viagem.horario_partida.between(inicio_dia, fim_dia))
 
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=400, detail=str(e))
 
-    viagens = query.all()
+    formato = formato_exportacao(request)
+    if formato:
+        return exportar(formato, "viagens", lambda sessao: _linhas_exportacao_viagens(sessao, query))
+
+    # A chave é calculada antes da consulta: se uma escrita acontecer no meio,
+    # o resultado fica guardado sob a versão antiga e não é servido depois
+    chave = chave_busca(
+        {"motorista": motorista, "origem": origem, "destino": destino},
+        dia, horario_exato, pagina.cursor, pagina.limite,
+    )
+    resposta = cache_busca.obter(chave)
+    if resposta is not None:
+        return resposta
+
+    # O JOIN com usuarios já existe (filtro por motorista); contains_eager reaproveita
+    # essas colunas para preencher v.motorista, sem uma consulta extra por viagem
+    query = query.options(contains_eager(models.Viagem.motorista))
+    viagens, proximo = await paginar_async(db, query, [models.Viagem.horario_partida, models.Viagem.id], pagina)
 
-    return [
+    resposta = resposta_paginada([
         {
             "id": v.id,
             "origem": v.origem,
@@ -95,14 +269,182 @@ def listar_viagens(
             "status": v.status,
             "motorista": {
                 "id": v.motorista.id,
-                "nome": v.motorista.nome
+                "nome": v.motorista.nome,
+                "avaliacao": resumo_avaliacoes(v.motorista)
             }
         } for v in viagens
-    ]
+    ], proximo)
+    cache_busca.guardar(chave, resposta)
+    return resposta
+
 
 
+@router.get(
+    "/viagens/calendario",
+    response_model=schemas.CalendarioResponse,
+    summary="Calendário de viagens (mês inteiro)",
+    description="""
+    Retorna, em uma única chamada, as viagens de um intervalo de datas agrupadas por dia
+    (chave `YYYY-MM-DD`), com total de viagens e vagas disponíveis em cada dia.
 
-@router.put("/viagens/{viagem_id}/status", summary="Alterar status da viagem", description="Permite que o motorista **altere o status** de uma viagem criada por ele.")
+    - Use `inicio` e `fim` com no máximo 62 dias de diferença (ex.: o mês exibido).
+    - `origem`/`destino` são opcionais (mesma busca de `GET /viagens/`).
+    - A resposta traz `ETag`: reenviando-o em `If-None-Match`, o servidor responde
+      **304** quando nada mudou.
+    """
+)
+async def calendario_viagens(
+    request: Request,
+    inicio: str = Query(..., description="Primeiro dia do intervalo", example="01/08/2025"),
+    fim: str = Query(..., description="Último dia do intervalo", example="31/08/2025"),
+    origem: str = Query(None, description="Cidade de origem", example="Salvador"),
+    destino: str = Query(None, description="Cidade de destino", example="Serrinha"),
+    db = Depends(get_db_configurado)
+):
+    inicio_dt = datetime.combine(parse_datetime(inicio).date(), time.min)
+    fim_dt = datetime.combine(parse_datetime(fim).date(), time.max)
+    if fim_dt < inicio_dt:
+        raise HTTPException(status_code=400, detail="`fim` deve ser igual ou posterior a `inicio`")
+    if (fim_dt - inicio_dt).days >= CALENDARIO_MAX_DIAS:
+        raise HTTPException(status_code=400, detail=f"Intervalo máximo de {CALENDARIO_MAX_DIAS} dias")
+
+    # Uma única varredura por intervalo no índice de horario_partida, só com as colunas exibidas
+    query = (
+        select(
+            models.Viagem.id,
+            models.Viagem.origem,
+            models.Viagem.destino,
+            models.Viagem.horario_partida,
+            models.Viagem.vagas_disponiveis,
+            models.Viagem.status,
+            models.Usuario.id.label("motorista_id"),
+            models.Usuario.nome.label("motorista_nome"),
+        )
+        .join(models.Viagem.motorista)
+        .filter(models.Viagem.horario_partida.between(inicio_dt, fim_dt))
+    )
+    query = query.filter(*condicoes_de_busca({models.Viagem.origem_norm: origem, models.Viagem.destino_norm: destino}))
+
+    dias = {}
+    linhas = await executar(db, query.order_by(models.Viagem.horario_partida, models.Viagem.id))
+    for v in linhas:
+        dia = dias.setdefault(v.horario_partida.date().isoformat(), {"total": 0, "vagas": 0, "viagens": []})
+        dia["total"] += 1
+        if v.status == "agendada":
+            dia["vagas"] += v.vagas_disponiveis or 0
+        dia["viagens"].append({
+            "id": v.id,
+            "hora": v.horario_partida.strftime("%H:%M"),
+            "origem": v.origem,
+            "destino": v.destino,
+            "vagas_disponiveis": v.vagas_disponiveis,
+            "status": v.status,
+            "motorista": {"id": v.motorista_id, "nome": v.motorista_nome},
+        })
+
+    corpo = {"inicio": inicio_dt.date().isoformat(), "fim": fim_dt.date().isoformat(), "dias": dias}
+    return responder_com_etag(request, corpo)
+
+
+@router.get(
+    "/viagens/minhas",
+    response_model=schemas.PaginaResponse[schemas.MinhaViagem],
+    summary="Minhas viagens (motorista)",
+    description="""
+    Lista as viagens do **motorista autenticado**, ordenadas por `horario_partida`,
+    com a contagem de reservas e a lista de passageiros confirmados de cada viagem.
+    Resultado paginado: use `next_cursor` para a próxima página.
+    """
+)
+@suporta_db_async
+def listar_minhas_viagens(
+    pagina: Pagina = Depends(),
+    db: Session = Depends(get_db),
+    usuario = Depends(somente_motorista)
+):
+    # Índice (motorista_id, horario_partida) atende filtro e ordenação
+    viagens, proximo = paginar(
+        db.query(models.Viagem).filter(models.Viagem.motorista_id == usuario.id),
+        [models.Viagem.horario_partida, models.Viagem.id],
+        pagina,
+    )
+
+    # Reservas de todas as viagens da página em uma única consulta
+    reservas = {v.id: {"confirmadas": 0, "canceladas": 0, "passageiros": []} for v in viagens}
+    if reservas:
+        linhas = (
+            db.query(
+                models.Reserva.id,
+                models.Reserva.viagem_id,
+                models.Reserva.status,
+                models.Usuario.id.label("passageiro_id"),
+                models.Usuario.nome.label("passageiro_nome"),
+            )
+            .join(models.Reserva.passageiro)
+            .filter(models.Reserva.viagem_id.in_(list(reservas)))
+            .order_by(models.Reserva.id)
+        )
+        for r in linhas:
+            dados = reservas[r.viagem_id]
+            if r.status == "confirmada":
+                dados["confirmadas"] += 1
+                dados["passageiros"].append({"reserva_id": r.id, "id": r.passageiro_id, "nome": r.passageiro_nome})
+            else:
+                dados["canceladas"] += 1
+
+    return resposta_paginada([
+        {
+            "id": v.id,
+            "origem": v.origem,
+            "destino": v.destino,
+            "horario_partida": format_datetime(v.horario_partida),
+            "vagas_disponiveis": v.vagas_disponiveis,
+            "status": v.status,
+            "motorista": {"id": usuario.id, "nome": usuario.nome},
+            "reservas": {
+                "confirmadas": reservas[v.id]["confirmadas"],
+                "canceladas": reservas[v.id]["canceladas"],
+            },
+            "passageiros": reservas[v.id]["passageiros"],
+        } for v in viagens
+    ], proximo)
+
+
+def _cancelar_viagem(db: Session, viagem_id: int) -> int:
+    """
+    Cancela a viagem e, na mesma transação, todas as reservas confirmadas dela,
+    com UPDATEs em conjunto (sem carregar as reservas). Os passageiros são avisados
+    pela fila de notificações. Retorna quantas reservas foram canceladas.
+    """
+    agora = datetime.utcnow()
+    # Condição no próprio UPDATE: dois cancelamentos simultâneos não cancelam em dobro
+    mudou = db.execute(
+        update(models.Viagem)
+        .where(models.Viagem.id == viagem_id, models.Viagem.status != "cancelada")
+        .values(status="cancelada")
+    ).rowcount
+    if not mudou:
+        return 0
+
+    enfileirar_viagem_cancelada(db, viagem_id, agora)
+    canceladas = db.execute(
+        update(models.Reserva)
+        .where(models.Reserva.viagem_id == viagem_id, models.Reserva.status == "confirmada")
+        .values(status="cancelada", horario_confirmacao=agora)  # registra quando foi cancelada
+    ).rowcount
+
+    # As vagas voltam, como no cancelamento feito pelo passageiro
+    if canceladas:
+        db.execute(
+            update(models.Viagem)
+            .where(models.Viagem.id == viagem_id)
+            .values(vagas_disponiveis=models.Viagem.vagas_disponiveis + canceladas)
+        )
+    return canceladas
+
+
+@router.put("/viagens/{viagem_id}/status", response_model=schemas.ViagemStatusResponse, summary="Alterar status da viagem", description="Permite que o motorista **altere o status** de uma viagem criada por ele. Ao cancelar, todas as reservas confirmadas são canceladas e os passageiros notificados.")
+@suporta_db_async
 def alterar_status_viagem(
     viagem_id: int,
     status: str = Query(..., description="Novo status da viagem. Valores possíveis: `agendada`, `cancelada`, `concluída`.", example="cancelada"),
@@ -117,14 +459,25 @@ def alterar_status_viagem(
     if status not in ["agendada", "cancelada", "concluída"]:
         raise HTTPException(status_code=400, detail="Status inválido")
 
-    viagem.status = status
+    reservas_canceladas = 0
+    if status == "cancelada":
+        reservas_canceladas = _cancelar_viagem(db, viagem_id)
+    else:
+        # Viagem cancelada não entra na checagem de conflito: ao reativá-la,
+        # o horário dela pode já ter sido ocupado por outra viagem do motorista
+        if viagem.status == "cancelada":
+            _recusar_conflitos(_horarios_em_conflito(
+                db, usuario.id, [viagem.horario_partida], ignorar_viagem_id=viagem.id
+            ))
+        viagem.status = status
     db.commit()
-    db.refresh(viagem)
+    invalidar_busca(viagem.horario_partida)
     return {
         "mensagem": "Status atualizado com sucesso",
+        "reservas_canceladas": reservas_canceladas,
         "viagem": {
             "id": viagem.id,
-            "status": viagem.status,
+            "status": status,
             "motorista": {"id": usuario.id, "nome": usuario.nome}
         }
     }
@@ -1,8 +1,10 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Generic, List, Optional, TypeVar
 from enum import Enum
 
+T = TypeVar("T")
+
 # --------------------------------
 # Enum para tipo de usuário
 # --------------------------------
@@ -39,17 +41,63 @@ class UsuarioCreate(UsuarioBase):
     # documento retirado daqui porque UploadFile precisa de Form/File
 
 
+class UsuarioRegistrado(UsuarioResponse):
+    telefone: Optional[str] = None
+    numero_cnh: Optional[str] = None
+    modelo_carro: Optional[str] = None
+    placa_carro: Optional[str] = None
+    documento_url: Optional[str] = None
+
+
+class RegistroResponse(BaseModel):
+    mensagem: str
+    usuario: UsuarioRegistrado
+
+
+class TokenResponse(BaseModel):
+    access_token: str
+    refresh_token: str
+    token_type: str
+    usuario: UsuarioResponse
+
+
+# --------------------------------
+# Respostas genéricas
+# --------------------------------
+class MensagemResponse(BaseModel):
+    mensagem: str
+
+
+class PaginaResponse(BaseModel, Generic[T]):
+    """Envelope das listagens paginadas (ver app.paginacao.resposta_paginada)."""
+    itens: List[T]
+    next_cursor: Optional[str] = None
+
+
 # --------------------------------
 # Motorista (apenas resposta)
 # --------------------------------
 class MotoristaResponse(BaseModel):
     id: int
     nome: str
-    telefone: str
-    numero_cnh: str
-    modelo_carro: str
-    placa_carro: str
-    documento_url: Optional[str]
+    email: Optional[str] = None
+    telefone: Optional[str] = None
+    numero_cnh: Optional[str] = None
+    modelo_carro: Optional[str] = None
+    placa_carro: Optional[str] = None
+    documento_url: Optional[str] = None
+
+    class Config:
+        orm_mode = True
+
+
+# Versão enxuta para a listagem pública (sem CNH, documento e telefone)
+class MotoristaListagem(BaseModel):
+    id: int
+    nome: str
+    email: str
+    modelo_carro: Optional[str] = None
+    avaliacao_media: Optional[float] = None
 
     class Config:
         orm_mode = True
@@ -61,7 +109,17 @@ class MotoristaResponse(BaseModel):
 class PassageiroResponse(BaseModel):
     id: int
     nome: str
-    telefone: str
+    email: Optional[str] = None
+    telefone: Optional[str] = None
+
+    class Config:
+        orm_mode = True
+
+
+class PassageiroListagem(BaseModel):
+    id: int
+    nome: str
+    email: str
 
     class Config:
         orm_mode = True
@@ -90,6 +148,114 @@ class ViagemResponse(ViagemBase):
         orm_mode = True
 
 
+class MotoristaResumo(BaseModel):
+    id: int
+    nome: str
+
+
+class AvaliacaoResumo(BaseModel):
+    media: Optional[float] = None
+    quantidade: int
+    nota_bayesiana: float
+
+
+class MotoristaComAvaliacao(MotoristaResumo):
+    avaliacao: AvaliacaoResumo
+
+
+class ViagemResumo(BaseModel):
+    """Viagem como aparece nas listagens (`horario_partida` em `DD/MM - HH:MM`)."""
+    id: int
+    origem: str
+    destino: str
+    horario_partida: str
+    vagas_disponiveis: int
+    status: str
+    motorista: MotoristaResumo
+
+
+class ViagemListagem(ViagemResumo):
+    motorista: MotoristaComAvaliacao
+
+
+class ViagemCriadaResponse(BaseModel):
+    mensagem: str
+    viagem: ViagemResumo
+
+
+class RecorrenciaSemanal(BaseModel):
+    dias_semana: List[int]  # 0 = segunda ... 6 = domingo
+    hora: str  # HH:MM
+    inicio: str  # primeiro dia (mesmos formatos de data da criação de viagem)
+    fim: str  # último dia, inclusive
+
+
+class ViagensLoteRequest(BaseModel):
+    origem: str
+    destino: str
+    vagas_disponiveis: int
+    # Informe `horarios` (lista explícita) ou `recorrencia`
+    horarios: Optional[List[str]] = None
+    recorrencia: Optional[RecorrenciaSemanal] = None
+
+
+class ViagensLoteResponse(BaseModel):
+    mensagem: str
+    quantidade: int
+    primeira_partida: str
+    ultima_partida: str
+
+
+class ViagemStatus(BaseModel):
+    id: int
+    status: str
+    motorista: MotoristaResumo
+
+
+class ViagemStatusResponse(BaseModel):
+    mensagem: str
+    reservas_canceladas: int = 0
+    viagem: ViagemStatus
+
+
+class ContagemReservas(BaseModel):
+    confirmadas: int
+    canceladas: int
+
+
+class PassageiroNaViagem(BaseModel):
+    reserva_id: int
+    id: int
+    nome: str
+
+
+class MinhaViagem(ViagemResumo):
+    reservas: ContagemReservas
+    passageiros: List[PassageiroNaViagem]
+
+
+class ViagemCalendario(BaseModel):
+    id: int
+    hora: str
+    origem: str
+    destino: str
+    vagas_disponiveis: int
+    status: str
+    motorista: MotoristaResumo
+
+
+class DiaCalendario(BaseModel):
+    total: int
+    vagas: int
+    viagens: List[ViagemCalendario]
+
+
+class CalendarioResponse(BaseModel):
+    inicio: str
+    fim: str
+    dias: Dict[str, DiaCalendario]  # chave: data em YYYY-MM-DD
+
+
 # --------------------------------
 # Reservas
 # --------------------------------
@@ -111,6 +277,21 @@ class ReservaResponse(ReservaBase):
         orm_mode = True
 
 
+class ReservaCriadaResponse(BaseModel):
+    mensagem: str
+    reserva: ReservaResponse
+
+
+class MinhaReserva(BaseModel):
+    reserva_id: int
+    viagem_id: int
+    origem: str
+    destino: str
+    horario_partida: str
+    status_reserva: str
+    status_viagem: str
+
+
 # --------------------------------
 # Avaliações
 # --------------------------------
@@ -128,6 +309,30 @@ class AvaliacaoPassageiroBase(BaseModel):
     comentario: Optional[str]
 
 
+class AvaliacaoMotoristaResponse(AvaliacaoMotoristaBase):
+    id: int
+
+    class Config:
+        orm_mode = True
+
+
+class AvaliacaoPassageiroResponse(AvaliacaoPassageiroBase):
+    id: int
+
+    class Config:
+        orm_mode = True
+
+
+class AvaliacaoMotoristaRegistrada(BaseModel):
+    mensagem: str
+    avaliacao: AvaliacaoMotoristaResponse
+
+
+class AvaliacaoPassageiroRegistrada(BaseModel):
+    mensagem: str
+    avaliacao: AvaliacaoPassageiroResponse
+
+
 # --------------------------------
 # Chamados de Suporte
 # --------------------------------
@@ -144,3 +349,66 @@ class ChamadoSuporteResponse(ChamadoSuporteBase):
 
     class Config:
         orm_mode = True
+
+
+class TicketSuporteResponse(BaseModel):
+    id: int
+    usuario_id: int
+    tipo_usuario: Optional[str] = None
+    assunto: str
+    mensagem: Optional[str] = None
+    status: str
+    criado_em: Optional[datetime] = None
+    resposta: Optional[str] = None
+    respondido_em: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
+
+class TicketSuporteCriadoResponse(BaseModel):
+    mensagem: str
+    ticket: TicketSuporteResponse
+
+
+# --------------------------------
+# Sincronização incremental (GET /sync)
+# --------------------------------
+class ViagemSync(BaseModel):
+    id: int
+    origem: Optional[str] = None
+    destino: Optional[str] = None
+    horario_partida: Optional[datetime] = None
+    vagas_disponiveis: Optional[int] = None
+    status: Optional[str] = None
+    motorista_id: Optional[int] = None
+
+    class Config:
+        orm_mode = True
+
+
+class ReservaSync(BaseModel):
+    id: int
+    viagem_id: int
+    status: str
+    horario_confirmacao: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
+
+class ExclusaoSync(BaseModel):
+    tabela: str  # "viagens", "reservas" ou "tickets_suporte"
+    registro_id: int
+
+    class Config:
+        orm_mode = True
+
+
+class SyncResponse(BaseModel):
+    viagens: List[ViagemSync]
+    reservas: List[ReservaSync]
+    tickets: List[TicketSuporteResponse]
+    exclusoes: List[ExclusaoSync]
+    next_since: str
+    tem_mais: bool
@@ -0,0 +1,73 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from .config import HASH_PROCESSOS, HASH_MAX_PENDENTES
+
+# -------------------------------
+# Hash de senhas em pool de processos
+# -------------------------------
+# bcrypt gasta ~100-300 ms de CPU por chamada. Rodar isso na thread da requisição
+# segura o threadpool (e o GIL) que atende todos os outros endpoints síncronos,
+# então o trabalho vai para um pool de processos de tamanho fixo, aguardado com
+# `await` pelas rotas async (login/registro). O número de hashes pendentes é
+# limitado: quando lota, respondemos 429 em vez de enfileirar.
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+_executor = None
+_executor_lock = threading.Lock()
+_vagas = threading.BoundedSemaphore(HASH_MAX_PENDENTES)
+
+
+def _hash(senha: str) -> str:
+    return pwd_context.hash(senha)
+
+
+def _verificar(senha: str, senha_hash: str) -> bool:
+    return pwd_context.verify(senha, senha_hash)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # "spawn" evita fazer fork de um processo que já tem várias threads
+            # (scripts que importam o app precisam do if __name__ == "__main__")
+            _executor = ProcessPoolExecutor(
+                max_workers=HASH_PROCESSOS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+async def _executar(funcao, *args):
+    if not _vagas.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Servidor ocupado. Tente novamente em instantes.",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        # Espera o processo no event loop: nenhuma thread do threadpool fica presa
+        return await asyncio.wrap_future(_get_executor().submit(funcao, *args))
+    finally:
+        _vagas.release()
+
+
+async def gerar_hash(senha: str) -> str:
+    return await _executar(_hash, senha)
+
+
+async def verificar_senha(senha: str, senha_hash: str) -> bool:
+    return await _executar(_verificar, senha, senha_hash)
+
+
+def encerrar_pool() -> None:
+    """Finaliza os processos do pool (chamado no shutdown da aplicação)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
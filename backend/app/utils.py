@@ -1,5 +1,50 @@
-from datetime import datetime
-from fastapi import HTTPException
+import hashlib
+import json
+import re
+import unicodedata
+from datetime import date, datetime
+from functools import lru_cache
+from fastapi import HTTPException, Request
+from fastapi.responses import JSONResponse, Response
+
+# Formatos com barra, reconhecidos pelo "formato" da string (sem tentativa e erro):
+#   DD/MM/YYYY [HH:MM]   e   DD/MM [- HH:MM] (ano atual)
+_DATA_COM_ANO = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})(?: +(\d{1,2}):(\d{1,2}))?")
+_DATA_SEM_ANO = re.compile(r"(\d{1,2})/(\d{1,2})(?: *- *(\d{1,2}):(\d{1,2}))?")
+
+_EXEMPLOS_DATA = [
+    "18/08/2025 20:30 (DD/MM/YYYY HH:MM)",
+    "18/08/2025 (DD/MM/YYYY)",
+    "18/08 - 20:30 (DD/MM - HH:MM, assume ano atual)",
+    "18/08 (DD/MM, assume ano atual)",
+    "2025-08-18T20:30 (YYYY-MM-DDTHH:MM)",
+    "2025-08-18 (YYYY-MM-DD)"
+]
+
+
+def _erro_formato_data():
+    return HTTPException(
+        status_code=400,
+        detail=f"Formato de data/hora inválido. Exemplos aceitos: {', '.join(_EXEMPLOS_DATA)}"
+    )
+
+
+@lru_cache(maxsize=4096)
+def _parse_data_br(value: str, ano_atual: int) -> datetime:
+    # O ano atual faz parte da chave do cache: "18/08" muda de significado na virada do ano
+    if m := _DATA_COM_ANO.fullmatch(value):
+        dia, mes, ano, hora, minuto = m.groups()
+    elif m := _DATA_SEM_ANO.fullmatch(value):
+        dia, mes, hora, minuto = m.groups()
+        ano = ano_atual
+    else:
+        raise _erro_formato_data()
+
+    try:
+        return datetime(int(ano), int(mes), int(dia), int(hora or 0), int(minuto or 0))
+    except ValueError:  # ex.: 31/02, 25:00
+        raise _erro_formato_data()
+
 
 def parse_datetime(value: str) -> datetime:
     """
@@ -10,52 +55,28 @@ def parse_datetime(value: str) -> datetime:
     - DD/MM                  (ano atual)
     - YYYY-MM-DDTHH:MM
     - YYYY-MM-DD
+
+    O resultado é "naive" (sem fuso), como as colunas DateTime do banco; ISO com
+    offset (ex.: `+00:00`) é devolvido como veio. Formatos com barra repetidos vêm do cache.
     """
-    try:
-        value = value.strip()
-
-        # Formato: "DD/MM - HH:MM" (assume ano atual)
-        if "-" in value and "/" in value and ":" in value:
-            dt = datetime.strptime(value, "%d/%m - %H:%M")
-            return dt.replace(year=datetime.now().year)
-
-        # Formatos brasileiros com barra
-        if "/" in value:
-            if ":" in value:
-                # Tenta "DD/MM/YYYY HH:MM"
-                try:
-                    return datetime.strptime(value, "%d/%m/%Y %H:%M")
-                except ValueError:
-                    # Se falhar, pode ser "DD/MM - HH:MM" (já tratado acima)
-                    raise
-            else:
-                # Tenta "DD/MM/YYYY"
-                try:
-                    return datetime.strptime(value, "%d/%m/%Y")
-                except ValueError:
-                    # Tenta "DD/MM" e assume ano atual
-                    return datetime.strptime(value, "%d/%m").replace(year=datetime.now().year)
-
-        # Formatos ISO
-        if "T" in value or ":" in value:
-            return datetime.fromisoformat(value)
-
-        # Formato: "YYYY-MM-DD"
-        return datetime.strptime(value, "%Y-%m-%d")
+    if not isinstance(value, str):
+        raise _erro_formato_data()
+    value = value.strip()
+
+    # Com barra: formatos brasileiros (inclusive "1/8 - 20:30", que também tem hífen)
+    if "/" in value:
+        return _parse_data_br(value, date.today().year)
 
+    # ISO vai direto para datetime.fromisoformat (implementado em C); "2025-8-1",
+    # com dia/mês de um dígito, só o strptime aceita
+    try:
+        return datetime.fromisoformat(value)
     except ValueError:
-        exemplos = [
-            "18/08/2025 20:30 (DD/MM/YYYY HH:MM)",
-            "18/08/2025 (DD/MM/YYYY)",
-            "18/08 - 20:30 (DD/MM - HH:MM, assume ano atual)",
-            "18/08 (DD/MM, assume ano atual)",
-            "2025-08-18T20:30 (YYYY-MM-DDTHH:MM)",
-            "2025-08-18 (YYYY-MM-DD)"
-        ]
-        raise HTTPException(
-            status_code=400,
-            detail=f"Formato de data/hora inválido. Exemplos aceitos: {', '.join(exemplos)}"
-        )
+        pass
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:  # ex.: 2025-02-30
+        raise _erro_formato_data()
 
 
 def format_datetime(dt: datetime) -> str:
@@ -63,3 +84,29 @@ def format_datetime(dt: datetime) -> str:
     Formata um datetime para o formato "DD/MM - HH:MM"
     """
     return dt.strftime("%d/%m - %H:%M") if dt else None
+
+
+def normalizar_texto(value: str) -> str:
+    """
+    Normaliza texto para busca: minúsculas, sem acentos e sem espaços extras.
+    Ex.: "  São  Gonçalo " -> "sao goncalo"
+    """
+    if value is None:
+        return None
+    sem_acento = unicodedata.normalize("NFKD", value).encode("ascii", "ignore").decode("ascii")
+    return " ".join(sem_acento.lower().split())
+
+
+def responder_com_etag(request: Request, corpo) -> Response:
+    """
+    Responde `corpo` em JSON com ETag. Se o cliente mandar o mesmo ETag em
+    If-None-Match, devolve 304 sem corpo (o cliente reaproveita o que já tem).
+    """
+    serializado = json.dumps(corpo, sort_keys=True, separators=(",", ":"), default=str)
+    etag = 'W/"' + hashlib.sha1(serializado.encode()).hexdigest() + '"'
+    cabecalhos = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    enviados = [e.strip() for e in request.headers.get("if-none-match", "").split(",")]
+    if etag in enviados:
+        return Response(status_code=304, headers=cabecalhos)
+    return JSONResponse(corpo, headers=cabecalhos)
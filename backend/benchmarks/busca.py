@@ -0,0 +1,186 @@
+"""
+Benchmark da busca de viagens (GET /viagens/) numa tabela grande.
+
+Popula `--viagens` viagens (padrão 1 milhão) e mede a latência da busca por tipo
+de filtro, cada um atendido por um caminho diferente de condicoes_de_busca:
+
+- cidade:    nome completo da origem            -> trecho (índice de trigramas)
+- prefixo:   2 letras da origem                 -> intervalo no B-tree de origem_norm
+- trecho:    palavra do meio do nome da cidade  -> trecho (índice de trigramas)
+- rara:      cidade presente em ~0,1% das viagens -> trecho (índice de trigramas)
+- motorista: sobrenome do motorista             -> trecho em usuarios_busca
+- data:      um dia                             -> intervalo em horario_partida
+- rota_dia:  origem + destino + dia
+
+O cache de respostas é esvaziado antes de cada busca, então toda busca vai ao banco.
+Com `--comparar-varredura`, mede também o caminho antigo (ILIKE '%x%' nas colunas
+originais, sem índice) para as buscas de trecho e de cidade rara. Com termos comuns o
+ILIKE acha as 50 primeiras percorrendo o índice de horario_partida e para cedo; com
+termos raros ele varre a tabela inteira, que é o caso que o índice de trigramas resolve.
+
+Uso (a partir da pasta backend):
+
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.busca --viagens 1000000 --buscas 200
+
+O app roda no próprio processo (TestClient) sobre um SQLite temporário; popular
+1 milhão de viagens (com os índices FTS5 mantidos pelos triggers) leva alguns minutos.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from .fluxo_reserva import CIDADES, _percentil
+
+# Poucas viagens: a busca por elas é seletiva
+CIDADES_RARAS = ["Monte Santo", "Cansanção", "Queimadas", "Nordestina"]
+FRACAO_RARAS = 0.001
+SOBRENOMES = ["Silva", "Santos", "Oliveira", "Souza", "Lima", "Pereira", "Carvalho", "Almeida", "Ribeiro", "Gomes"]
+DIAS = 365
+LOTE = 50000
+
+
+# --------------------------------
+# Dados iniciais
+# --------------------------------
+def semear(viagens: int, motoristas: int, semente: int) -> None:
+    """Insere motoristas e viagens em lotes (INSERT executemany), com as colunas normalizadas preenchidas."""
+    from sqlalchemy import insert, text
+    from app.db import SessionLocal
+    from app import models
+    from app.utils import normalizar_texto
+
+    aleatorio = random.Random(semente)
+    with SessionLocal() as db:
+        nomes = [f"Motorista {i} {aleatorio.choice(SOBRENOMES)}" for i in range(motoristas)]
+        db.execute(insert(models.Usuario), [
+            {"nome": nome, "nome_norm": normalizar_texto(nome), "email": f"motorista{i}@bench.local",
+             "senha_hash": "x", "tipo": "motorista"}
+            for i, nome in enumerate(nomes)
+        ])
+        ids = [i for (i,) in db.query(models.Usuario.id)]
+        db.commit()
+
+        inicio = datetime.combine(date.today(), datetime.min.time())
+        for deslocamento in range(0, viagens, LOTE):
+            linhas = []
+            for _ in range(min(LOTE, viagens - deslocamento)):
+                origem, destino = aleatorio.sample(CIDADES, 2)
+                if aleatorio.random() < FRACAO_RARAS:
+                    origem = aleatorio.choice(CIDADES_RARAS)
+                linhas.append({
+                    "origem": origem, "destino": destino,
+                    "origem_norm": normalizar_texto(origem), "destino_norm": normalizar_texto(destino),
+                    "horario_partida": inicio + timedelta(days=aleatorio.randrange(DIAS), minutes=15 * aleatorio.randrange(96)),
+                    "vagas_disponiveis": aleatorio.randint(0, 4), "status": "agendada",
+                    "motorista_id": aleatorio.choice(ids),
+                })
+            db.execute(insert(models.Viagem), linhas)
+            db.commit()
+            print(f"  {deslocamento + len(linhas)} viagens")
+        db.execute(text("ANALYZE"))  # estatísticas para o planejador, como num banco em uso
+        db.commit()
+
+
+# --------------------------------
+# Buscas
+# --------------------------------
+def _dia(aleatorio) -> str:
+    return (date.today() + timedelta(days=aleatorio.randrange(DIAS))).strftime("%d/%m/%Y")
+
+
+def _palavra_do_meio(aleatorio) -> str:
+    palavras = [p for c in CIDADES for p in c.split()[1:] if len(p) > 3] or CIDADES
+    return aleatorio.choice(palavras)
+
+
+TIPOS = {
+    "cidade": lambda a: {"origem": a.choice(CIDADES)},
+    "prefixo": lambda a: {"origem": a.choice(CIDADES)[:2]},
+    "trecho": lambda a: {"origem": _palavra_do_meio(a)},
+    "rara": lambda a: {"origem": a.choice(CIDADES_RARAS)},
+    "motorista": lambda a: {"motorista": a.choice(SOBRENOMES)},
+    "data": lambda a: {"data": _dia(a)},
+    "rota_dia": lambda a: {"origem": a.choice(CIDADES), "destino": a.choice(CIDADES), "data": _dia(a)},
+}
+
+
+def medir_api(cliente, tipo: str, buscas: int, semente: int) -> tuple:
+    from app.busca import cache_busca
+
+    aleatorio = random.Random(semente)
+    tempos, itens = [], 0
+    for _ in range(buscas):
+        parametros = TIPOS[tipo](aleatorio)
+        cache_busca.limpar()
+        inicio = time.perf_counter()
+        resposta = cliente.get("/viagens/", params=parametros)
+        tempos.append(time.perf_counter() - inicio)
+        assert resposta.status_code == 200, resposta.text
+        itens += len(resposta.json()["itens"])
+    return tempos, itens / buscas
+
+
+def medir_varredura(termos, buscas: int, semente: int) -> tuple:
+    """O filtro de antes: ILIKE '%x%' na coluna original, que não usa índice. `termos(aleatorio)` sorteia o texto."""
+    from app.db import SessionLocal
+    from app import models
+
+    aleatorio = random.Random(semente)
+    tempos, itens = [], 0
+    with SessionLocal() as db:
+        for _ in range(buscas):
+            termo = termos(aleatorio)
+            inicio = time.perf_counter()
+            linhas = (
+                db.query(models.Viagem.id, models.Usuario.nome)
+                .join(models.Viagem.motorista)
+                .filter(models.Viagem.origem.ilike(f"%{termo}%"))
+                .order_by(models.Viagem.horario_partida, models.Viagem.id)
+                .limit(50)
+                .all()
+            )
+            tempos.append(time.perf_counter() - inicio)
+            itens += len(linhas)
+    return tempos, itens / buscas
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--viagens", type=int, default=1000000)
+    parser.add_argument("--motoristas", type=int, default=2000)
+    parser.add_argument("--buscas", type=int, default=200, help="buscas medidas por tipo")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--comparar-varredura", action="store_true", help="mede também o ILIKE '%%x%%' antigo")
+    args = parser.parse_args()
+
+    # Precisa vir antes de importar app.*
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="bench-"), "bench.db")
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    print(f"Populando {args.viagens} viagens de {args.motoristas} motoristas...")
+    comeco = time.perf_counter()
+    semear(args.viagens, args.motoristas, args.semente)
+    print(f"Populado em {time.perf_counter() - comeco:.0f}s")
+
+    cliente = TestClient(app)
+    medicoes = {tipo: medir_api(cliente, tipo, args.buscas, args.semente) for tipo in TIPOS}
+    if args.comparar_varredura:
+        medicoes["trecho (ILIKE)"] = medir_varredura(_palavra_do_meio, args.buscas, args.semente)
+        medicoes["rara (ILIKE)"] = medir_varredura(lambda a: a.choice(CIDADES_RARAS), args.buscas, args.semente)
+
+    print(f"\n{args.viagens} viagens, {args.buscas} buscas por tipo")
+    print(f"{'tipo':<16}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'itens/busca':>13}")
+    for tipo, (tempos, itens) in medicoes.items():
+        print(f"{tipo:<16}{_percentil(tempos, 50) * 1000:>9.1f}{_percentil(tempos, 95) * 1000:>9.1f}"
+              f"{_percentil(tempos, 99) * 1000:>9.1f}{itens:>13.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
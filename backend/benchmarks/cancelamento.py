@@ -0,0 +1,141 @@
+"""
+Benchmark do cancelamento de viagens com muitas reservas.
+
+Para cada tamanho em `--reservas`, cria viagens lotadas com essa quantidade de
+reservas confirmadas e cancela de duas formas:
+
+- cascata: PUT /viagens/{id}/status?status=cancelada (UPDATEs em conjunto +
+  fila de notificações, numa transação)
+- por_linha: o caminho antigo, uma chamada PUT /reservas/{id}/status por reserva
+  e depois o status da viagem
+
+Mostra o tempo de cada cancelamento, o nº de consultas SQL e quantas reservas
+foram canceladas. Uso (a partir da pasta backend):
+
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.cancelamento --reservas 100 300 1000 --repeticoes 5
+
+O app roda no próprio processo (TestClient) sobre um SQLite temporário.
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from .fluxo_reserva import _percentil
+
+
+# --------------------------------
+# Dados iniciais
+# --------------------------------
+def semear_passageiros(quantidade: int) -> list:
+    """Passageiros suficientes para lotar a maior viagem (uma reserva confirmada por passageiro)."""
+    from sqlalchemy import insert
+    from app.db import SessionLocal
+    from app import models
+
+    with SessionLocal() as db:
+        db.execute(insert(models.Usuario), [
+            {"nome": f"Passageiro {i}", "email": f"cancelamento{i}@bench.local", "senha_hash": "x", "tipo": "passageiro"}
+            for i in range(quantidade)
+        ])
+        db.commit()
+        return [i for (i,) in db.query(models.Usuario.id).filter(models.Usuario.tipo == "passageiro")]
+
+
+def criar_viagem_lotada(motorista_id: int, passageiros: list, partida: datetime) -> tuple:
+    """Viagem com uma reserva confirmada de cada passageiro. Retorna (viagem_id, ids das reservas)."""
+    from sqlalchemy import insert
+    from app.db import SessionLocal
+    from app import models
+
+    with SessionLocal() as db:
+        viagem = models.Viagem(
+            origem="Salvador", destino="Serrinha", horario_partida=partida,
+            vagas_disponiveis=0, status="agendada", motorista_id=motorista_id,
+        )
+        db.add(viagem)
+        db.flush()
+        db.execute(insert(models.Reserva), [
+            {"viagem_id": viagem.id, "passageiro_id": p, "status": "confirmada"} for p in passageiros
+        ])
+        db.commit()
+        reservas = [i for (i,) in db.query(models.Reserva.id).filter(models.Reserva.viagem_id == viagem.id)]
+        return viagem.id, reservas
+
+
+# --------------------------------
+# Cancelamentos
+# --------------------------------
+def _consultas(resposta) -> int:
+    return int(re.search(r'desc="(\d+) consultas"', resposta.headers["Server-Timing"]).group(1))
+
+
+def cancelar_em_cascata(cliente, cabecalhos: dict, viagem_id: int, reservas: list) -> tuple:
+    resposta = cliente.put(f"/viagens/{viagem_id}/status", params={"status": "cancelada"}, headers=cabecalhos)
+    assert resposta.status_code == 200, resposta.text
+    return _consultas(resposta), resposta.json()["reservas_canceladas"]
+
+
+def cancelar_por_linha(cliente, cabecalhos: dict, viagem_id: int, reservas: list) -> tuple:
+    consultas = canceladas = 0
+    for reserva_id in reservas:
+        resposta = cliente.put(f"/reservas/{reserva_id}/status", params={"status": "cancelada"}, headers=cabecalhos)
+        assert resposta.status_code == 200, resposta.text
+        consultas += _consultas(resposta)
+        canceladas += 1
+    # Viagem sem reservas confirmadas: a cascata não tem mais nada a fazer
+    resposta = cliente.put(f"/viagens/{viagem_id}/status", params={"status": "cancelada"}, headers=cabecalhos)
+    assert resposta.status_code == 200, resposta.text
+    return consultas + _consultas(resposta), canceladas
+
+
+MODOS = {"cascata": cancelar_em_cascata, "por_linha": cancelar_por_linha}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reservas", type=int, nargs="+", default=[100, 300, 1000], help="reservas por viagem")
+    parser.add_argument("--repeticoes", type=int, default=5, help="viagens canceladas por tamanho e modo")
+    parser.add_argument("--sem-por-linha", action="store_true", help="mede só a cascata")
+    args = parser.parse_args()
+
+    # Precisa vir antes de importar app.*
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="bench-"), "bench.db")
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.db import SessionLocal
+    from app import models
+    from app.routers.auth import criar_token
+
+    with SessionLocal() as db:
+        motorista = models.Usuario(nome="Motorista Bench", email="motorista@bench.local", senha_hash="x", tipo="motorista")
+        db.add(motorista)
+        db.commit()
+    cabecalhos = {"Authorization": "Bearer " + criar_token({"sub": motorista.email, "id": motorista.id, "tipo": "motorista"})}
+    passageiros = semear_passageiros(max(args.reservas))
+
+    modos = {"cascata": MODOS["cascata"]} if args.sem_por_linha else MODOS
+    cliente = TestClient(app)
+    partida = datetime(2030, 1, 1, 6, 0)
+    print(f"\n{'reservas':>9}  {'modo':<10}{'p50 ms':>10}{'máx ms':>10}{'consultas':>11}{'canceladas':>12}")
+    for tamanho in args.reservas:
+        for modo, cancelar in modos.items():
+            tempos, consultas, canceladas = [], 0, 0
+            for _ in range(args.repeticoes):
+                partida += timedelta(days=1)
+                viagem_id, reservas = criar_viagem_lotada(motorista.id, passageiros[:tamanho], partida)
+                inicio = time.perf_counter()
+                consultas, canceladas = cancelar(cliente, cabecalhos, viagem_id, reservas)
+                tempos.append(time.perf_counter() - inicio)
+                assert canceladas == tamanho, f"{modo}: {canceladas} de {tamanho} reservas canceladas"
+            print(f"{tamanho:>9}  {modo:<10}{_percentil(tempos, 50) * 1000:>10.1f}{max(tempos) * 1000:>10.1f}"
+                  f"{consultas:>11}{canceladas:>12}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
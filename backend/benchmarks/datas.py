@@ -0,0 +1,79 @@
+"""
+Micro-benchmark de utils.parse_datetime nos seis formatos documentados.
+
+Para cada formato, mede o tempo por chamada (µs) de três versões:
+
+- antes:     o parser antigo, com um strptime por tentativa (cópia abaixo)
+- sem cache: o parser atual com o lru_cache dos formatos com barra desligado
+- com cache: o parser atual como roda na API (entrada repetida vem do cache)
+
+Os formatos ISO não passam pelo cache (datetime.fromisoformat já é barato), então
+as duas últimas colunas ficam iguais para eles.
+
+Uso (a partir da pasta backend):
+
+    python -m benchmarks.datas --chamadas 100000
+"""
+import argparse
+import sys
+import timeit
+from datetime import datetime
+
+FORMATOS = {
+    "DD/MM/YYYY HH:MM": "18/08/2025 20:30",
+    "DD/MM/YYYY": "18/08/2025",
+    "DD/MM - HH:MM": "18/08 - 20:30",
+    "DD/MM": "18/08",
+    "YYYY-MM-DDTHH:MM": "2025-08-18T20:30",
+    "YYYY-MM-DD": "2025-08-18",
+}
+
+
+def parse_datetime_antigo(value: str) -> datetime:
+    """O parse_datetime de antes (sem o tratamento de erro, que não entra na medida)."""
+    value = value.strip()
+    if "-" in value and "/" in value and ":" in value:
+        dt = datetime.strptime(value, "%d/%m - %H:%M")
+        return dt.replace(year=datetime.now().year)
+    if "/" in value:
+        if ":" in value:
+            return datetime.strptime(value, "%d/%m/%Y %H:%M")
+        try:
+            return datetime.strptime(value, "%d/%m/%Y")
+        except ValueError:
+            return datetime.strptime(value, "%d/%m").replace(year=datetime.now().year)
+    if "T" in value or ":" in value:
+        return datetime.fromisoformat(value)
+    return datetime.strptime(value, "%Y-%m-%d")
+
+
+def _por_chamada(funcao, valor: str, chamadas: int) -> float:
+    """Melhor de 5 rodadas, em µs por chamada."""
+    return min(timeit.repeat(lambda: funcao(valor), number=chamadas, repeat=5)) / chamadas * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chamadas", type=int, default=100000, help="chamadas por rodada")
+    args = parser.parse_args()
+
+    from app import utils
+
+    com_cache = utils._parse_data_br
+    print(f"{args.chamadas} chamadas por rodada, melhor de 5 (µs por chamada)")
+    print(f"\n{'formato':<19}{'exemplo':<19}{'antes':>8}{'sem cache':>11}{'com cache':>11}{'ganho':>8}")
+    for formato, valor in FORMATOS.items():
+        assert utils.parse_datetime(valor) == parse_datetime_antigo(valor), formato
+        antes = _por_chamada(parse_datetime_antigo, valor, args.chamadas)
+        utils._parse_data_br = com_cache.__wrapped__
+        try:
+            sem_cache = _por_chamada(utils.parse_datetime, valor, args.chamadas)
+        finally:
+            utils._parse_data_br = com_cache
+        cacheado = _por_chamada(utils.parse_datetime, valor, args.chamadas)
+        print(f"{formato:<19}{valor:<19}{antes:>8.2f}{sem_cache:>11.2f}{cacheado:>11.2f}{antes / cacheado:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
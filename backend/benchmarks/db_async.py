@@ -0,0 +1,150 @@
+"""
+Benchmark das leituras mais chamadas com DB_ASYNC desligado e ligado.
+
+Sobe o mesmo app duas vezes (uvicorn, um worker) sobre o mesmo banco populado:
+primeiro com DB_ASYNC=False (rotas no threadpool, Session síncrona), depois com
+DB_ASYNC=True (rotas `async def` nativas com AsyncSession). Em cada modo,
+`--concorrencia` clientes fazem `--requisicoes` leituras no total, sorteadas entre:
+
+- buscar:    GET /viagens/ com origem e data sorteadas (cache de busca desligado)
+- minhas:    GET /reservas/minhas do passageiro autenticado
+- me:        GET /auth/me
+
+No fim mostra req/s e latência p50/p95/p99 por endpoint e modo. Só as rotas acima
+(e /viagens/calendario e /suporte/) são `async def` nativas; as demais continuam
+síncronas nos dois modos (ver suporta_db_async em app/db.py).
+
+Uso (a partir da pasta backend):
+
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.db_async --requisicoes 5000 --concorrencia 100
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import httpx
+
+from .fluxo_reserva import CIDADES, DIAS_A_FRENTE, Medicoes, aguardar_servidor, resumir, semear, subir_servidor
+
+
+# --------------------------------
+# Dados iniciais
+# --------------------------------
+def semear_reservas(passageiros: int, reservas_por_passageiro: int, semente: int) -> list:
+    """Passageiros com reservas confirmadas nas viagens já criadas. Retorna os cabeçalhos de autenticação."""
+    from sqlalchemy import insert
+    from app.db import SessionLocal
+    from app import models
+    from app.routers.auth import criar_token
+
+    aleatorio = random.Random(semente)
+    with SessionLocal() as db:
+        db.execute(insert(models.Usuario), [
+            {"nome": f"Passageiro {i}", "email": f"leitor{i}@bench.local", "senha_hash": "x", "tipo": "passageiro"}
+            for i in range(passageiros)
+        ])
+        viagens = [i for (i,) in db.query(models.Viagem.id)]
+        usuarios = db.query(models.Usuario.id, models.Usuario.email).filter(models.Usuario.tipo == "passageiro").all()
+        db.execute(insert(models.Reserva), [
+            {"viagem_id": viagem_id, "passageiro_id": id, "status": "confirmada"}
+            for id, _ in usuarios
+            for viagem_id in aleatorio.sample(viagens, reservas_por_passageiro)
+        ])
+        db.commit()
+    return [
+        {"Authorization": "Bearer " + criar_token({"sub": email, "id": id, "tipo": "passageiro"})}
+        for id, email in usuarios
+    ]
+
+
+# --------------------------------
+# Medição
+# --------------------------------
+def _busca(aleatorio) -> dict:
+    dia = date.today() + timedelta(days=aleatorio.randrange(DIAS_A_FRENTE))
+    return {"origem": aleatorio.choice(CIDADES), "data": dia.strftime("%d/%m/%Y")}
+
+
+async def ler(url: str, cabecalhos: list, requisicoes: int, concorrencia: int, semente: int) -> tuple:
+    medicoes = Medicoes()
+    aleatorio = random.Random(semente)
+    restantes = [requisicoes]
+
+    async def cliente_virtual(cliente):
+        while restantes[0] > 0:
+            restantes[0] -= 1
+            c = aleatorio.choice(cabecalhos)
+            tipo = aleatorio.choice(("buscar", "minhas", "me"))
+            if tipo == "buscar":
+                parametros = _busca(aleatorio)
+                await medicoes.chamar("buscar", lambda: cliente.get("/viagens/", params=parametros))
+            elif tipo == "minhas":
+                await medicoes.chamar("minhas", lambda: cliente.get("/reservas/minhas", headers=c))
+            else:
+                await medicoes.chamar("me", lambda: cliente.get("/auth/me", headers=c))
+
+    limites = httpx.Limits(max_connections=concorrencia, max_keepalive_connections=concorrencia)
+    async with httpx.AsyncClient(base_url=url, limits=limites, timeout=60) as cliente:
+        inicio = time.perf_counter()
+        await asyncio.gather(*[cliente_virtual(cliente) for _ in range(concorrencia)])
+        duracao = time.perf_counter() - inicio
+    return medicoes, duracao
+
+
+def medir_modo(database_url: str, db_async: bool, porta: int, cabecalhos: list, args) -> tuple:
+    os.environ["DB_ASYNC"] = str(db_async)
+    os.environ["CACHE_BUSCA_TTL_SEGUNDOS"] = "0"  # toda busca vai ao banco
+    servidor = subir_servidor(database_url, porta, 1)
+    try:
+        url = f"http://127.0.0.1:{porta}"
+        asyncio.run(aguardar_servidor(url))
+        medicoes, duracao = asyncio.run(ler(url, cabecalhos, args.requisicoes, args.concorrencia, args.semente))
+    finally:
+        servidor.terminate()
+        servidor.wait()
+    return resumir(medicoes, duracao), duracao
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requisicoes", type=int, default=5000, help="leituras por modo")
+    parser.add_argument("--concorrencia", type=int, default=100, help="clientes simultâneos")
+    parser.add_argument("--motoristas", type=int, default=50)
+    parser.add_argument("--viagens", type=int, default=3000)
+    parser.add_argument("--passageiros", type=int, default=200)
+    parser.add_argument("--reservas", type=int, default=20, help="reservas por passageiro")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--porta", type=int, default=8766)
+    args = parser.parse_args()
+
+    database_url = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="bench-"), "bench.db")
+    print(f"Populando {database_url} ({args.viagens} viagens, {args.passageiros} passageiros)...")
+    semear(database_url, args.motoristas, args.viagens, args.semente)
+    cabecalhos = semear_reservas(args.passageiros, args.reservas, args.semente)
+
+    resultados = {}
+    for db_async in (False, True):
+        print(f"Medindo DB_ASYNC={db_async}: {args.requisicoes} leituras, {args.concorrencia} simultâneas...")
+        resultados[db_async] = medir_modo(database_url, db_async, args.porta, cabecalhos, args)
+
+    print(f"\n{'modo':<16}{'endpoint':<10}{'n':>7}{'falhas':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for db_async, (resultado, duracao) in resultados.items():
+        modo = f"DB_ASYNC={db_async}"
+        for nome, r in sorted(resultado.items()):
+            print(f"{modo:<16}{nome:<10}{r['n']:>7}{r['falhas']:>8}{r['rps']:>9}"
+                  f"{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}")
+        print(f"{modo:<16}{'total':<10}{args.requisicoes / duracao:>33.1f} req/s")
+        for nome, r in sorted(resultado.items()):
+            if r["falhas"]:
+                print(f"  falhas em {nome} por status HTTP: {r['falhas_por_status']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""
+Benchmark da exportação em streaming de reservas (GET /reservas/minhas com
+`Accept: application/x-ndjson` ou `text/csv`) com limite de memória.
+
+Para cada tamanho em `--reservas`, cria um passageiro com essa quantidade de
+reservas (50 por viagem, uma confirmada e as demais canceladas), sobe
+`uvicorn app.main:app` e baixa a exportação inteira, acompanhando a memória
+residente (RSS) do processo do servidor a cada 20 ms. Mostra linhas/s, MB/s,
+RSS antes e pico durante a exportação; falha com código 1 se o pico passar de
+`--limite-rss-mb` ou se faltarem linhas.
+
+Uso (a partir da pasta backend; só Linux, lê /proc/<pid>/status):
+
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.exportacao --reservas 100000 1000000 5000000 --limite-rss-mb 200
+
+Com o streaming, o pico fica igual para todos os tamanhos (só cresce com
+EXPORTACAO_LOTE). Popular 5 milhões de reservas leva alguns minutos.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+import httpx
+
+from .fluxo_reserva import aguardar_servidor, semear, subir_servidor
+
+RESERVAS_POR_VIAGEM = 50
+LOTE = 50000  # múltiplo de RESERVAS_POR_VIAGEM: cada lote cria as próprias viagens
+
+
+# --------------------------------
+# Dados iniciais
+# --------------------------------
+def semear_reservas(quantidade: int, indice: int) -> dict:
+    """Um passageiro com `quantidade` reservas. Retorna o cabeçalho de autenticação dele."""
+    from sqlalchemy import insert
+    from app.db import SessionLocal
+    from app import models
+    from app.routers.auth import criar_token
+
+    email = f"exportacao{indice}@bench.local"
+    with SessionLocal() as db:
+        motorista = models.Usuario(nome=f"Motorista {indice}", email=f"motorista.exportacao{indice}@bench.local",
+                                   senha_hash="x", tipo="motorista")
+        passageiro = models.Usuario(nome=f"Passageiro {indice}", email=email, senha_hash="x", tipo="passageiro")
+        db.add_all([motorista, passageiro])
+        db.commit()
+
+        inicio = datetime(2030, 1, 1, 6, 0)
+        for deslocamento in range(0, quantidade, LOTE):
+            tamanho = min(LOTE, quantidade - deslocamento)
+            primeira = deslocamento // RESERVAS_POR_VIAGEM
+            viagens = db.execute(insert(models.Viagem).returning(models.Viagem.id), [
+                {"origem": "Salvador", "destino": "Serrinha", "horario_partida": inicio + timedelta(minutes=15 * n),
+                 "vagas_disponiveis": 3, "status": "agendada", "motorista_id": motorista.id}
+                for n in range(primeira, primeira + -(-tamanho // RESERVAS_POR_VIAGEM))
+            ]).scalars().all()
+            db.execute(insert(models.Reserva), [
+                {"viagem_id": viagens[n // RESERVAS_POR_VIAGEM], "passageiro_id": passageiro.id,
+                 "status": "confirmada" if n % RESERVAS_POR_VIAGEM == 0 else "cancelada"}
+                for n in range(tamanho)
+            ])
+            db.commit()
+            print(f"  {deslocamento + tamanho} reservas")
+    return {"Authorization": "Bearer " + criar_token({"sub": email, "id": passageiro.id, "tipo": "passageiro"})}
+
+
+# --------------------------------
+# Medição
+# --------------------------------
+def _rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as arquivo:
+        for linha in arquivo:
+            if linha.startswith("VmRSS:"):
+                return int(linha.split()[1]) / 1024
+    return 0.0
+
+
+class PicoRSS:
+    """Amostra o RSS de um processo numa thread até `parar()`; guarda o maior valor."""
+
+    def __init__(self, pid: int, intervalo: float = 0.02):
+        self.pid, self.intervalo = pid, intervalo
+        self.pico = _rss_mb(pid)
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._amostrar, daemon=True)
+        self._thread.start()
+
+    def _amostrar(self):
+        while not self._parar.wait(self.intervalo):
+            self.pico = max(self.pico, _rss_mb(self.pid))
+
+    def parar(self) -> float:
+        self._parar.set()
+        self._thread.join()
+        return max(self.pico, _rss_mb(self.pid))
+
+
+async def baixar(url: str, cabecalho: dict, formato: str) -> tuple:
+    """Baixa a exportação inteira sem guardá-la. Retorna (linhas, bytes)."""
+    linhas = tamanho = 0
+    async with httpx.AsyncClient(base_url=url, timeout=None) as cliente:
+        async with cliente.stream("GET", "/reservas/minhas", headers={**cabecalho, "Accept": formato}) as resposta:
+            resposta.raise_for_status()
+            async for pedaco in resposta.aiter_bytes():
+                linhas += pedaco.count(b"\n")
+                tamanho += len(pedaco)
+    return linhas, tamanho
+
+
+def medir(servidor, url: str, cabecalho: dict, formato: str) -> dict:
+    rss_antes = _rss_mb(servidor.pid)
+    pico = PicoRSS(servidor.pid)
+    inicio = time.perf_counter()
+    linhas, tamanho = asyncio.run(baixar(url, cabecalho, formato))
+    duracao = time.perf_counter() - inicio
+    return {
+        "linhas": linhas, "mb": tamanho / 2 ** 20, "segundos": duracao,
+        "rss_antes_mb": rss_antes, "rss_pico_mb": pico.parar(),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reservas", type=int, nargs="+", default=[100000, 1000000], help="tamanhos das exportações")
+    parser.add_argument("--formato", choices=["application/x-ndjson", "text/csv"], default="application/x-ndjson")
+    parser.add_argument("--limite-rss-mb", type=float, default=200, help="pico de RSS aceito no servidor")
+    parser.add_argument("--porta", type=int, default=8768)
+    args = parser.parse_args()
+
+    database_url = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="bench-"), "bench.db")
+    semear(database_url, 0, 0, 0)  # só as tabelas
+    cabecalhos = {}
+    for indice, quantidade in enumerate(args.reservas):
+        print(f"Populando {quantidade} reservas...")
+        cabecalhos[quantidade] = semear_reservas(quantidade, indice)
+
+    servidor = subir_servidor(database_url, args.porta, 1)
+    url = f"http://127.0.0.1:{args.porta}"
+    resultados = {}
+    try:
+        asyncio.run(aguardar_servidor(url))
+        for quantidade in args.reservas:
+            print(f"Exportando {quantidade} reservas ({args.formato})...")
+            resultados[quantidade] = medir(servidor, url, cabecalhos[quantidade], args.formato)
+    finally:
+        servidor.terminate()
+        servidor.wait()
+
+    ok = True
+    # CSV tem uma linha de cabeçalho a mais
+    extra = 1 if args.formato == "text/csv" else 0
+    print(f"\n{'reservas':>10}{'linhas':>10}{'MB':>9}{'linhas/s':>11}{'MB/s':>8}{'RSS antes':>11}{'RSS pico':>10}")
+    for quantidade, r in resultados.items():
+        print(f"{quantidade:>10}{r['linhas']:>10}{r['mb']:>9.1f}{r['linhas'] / r['segundos']:>11.0f}"
+              f"{r['mb'] / r['segundos']:>8.1f}{r['rss_antes_mb']:>11.1f}{r['rss_pico_mb']:>10.1f}")
+        if r["linhas"] != quantidade + extra:
+            print(f"  faltaram linhas: {r['linhas']} de {quantidade + extra}")
+            ok = False
+        if r["rss_pico_mb"] > args.limite_rss_mb:
+            print(f"  pico de RSS acima do limite de {args.limite_rss_mb:.0f} MB")
+            ok = False
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,297 @@
+"""
+Benchmark do fluxo completo de reserva contra um uvicorn local.
+
+Cada usuário virtual faz: registrar -> login -> (buscar viagens -> reservar ->
+cancelar -> avaliar motorista) x iterações, com `--usuarios` rodando ao mesmo tempo.
+No fim mostra, por endpoint, quantidade, falhas, req/s e latência p50/p95/p99.
+
+Uso (a partir da pasta backend):
+
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.fluxo_reserva --usuarios 20 --iteracoes 10
+    python -m benchmarks.fluxo_reserva --salvar-baseline benchmarks/baselines/local.json
+    python -m benchmarks.fluxo_reserva --comparar benchmarks/baselines/local.json
+
+Sem `--url`, cria um banco SQLite temporário, popula com motoristas e viagens
+(via app.models) e sobe `uvicorn app.main:app` apontando para ele. Com `--url`,
+usa um servidor já rodando (e popula só se `--database-url` for informado).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+import httpx
+
+CIDADES = [
+    "Salvador", "Serrinha", "Feira de Santana", "Alagoinhas", "Conceição do Coité",
+    "Valente", "Riachão do Jacuípe", "Santaluz", "Euclides da Cunha", "Tucano",
+]
+DIAS_A_FRENTE = 30
+
+
+# --------------------------------
+# Dados iniciais
+# --------------------------------
+def semear(database_url: str, motoristas: int, viagens: int, semente: int) -> None:
+    """Cria as tabelas e insere motoristas e viagens usando os próprios modelos da API."""
+    os.environ["DATABASE_URL"] = database_url  # precisa vir antes de importar app.*
+    from app.db import Base, engine, SessionLocal
+    from app import models
+    from app.senhas import pwd_context
+
+    Base.metadata.create_all(bind=engine)
+    aleatorio = random.Random(semente)
+    senha_hash = pwd_context.hash("bench")  # o mesmo hash para todos: bcrypt é caro
+
+    with SessionLocal() as db:
+        lote = [
+            models.Usuario(
+                nome=f"Motorista {i}", email=f"motorista{i}-{uuid.uuid4().hex[:6]}@bench.local",
+                senha_hash=senha_hash, tipo="motorista", telefone="71999990000",
+                numero_cnh=f"{i:011d}", modelo_carro="Fiat Uno", placa_carro=f"BEN-{i:04d}",
+            )
+            for i in range(motoristas)
+        ]
+        db.add_all(lote)
+        db.flush()
+
+        hoje = datetime.combine(date.today(), datetime.min.time())
+        for _ in range(viagens):
+            origem, destino = aleatorio.sample(CIDADES, 2)
+            db.add(models.Viagem(
+                origem=origem,
+                destino=destino,
+                horario_partida=hoje + timedelta(
+                    days=aleatorio.randrange(DIAS_A_FRENTE), hours=aleatorio.randrange(5, 22),
+                    minutes=aleatorio.choice([0, 15, 30, 45]),
+                ),
+                vagas_disponiveis=aleatorio.randint(1, 4),
+                motorista_id=aleatorio.choice(lote).id,
+            ))
+        db.commit()
+
+
+# --------------------------------
+# Servidor
+# --------------------------------
+def subir_servidor(database_url: str, porta: int, workers: int) -> subprocess.Popen:
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(porta),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=backend,
+        env={**os.environ, "DATABASE_URL": database_url},
+    )
+
+
+async def aguardar_servidor(url: str, limite_segundos: float = 60) -> None:
+    fim = time.monotonic() + limite_segundos
+    async with httpx.AsyncClient(base_url=url) as cliente:
+        while time.monotonic() < fim:
+            try:
+                if (await cliente.get("/status/pool")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Servidor não respondeu em {url}")
+
+
+# --------------------------------
+# Fluxo de um usuário virtual
+# --------------------------------
+class Medicoes:
+    def __init__(self):
+        self.por_endpoint = {}  # nome -> lista de (segundos, status)
+
+    async def chamar(self, nome: str, fazer, tentativas: int = 5):
+        """
+        Executa `fazer()` (que devolve a corrotina da requisição) e registra tempo e status.
+        Respostas 429 (fila de hash de senha cheia) são repetidas após o Retry-After,
+        como um cliente real faria; cada tentativa entra na estatística.
+        """
+        for _ in range(tentativas):
+            inicio = time.perf_counter()
+            try:
+                resposta = await fazer()
+                status = resposta.status_code
+            except httpx.HTTPError:
+                resposta, status = None, 0
+            self.por_endpoint.setdefault(nome, []).append((time.perf_counter() - inicio, status))
+            if status != 429:
+                break
+            await asyncio.sleep(float(resposta.headers.get("Retry-After", 1)))
+        return resposta if resposta is not None and resposta.status_code < 300 else None
+
+
+async def usuario_virtual(cliente: httpx.AsyncClient, medicoes: Medicoes, iteracoes: int, aleatorio: random.Random):
+    email = f"passageiro-{uuid.uuid4().hex}@bench.local"
+    dados = {"nome": "Passageiro Bench", "email": email, "senha": "bench", "telefone": "71988880000", "tipo": "passageiro"}
+    if not await medicoes.chamar("registrar", lambda: cliente.post("/auth/registrar", data=dados)):
+        return
+    login = await medicoes.chamar("login", lambda: cliente.post("/auth/login", data={"username": email, "password": "bench"}))
+    if not login:
+        return
+    cabecalhos = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    for _ in range(iteracoes):
+        dia = date.today() + timedelta(days=aleatorio.randrange(DIAS_A_FRENTE))
+        filtros = {"origem": aleatorio.choice(CIDADES)[:4], "data": dia.strftime("%d/%m/%Y")}
+        busca = await medicoes.chamar("buscar_viagens", lambda: cliente.get("/viagens/", params=filtros))
+        if not busca:
+            continue
+        livres = [v for v in busca.json()["itens"] if v["vagas_disponiveis"] > 0 and v["status"] == "agendada"]
+        if not livres:
+            continue
+
+        viagem_id = aleatorio.choice(livres)["id"]
+        reserva = await medicoes.chamar(
+            "criar_reserva",
+            lambda: cliente.post("/reservas/", params={"viagem_id": viagem_id}, headers=cabecalhos),
+        )
+        if not reserva:
+            continue
+        reserva_id = reserva.json()["reserva"]["id"]
+        await medicoes.chamar("cancelar_reserva", lambda: cliente.put(f"/reservas/{reserva_id}/cancelar", headers=cabecalhos))
+        nota = aleatorio.randint(3, 5)
+        await medicoes.chamar(
+            "avaliar_motorista",
+            lambda: cliente.post(f"/reservas/{reserva_id}/avaliar_motorista", params={"nota": nota}, headers=cabecalhos),
+        )
+
+
+# --------------------------------
+# Relatório e baseline
+# --------------------------------
+def _percentil(valores: list, p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, max(0, round(p / 100 * len(ordenados)) - 1))]
+
+
+def resumir(medicoes: Medicoes, duracao: float) -> dict:
+    resultado = {}
+    for nome, amostras in medicoes.por_endpoint.items():
+        tempos = [t for t, _ in amostras]
+        falhas = {}
+        for _, status in amostras:
+            if not 200 <= status < 300:
+                falhas[str(status)] = falhas.get(str(status), 0) + 1  # 0 = erro de conexão/timeout
+        resultado[nome] = {
+            "n": len(amostras),
+            "falhas": sum(falhas.values()),
+            "falhas_por_status": falhas,
+            "rps": round(len(amostras) / duracao, 2),
+            "p50_ms": round(_percentil(tempos, 50) * 1000, 2),
+            "p95_ms": round(_percentil(tempos, 95) * 1000, 2),
+            "p99_ms": round(_percentil(tempos, 99) * 1000, 2),
+        }
+    return resultado
+
+
+def imprimir(resultado: dict, duracao: float) -> None:
+    print(f"\n{'endpoint':<18}{'n':>7}{'falhas':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for nome, r in resultado.items():
+        print(f"{nome:<18}{r['n']:>7}{r['falhas']:>8}{r['rps']:>9}{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}")
+    for nome, r in resultado.items():
+        if r["falhas"]:
+            print(f"  falhas em {nome} por status HTTP: {r['falhas_por_status']}")
+    total = sum(r["n"] for r in resultado.values())
+    print(f"\n{total} requisições em {duracao:.1f}s ({total / duracao:.1f} req/s)")
+
+
+def comparar(resultado: dict, baseline: dict, tolerancia: float) -> bool:
+    """Compara p95 e req/s com a baseline. Retorna False se algum endpoint piorou além da tolerância."""
+    ok = True
+    print(f"\nComparação com a baseline (tolerância {tolerancia:.0%}):")
+    for nome, base in baseline["resultado"].items():
+        atual = resultado.get(nome)
+        if atual is None:
+            print(f"  {nome:<18} ausente nesta execução")
+            continue
+        variacao_p95 = atual["p95_ms"] / base["p95_ms"] - 1 if base["p95_ms"] else 0.0
+        variacao_rps = atual["rps"] / base["rps"] - 1 if base["rps"] else 0.0
+        piorou = variacao_p95 > tolerancia or variacao_rps < -tolerancia
+        ok = ok and not piorou
+        print(f"  {nome:<18} p95 {variacao_p95:+.1%}  req/s {variacao_rps:+.1%}  {'REGRESSÃO' if piorou else 'ok'}")
+    return ok
+
+
+# --------------------------------
+# Execução
+# --------------------------------
+async def executar(url: str, usuarios: int, iteracoes: int, semente: int):
+    medicoes = Medicoes()
+    limites = httpx.Limits(max_connections=usuarios, max_keepalive_connections=usuarios)
+    async with httpx.AsyncClient(base_url=url, limits=limites, timeout=60) as cliente:
+        inicio = time.perf_counter()
+        await asyncio.gather(*[
+            usuario_virtual(cliente, medicoes, iteracoes, random.Random(semente + i)) for i in range(usuarios)
+        ])
+        duracao = time.perf_counter() - inicio
+    return medicoes, duracao
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--usuarios", type=int, default=20, help="usuários virtuais simultâneos")
+    parser.add_argument("--iteracoes", type=int, default=10, help="buscas/reservas por usuário")
+    parser.add_argument("--motoristas", type=int, default=50)
+    parser.add_argument("--viagens", type=int, default=3000)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1, help="workers do uvicorn")
+    parser.add_argument("--url", help="usar um servidor já rodando em vez de subir um")
+    parser.add_argument("--database-url", help="banco a popular (padrão: SQLite temporário)")
+    parser.add_argument("--salvar-baseline", metavar="ARQUIVO")
+    parser.add_argument("--comparar", metavar="ARQUIVO")
+    parser.add_argument("--tolerancia", type=float, default=0.2)
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    if database_url is None and args.url is None:
+        database_url = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="bench-"), "bench.db")
+    if database_url:
+        print(f"Populando {database_url} ({args.motoristas} motoristas, {args.viagens} viagens)...")
+        semear(database_url, args.motoristas, args.viagens, args.semente)
+
+    servidor = None
+    url = args.url
+    if url is None:
+        url = f"http://127.0.0.1:{args.porta}"
+        servidor = subir_servidor(database_url, args.porta, args.workers)
+    try:
+        asyncio.run(aguardar_servidor(url))
+        print(f"Executando: {args.usuarios} usuários x {args.iteracoes} iterações contra {url}")
+        medicoes, duracao = asyncio.run(executar(url, args.usuarios, args.iteracoes, args.semente))
+    finally:
+        if servidor is not None:
+            servidor.terminate()
+            servidor.wait()
+
+    resultado = resumir(medicoes, duracao)
+    imprimir(resultado, duracao)
+
+    if args.salvar_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.salvar_baseline)), exist_ok=True)
+        with open(args.salvar_baseline, "w", encoding="utf-8") as arquivo:
+            parametros = {k: v for k, v in vars(args).items() if k in ("usuarios", "iteracoes", "motoristas", "viagens", "semente", "workers")}
+            json.dump({"parametros": parametros, "duracao_s": round(duracao, 2), "resultado": resultado}, arquivo, indent=2, ensure_ascii=False)
+        print(f"Baseline salva em {args.salvar_baseline}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            if not comparar(resultado, json.load(arquivo), args.tolerancia):
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
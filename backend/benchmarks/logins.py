@@ -0,0 +1,124 @@
+"""
+Benchmark de logins por segundo conforme o tamanho do pool de hash de senha.
+
+Para cada valor em `--processos`, sobe `uvicorn app.main:app` (um worker) com
+HASH_PROCESSOS igual a esse valor e dispara `--logins` POST /auth/login,
+`--concorrencia` de cada vez. Cada login verifica um hash bcrypt no pool de
+processos (app/senhas.py); o resto do pedido (banco, token) roda no processo do app.
+
+Mostra logins/s, latência p50/p95/p99 e quantas respostas 429 (pool lotado) houve.
+Os 429 são repetidos após o Retry-After, como no fluxo_reserva, e entram na estatística.
+
+Uso (a partir da pasta backend):
+
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.logins --processos 1 2 4 8 --logins 400 --concorrencia 32
+
+Com mais processos que núcleos, os logins/s param de subir: a medida mostra até
+onde vale aumentar HASH_PROCESSOS na máquina.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+import httpx
+
+from .fluxo_reserva import Medicoes, aguardar_servidor, resumir, semear, subir_servidor
+
+SENHA = "bench"
+
+
+# --------------------------------
+# Dados iniciais
+# --------------------------------
+def semear_passageiros(database_url: str, quantidade: int) -> list:
+    """Cria as tabelas e `quantidade` passageiros com a senha SENHA. Retorna os e-mails."""
+    semear(database_url, 0, 0, 0)  # só as tabelas
+    from sqlalchemy import insert
+    from app.db import SessionLocal
+    from app import models
+    from app.senhas import pwd_context
+
+    senha_hash = pwd_context.hash(SENHA)
+    emails = [f"login{i}@bench.local" for i in range(quantidade)]
+    with SessionLocal() as db:
+        db.execute(insert(models.Usuario), [
+            {"nome": f"Passageiro {i}", "email": email, "senha_hash": senha_hash, "tipo": "passageiro"}
+            for i, email in enumerate(emails)
+        ])
+        db.commit()
+    return emails
+
+
+# --------------------------------
+# Medição
+# --------------------------------
+async def logar(url: str, emails: list, logins: int, concorrencia: int, semente: int) -> tuple:
+    medicoes = Medicoes()
+    aleatorio = random.Random(semente)
+    restantes = [logins]
+
+    async def cliente_virtual(cliente):
+        while restantes[0] > 0:
+            restantes[0] -= 1
+            dados = {"username": aleatorio.choice(emails), "password": SENHA}
+            await medicoes.chamar("login", lambda: cliente.post("/auth/login", data=dados), tentativas=20)
+
+    limites = httpx.Limits(max_connections=concorrencia, max_keepalive_connections=concorrencia)
+    async with httpx.AsyncClient(base_url=url, limits=limites, timeout=120) as cliente:
+        # Primeiro login fora da medida: sobe os processos do pool (spawn)
+        await cliente.post("/auth/login", data={"username": emails[0], "password": SENHA})
+        inicio = time.perf_counter()
+        await asyncio.gather(*[cliente_virtual(cliente) for _ in range(concorrencia)])
+        duracao = time.perf_counter() - inicio
+    return medicoes, duracao
+
+
+def medir(database_url: str, processos: int, emails: list, args) -> dict:
+    os.environ["HASH_PROCESSOS"] = str(processos)
+    servidor = subir_servidor(database_url, args.porta, 1)
+    try:
+        url = f"http://127.0.0.1:{args.porta}"
+        asyncio.run(aguardar_servidor(url))
+        medicoes, duracao = asyncio.run(logar(url, emails, args.logins, args.concorrencia, args.semente))
+    finally:
+        servidor.terminate()
+        servidor.wait()
+    r = resumir(medicoes, duracao)["login"]
+    r["logins_s"] = round((r["n"] - r["falhas"]) / duracao, 2)
+    return r
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processos", type=int, nargs="+", default=[1, 2, 4], help="valores de HASH_PROCESSOS")
+    parser.add_argument("--logins", type=int, default=400, help="logins medidos por valor")
+    parser.add_argument("--concorrencia", type=int, default=32, help="logins simultâneos")
+    parser.add_argument("--usuarios", type=int, default=100, help="passageiros cadastrados")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--porta", type=int, default=8767)
+    args = parser.parse_args()
+
+    database_url = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="bench-"), "bench.db")
+    emails = semear_passageiros(database_url, args.usuarios)
+
+    resultados = {}
+    for processos in args.processos:
+        print(f"Medindo HASH_PROCESSOS={processos}: {args.logins} logins, {args.concorrencia} simultâneos...")
+        resultados[processos] = medir(database_url, processos, emails, args)
+
+    print(f"\n{os.cpu_count()} núcleos")
+    print(f"{'processos':>10}{'logins/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'429':>7}{'outras falhas':>15}")
+    for processos, r in resultados.items():
+        recusas = r["falhas_por_status"].get("429", 0)
+        print(f"{processos:>10}{r['logins_s']:>10}{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}"
+              f"{recusas:>7}{r['falhas'] - recusas:>15}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+Benchmark da criação de viagens em lote (POST /viagens/lote).
+
+Cria `--viagens` viagens de um motorista de três formas e compara tempo,
+viagens/s e nº de consultas SQL:
+
+- lote: uma requisição com a lista explícita de horários (INSERT executemany)
+- recorrencia: uma requisição com recorrência diária cobrindo a mesma quantidade
+- individual: POST /viagens/ uma a uma; mede `--amostras-individuais` chamadas
+  e projeta o tempo para `--viagens`
+
+Uso (a partir da pasta backend):
+
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.lote --viagens 10000
+
+O app roda no próprio processo (TestClient) sobre um SQLite temporário, com
+VIAGENS_LOTE_MAXIMO elevado para caber `--viagens` numa requisição.
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROTA = {"origem": "Salvador", "destino": "Serrinha", "vagas_disponiveis": 4}
+
+
+def _consultas(resposta) -> int:
+    return int(re.search(r'desc="(\d+) consultas"', resposta.headers["Server-Timing"]).group(1))
+
+
+def _motorista(nome: str) -> dict:
+    """Motorista novo (sem viagens, para não haver conflito entre os modos) e o cabeçalho dele."""
+    from app.db import SessionLocal
+    from app import models
+    from app.routers.auth import criar_token
+
+    with SessionLocal() as db:
+        motorista = models.Usuario(nome=nome, email=f"{nome.lower()}@bench.local", senha_hash="x", tipo="motorista")
+        db.add(motorista)
+        db.commit()
+        token = criar_token({"sub": motorista.email, "id": motorista.id, "tipo": "motorista"})
+        return {"id": motorista.id, "cabecalhos": {"Authorization": f"Bearer {token}"}}
+
+
+def _viagens_do_motorista(motorista_id: int) -> int:
+    from app.db import SessionLocal
+    from app import models
+
+    with SessionLocal() as db:
+        return db.query(models.Viagem).filter(models.Viagem.motorista_id == motorista_id).count()
+
+
+# --------------------------------
+# Modos
+# --------------------------------
+def em_lote(cliente, motorista: dict, quantidade: int, inicio: datetime) -> tuple:
+    # Partidas a cada 3 h: respeita o intervalo mínimo entre viagens do motorista
+    horarios = [(inicio + timedelta(hours=3 * i)).strftime("%Y-%m-%dT%H:%M") for i in range(quantidade)]
+    resposta = cliente.post("/viagens/lote", json={**ROTA, "horarios": horarios}, headers=motorista["cabecalhos"])
+    assert resposta.status_code == 200, resposta.text
+    return quantidade, _consultas(resposta)
+
+
+def por_recorrencia(cliente, motorista: dict, quantidade: int, inicio: datetime) -> tuple:
+    fim = inicio + timedelta(days=quantidade - 1)
+    recorrencia = {
+        "dias_semana": list(range(7)), "hora": "06:00",
+        "inicio": inicio.strftime("%Y-%m-%d"), "fim": fim.strftime("%Y-%m-%d"),
+    }
+    resposta = cliente.post("/viagens/lote", json={**ROTA, "recorrencia": recorrencia}, headers=motorista["cabecalhos"])
+    assert resposta.status_code == 200, resposta.text
+    return resposta.json()["quantidade"], _consultas(resposta)
+
+
+def individual(cliente, motorista: dict, quantidade: int, inicio: datetime) -> tuple:
+    consultas = 0
+    for i in range(quantidade):
+        horario = (inicio + timedelta(hours=3 * i)).strftime("%Y-%m-%dT%H:%M")
+        resposta = cliente.post("/viagens/", params={**ROTA, "horario_partida": horario}, headers=motorista["cabecalhos"])
+        assert resposta.status_code == 200, resposta.text
+        consultas += _consultas(resposta)
+    return quantidade, consultas
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--viagens", type=int, default=10000)
+    parser.add_argument("--amostras-individuais", type=int, default=300,
+                        help="viagens criadas uma a uma para a projeção (0 para pular)")
+    args = parser.parse_args()
+
+    # Precisam vir antes de importar app.*
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="bench-"), "bench.db")
+    os.environ["VIAGENS_LOTE_MAXIMO"] = str(args.viagens)
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    cliente = TestClient(app)
+    inicio = datetime(2030, 1, 1, 6, 0)
+    modos = [("lote", em_lote, args.viagens), ("recorrencia", por_recorrencia, args.viagens)]
+    if args.amostras_individuais:
+        modos.append(("individual", individual, args.amostras_individuais))
+
+    print(f"\n{'modo':<13}{'viagens':>9}{'segundos':>10}{'viagens/s':>11}{'consultas':>11}{f'proj. {args.viagens}':>14}")
+    for nome, criar, quantidade in modos:
+        motorista = _motorista(nome)
+        comeco = time.perf_counter()
+        criadas, consultas = criar(cliente, motorista, quantidade, inicio)
+        duracao = time.perf_counter() - comeco
+        assert _viagens_do_motorista(motorista["id"]) == criadas == quantidade
+        projecao = duracao / criadas * args.viagens
+        print(f"{nome:<13}{criadas:>9}{duracao:>10.2f}{criadas / duracao:>11.0f}{consultas:>11}{projecao:>13.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
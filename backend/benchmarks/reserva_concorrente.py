@@ -0,0 +1,132 @@
+"""
+Benchmark de reservas simultâneas numa única viagem (POST /reservas/).
+
+Dispara `--tentativas` reservas de passageiros diferentes contra uma viagem com
+`--vagas` vagas, `--concorrencia` de cada vez, e mede req/s e latência. No fim
+confere no banco que não houve venda a mais: vagas_disponiveis == 0 e exatamente
+`--vagas` reservas confirmadas (falha com código 1 se não bater).
+
+Uso (a partir da pasta backend):
+
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.reserva_concorrente --tentativas 2000 --vagas 500 --concorrencia 50
+
+O app roda no próprio processo (httpx.ASGITransport) sobre um SQLite temporário;
+as rotas síncronas rodam no threadpool, então as reservas disputam a vaga de verdade.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import httpx
+
+from .fluxo_reserva import Medicoes, resumir
+
+
+# --------------------------------
+# Dados iniciais
+# --------------------------------
+def semear(tentativas: int, vagas: int) -> tuple:
+    """Uma viagem com `vagas` vagas e `tentativas` passageiros. Retorna (viagem_id, cabeçalhos)."""
+    from sqlalchemy import insert
+    from app.db import SessionLocal
+    from app import models
+    from app.routers.auth import criar_token
+
+    with SessionLocal() as db:
+        motorista = models.Usuario(nome="Motorista Bench", email="motorista@bench.local", senha_hash="x", tipo="motorista")
+        db.add(motorista)
+        db.flush()
+        viagem = models.Viagem(
+            origem="Salvador", destino="Serrinha", horario_partida=datetime(2030, 1, 1, 6, 0),
+            vagas_disponiveis=vagas, status="agendada", motorista_id=motorista.id,
+        )
+        db.add(viagem)
+        db.execute(insert(models.Usuario), [
+            {"nome": f"Passageiro {i}", "email": f"reserva{i}@bench.local", "senha_hash": "x", "tipo": "passageiro"}
+            for i in range(tentativas)
+        ])
+        db.commit()
+        passageiros = db.query(models.Usuario.id, models.Usuario.email).filter(models.Usuario.tipo == "passageiro")
+        cabecalhos = [
+            {"Authorization": "Bearer " + criar_token({"sub": email, "id": id, "tipo": "passageiro"})}
+            for id, email in passageiros
+        ]
+        return viagem.id, cabecalhos
+
+
+def conferir(viagem_id: int) -> tuple:
+    """(vagas_disponiveis, reservas confirmadas) da viagem, direto do banco."""
+    from app.db import SessionLocal
+    from app import models
+
+    with SessionLocal() as db:
+        vagas = db.query(models.Viagem.vagas_disponiveis).filter(models.Viagem.id == viagem_id).scalar()
+        confirmadas = (
+            db.query(models.Reserva)
+            .filter(models.Reserva.viagem_id == viagem_id, models.Reserva.status == "confirmada")
+            .count()
+        )
+        return vagas, confirmadas
+
+
+# --------------------------------
+# Medição
+# --------------------------------
+async def reservar_todas(app, viagem_id: int, cabecalhos: list, concorrencia: int) -> Medicoes:
+    medicoes = Medicoes()
+    fila = asyncio.Queue()
+    for c in cabecalhos:
+        fila.put_nowait(c)
+
+    async def trabalhador(cliente):
+        while not fila.empty():
+            c = fila.get_nowait()
+            # 400 (sem vagas) é a resposta esperada depois que a viagem lota
+            await medicoes.chamar("reservar", lambda: cliente.post("/reservas/", params={"viagem_id": viagem_id}, headers=c))
+
+    transporte = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://bench", timeout=60) as cliente:
+        await asyncio.gather(*[trabalhador(cliente) for _ in range(concorrencia)])
+    return medicoes
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tentativas", type=int, default=2000, help="reservas disparadas (uma por passageiro)")
+    parser.add_argument("--vagas", type=int, default=500, help="vagas da viagem")
+    parser.add_argument("--concorrencia", type=int, default=50, help="reservas simultâneas")
+    args = parser.parse_args()
+
+    # Precisa vir antes de importar app.*
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="bench-"), "bench.db")
+    from app.main import app
+
+    viagem_id, cabecalhos = semear(args.tentativas, args.vagas)
+    print(f"Reservando: {args.tentativas} passageiros, {args.vagas} vagas, {args.concorrencia} simultâneas...")
+    inicio = time.perf_counter()
+    medicoes = asyncio.run(reservar_todas(app, viagem_id, cabecalhos, args.concorrencia))
+    duracao = time.perf_counter() - inicio
+
+    r = resumir(medicoes, duracao)["reservar"]
+    aceitas = r["n"] - r["falhas"]
+    print(f"\n{'n':>7}{'aceitas':>9}{'recusadas':>11}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    print(f"{r['n']:>7}{aceitas:>9}{r['falhas']:>11}{r['rps']:>9}{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}")
+    print(f"  respostas de erro por status HTTP: {r['falhas_por_status']}")
+
+    esperado = min(args.vagas, args.tentativas)
+    vagas, confirmadas = conferir(viagem_id)
+    print(f"\nNo banco: {confirmadas} reservas confirmadas, {vagas} vagas restantes")
+    if aceitas != confirmadas or confirmadas != esperado or vagas != args.vagas - esperado:
+        print("VENDA A MAIS (ou vaga perdida): contagens não batem")
+        return 1
+    print("Sem venda a mais.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
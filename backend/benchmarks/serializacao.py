@@ -0,0 +1,131 @@
+"""
+Micro-benchmark do custo de serializar as listagens, por 10 mil linhas.
+
+Monta em memória (sem banco) uma página de `--linhas` itens de cada listagem e
+mede, para cada uma, os caminhos que o FastAPI pode seguir até os bytes da resposta:
+
+- jsonable_encoder: sem response_model (como era antes): jsonable_encoder + json.dumps
+- response_model:   com response_model e JSONResponse (o que as rotas usam hoje):
+                    validação pelo pydantic-core + dump_json direto para bytes
+- orjson:           com response_model e ORJSONResponse: validação + dump para
+                    tipos JSON em Python + orjson.dumps (só se o orjson estiver instalado)
+
+As listagens são GET /viagens/ (dicts aninhados), GET /reservas/minhas (dicts
+planos) e GET /suporte/ (objetos ORM, lidos com from_attributes).
+
+Uso (a partir da pasta backend):
+
+    python -m benchmarks.serializacao --linhas 10000 --repeticoes 20
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+
+from .fluxo_reserva import CIDADES, _percentil
+
+
+# --------------------------------
+# Páginas de exemplo
+# --------------------------------
+def pagina_viagens(linhas: int) -> dict:
+    inicio = datetime(2030, 1, 1, 6, 0)
+    itens = []
+    for i in range(linhas):
+        partida = inicio + timedelta(minutes=15 * i)
+        itens.append({
+            "id": i, "origem": CIDADES[i % len(CIDADES)], "destino": CIDADES[(i + 3) % len(CIDADES)],
+            "horario_partida": partida.strftime("%d/%m - %H:%M"), "vagas_disponiveis": i % 5, "status": "agendada",
+            "motorista": {
+                "id": i % 50, "nome": f"Motorista {i % 50}",
+                "avaliacao": {"media": 4.5, "quantidade": 12, "nota_bayesiana": 4.31},
+            },
+        })
+    return {"itens": itens, "next_cursor": "eyJpZCI6IDF9"}
+
+
+def pagina_minhas_reservas(linhas: int) -> dict:
+    inicio = datetime(2030, 1, 1, 6, 0)
+    itens = [
+        {"reserva_id": i, "viagem_id": i, "origem": CIDADES[i % len(CIDADES)], "destino": CIDADES[(i + 3) % len(CIDADES)],
+         "horario_partida": (inicio + timedelta(minutes=15 * i)).strftime("%d/%m - %H:%M"),
+         "status_reserva": "confirmada", "status_viagem": "agendada"}
+        for i in range(linhas)
+    ]
+    return {"itens": itens, "next_cursor": None}
+
+
+def pagina_tickets(linhas: int) -> dict:
+    from app import models
+
+    criado = datetime(2030, 1, 1, 6, 0)
+    itens = [
+        models.TicketSuporte(id=i, usuario_id=i % 100, tipo_usuario="passageiro", assunto=f"Assunto {i}",
+                             mensagem="Não consigo cancelar a reserva.", status="aberto",
+                             criado_em=criado + timedelta(minutes=i))
+        for i in range(linhas)
+    ]
+    return {"itens": itens, "next_cursor": None}
+
+
+# --------------------------------
+# Caminhos de serialização
+# --------------------------------
+def caminhos(modelo) -> dict:
+    """{nome: função(página) -> bytes} para o response_model `modelo`."""
+    from fastapi.encoders import jsonable_encoder
+    from pydantic import TypeAdapter
+
+    adaptador = TypeAdapter(modelo)
+    resultado = {
+        "jsonable_encoder": lambda pagina: json.dumps(jsonable_encoder(pagina), ensure_ascii=False).encode(),
+        "response_model": lambda pagina: adaptador.dump_json(adaptador.validate_python(pagina, from_attributes=True)),
+    }
+    try:
+        import orjson
+    except ImportError:
+        return resultado
+    resultado["orjson"] = lambda pagina: orjson.dumps(
+        adaptador.dump_python(adaptador.validate_python(pagina, from_attributes=True), mode="json")
+    )
+    return resultado
+
+
+def medir(serializar, pagina, repeticoes: int) -> tuple:
+    tamanho = len(serializar(pagina))  # aquecimento
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        serializar(pagina)
+        tempos.append(time.perf_counter() - inicio)
+    return tempos, tamanho
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, default=10000, help="itens por página")
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args()
+
+    from app import schemas
+
+    listagens = {
+        "viagens": (schemas.PaginaResponse[schemas.ViagemListagem], pagina_viagens(args.linhas)),
+        "minhas_reservas": (schemas.PaginaResponse[schemas.MinhaReserva], pagina_minhas_reservas(args.linhas)),
+        "tickets": (schemas.PaginaResponse[schemas.TicketSuporteResponse], pagina_tickets(args.linhas)),
+    }
+
+    print(f"{args.linhas} linhas por página, {args.repeticoes} repetições")
+    print(f"\n{'listagem':<17}{'caminho':<18}{'p50 ms':>9}{'p95 ms':>9}{'ms/10k':>9}{'KB':>8}")
+    for nome, (modelo, pagina) in listagens.items():
+        for caminho, serializar in caminhos(modelo).items():
+            tempos, tamanho = medir(serializar, pagina, args.repeticoes)
+            p50 = _percentil(tempos, 50) * 1000
+            print(f"{nome:<17}{caminho:<18}{p50:>9.1f}{_percentil(tempos, 95) * 1000:>9.1f}"
+                  f"{p50 * 10000 / args.linhas:>9.1f}{tamanho / 1024:>8.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
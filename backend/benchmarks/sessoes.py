@@ -0,0 +1,146 @@
+"""
+Benchmark do custo de CPU para manter sessões ativas: renovar com login (bcrypt)
+versus renovar com refresh token (POST /auth/refresh, sem bcrypt).
+
+Cada amostra é uma sessão renovando uma vez, pelo caminho completo da API (rotas,
+banco, gravação do novo refresh token). Mede a CPU do processo e dos processos do
+pool de hash de senha e projeta o custo de `--sessoes` sessões ativas, cada uma
+renovando a cada ACCESS_TOKEN_EXPIRE_MINUTES.
+
+Uso (a partir da pasta backend; só Linux/macOS, usa o módulo `resource`):
+
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.sessoes --sessoes 10000 --amostras 200
+
+O app roda no próprio processo (httpx.ASGITransport) sobre um SQLite temporário.
+A CPU do modo login inclui a subida dos processos do pool de hash, diluída nas amostras.
+"""
+import argparse
+import asyncio
+import os
+import resource
+import sys
+import tempfile
+import time
+import uuid
+
+import httpx
+
+from .fluxo_reserva import Medicoes, resumir
+
+
+# --------------------------------
+# Dados iniciais
+# --------------------------------
+def semear(quantidade: int) -> list:
+    """Cria `quantidade` passageiros com senha "bench" e um refresh token cada. Retorna [(email, refresh_token)]."""
+    from app.db import SessionLocal
+    from app import models
+    from app.senhas import pwd_context
+    from app.routers.auth import emitir_refresh_token
+
+    senha_hash = pwd_context.hash("bench")  # o mesmo hash para todos: bcrypt é caro
+    sessoes = []
+    with SessionLocal() as db:
+        usuarios = [
+            models.Usuario(nome=f"Passageiro {i}", email=f"sessao{i}-{uuid.uuid4().hex[:6]}@bench.local",
+                           senha_hash=senha_hash, tipo="passageiro")
+            for i in range(quantidade)
+        ]
+        db.add_all(usuarios)
+        db.flush()
+        sessoes = [(u.email, emitir_refresh_token(db, u.id)) for u in usuarios]
+        db.commit()
+    return sessoes
+
+
+# --------------------------------
+# Medição
+# --------------------------------
+def _cpu_segundos() -> float:
+    """CPU (usuário + sistema) deste processo e dos filhos já encerrados (pool de hash)."""
+    total = 0.0
+    for quem in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN):
+        uso = resource.getrusage(quem)
+        total += uso.ru_utime + uso.ru_stime
+    return total
+
+
+async def _renovar_todas(app, sessoes: list, modo: str, concorrencia: int) -> Medicoes:
+    medicoes = Medicoes()
+    fila = asyncio.Queue()
+    for sessao in sessoes:
+        fila.put_nowait(sessao)
+
+    async def trabalhador(cliente):
+        while not fila.empty():
+            email, refresh_token = fila.get_nowait()
+            if modo == "login":
+                await medicoes.chamar("login", lambda: cliente.post(
+                    "/auth/login", data={"username": email, "password": "bench"}))
+            else:
+                await medicoes.chamar("refresh", lambda: cliente.post(
+                    "/auth/refresh", data={"refresh_token": refresh_token}))
+
+    transporte = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://bench") as cliente:
+        await asyncio.gather(*[trabalhador(cliente) for _ in range(concorrencia)])
+    return medicoes
+
+
+def medir(app, sessoes: list, modo: str, concorrencia: int) -> dict:
+    from app.senhas import encerrar_pool
+
+    cpu_inicio, inicio = _cpu_segundos(), time.perf_counter()
+    medicoes = asyncio.run(_renovar_todas(app, sessoes, modo, concorrencia))
+    encerrar_pool()  # aguarda os processos do pool: a CPU deles entra em RUSAGE_CHILDREN
+    duracao = time.perf_counter() - inicio
+    cpu = _cpu_segundos() - cpu_inicio
+
+    resultado = resumir(medicoes, duracao)[modo]
+    resultado.update(cpu_s=round(cpu, 2), cpu_ms_por_renovacao=round(cpu / len(sessoes) * 1000, 2))
+    return resultado
+
+
+# --------------------------------
+# Relatório
+# --------------------------------
+def imprimir(resultados: dict, sessoes_ativas: int, expira_minutos: int) -> None:
+    renovacoes_hora = 60 / expira_minutos
+    print(f"\nProjeção: {sessoes_ativas} sessões ativas, cada uma renovando a cada {expira_minutos} min")
+    print(f"\n{'modo':<9}{'n':>6}{'falhas':>8}{'req/s':>9}{'p95 ms':>9}{'CPU ms/renov.':>15}{'CPU s/hora':>12}{'núcleos':>9}")
+    for modo, r in resultados.items():
+        cpu_hora = sessoes_ativas * renovacoes_hora * r["cpu_ms_por_renovacao"] / 1000
+        print(f"{modo:<9}{r['n']:>6}{r['falhas']:>8}{r['rps']:>9}{r['p95_ms']:>9}"
+              f"{r['cpu_ms_por_renovacao']:>15}{cpu_hora:>12.1f}{cpu_hora / 3600:>9.3f}")
+    if {"login", "refresh"} <= resultados.keys() and resultados["refresh"]["cpu_ms_por_renovacao"]:
+        razao = resultados["login"]["cpu_ms_por_renovacao"] / resultados["refresh"]["cpu_ms_por_renovacao"]
+        print(f"\nRenovar por login custa {razao:.1f}x a CPU do refresh token.")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessoes", type=int, default=10000, help="sessões ativas para a projeção")
+    parser.add_argument("--amostras", type=int, default=200, help="renovações medidas em cada modo")
+    parser.add_argument("--concorrencia", type=int, default=4, help="renovações simultâneas")
+    args = parser.parse_args()
+
+    # Precisa vir antes de importar app.*
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="bench-"), "bench.db")
+    from app.main import app
+    from app.config import ACCESS_TOKEN_EXPIRE_MINUTES
+
+    print(f"Criando {args.amostras} sessões...")
+    sessoes = semear(args.amostras)
+
+    resultados = {}
+    for modo in ("login", "refresh"):
+        print(f"Medindo {modo} ({args.amostras} renovações, {args.concorrencia} simultâneas)...")
+        resultados[modo] = medir(app, sessoes, modo, args.concorrencia)
+
+    imprimir(resultados, args.sessoes, ACCESS_TOKEN_EXPIRE_MINUTES)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""
+Benchmark de uploads simultâneos de documentos (10 MB por padrão).
+
+Duas medidas:
+
+- armazenamento: `--uploads` arquivos salvos direto por armazenamento.salvar, de
+  `--concorrencia` threads ao mesmo tempo (hash SHA-256 + escrita em disco, o
+  trabalho que roda no threadpool durante o registro)
+- api: `--uploads` POST /auth/registrar de motoristas com o documento anexado,
+  `--concorrencia` de cada vez, contra `uvicorn app.main:app`. Inclui a leitura do
+  formulário pelo Starlette (que guarda o arquivo num SpooledTemporaryFile antes
+  da rota rodar) e o bcrypt da senha, que costuma dominar o tempo
+
+Em cada medida, uma fração `--duplicados` dos arquivos repete o conteúdo de outro:
+o armazenamento endereçado por conteúdo guarda esses uma vez só, o que aparece
+na coluna de MB em disco.
+
+Uso (a partir da pasta backend):
+
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.uploads --uploads 100 --concorrencia 16 --mb 10
+"""
+import argparse
+import asyncio
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+from .fluxo_reserva import Medicoes, _percentil, aguardar_servidor, resumir, semear, subir_servidor
+
+
+# --------------------------------
+# Conteúdo dos arquivos
+# --------------------------------
+def conteudos(uploads: int, duplicados: float, semente: int) -> list:
+    """Semente do conteúdo de cada upload; uploads duplicados repetem a de um anterior."""
+    aleatorio = random.Random(semente)
+    sementes = []
+    for i in range(uploads):
+        sementes.append(aleatorio.choice(sementes) if sementes and aleatorio.random() < duplicados else i)
+    return sementes
+
+
+def gerar(semente: int, tamanho: int) -> bytes:
+    return random.Random(semente).randbytes(tamanho)
+
+
+def _mb_em_disco(raiz: str) -> float:
+    total = 0
+    for pasta, _, arquivos in os.walk(raiz):
+        total += sum(os.path.getsize(os.path.join(pasta, a)) for a in arquivos)
+    return total / 2 ** 20
+
+
+# --------------------------------
+# Medições
+# --------------------------------
+def medir_armazenamento(sementes: list, tamanho: int, concorrencia: int) -> dict:
+    from app.armazenamento import ArmazenamentoLocal
+
+    raiz = tempfile.mkdtemp(prefix="bench-uploads-")
+    armazenamento = ArmazenamentoLocal(raiz)
+    arquivos = {s: gerar(s, tamanho) for s in set(sementes)}  # gerado antes: fora da medida
+
+    def salvar(semente):
+        inicio = time.perf_counter()
+        armazenamento.salvar(io.BytesIO(arquivos[semente]), "documentos", ".pdf")
+        return time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+        tempos = list(executor.map(salvar, sementes))
+    duracao = time.perf_counter() - inicio
+    return {
+        "n": len(sementes), "falhas": 0, "duracao": duracao,
+        "p50_ms": round(_percentil(tempos, 50) * 1000, 2), "p95_ms": round(_percentil(tempos, 95) * 1000, 2),
+        "mb_em_disco": _mb_em_disco(raiz),
+    }
+
+
+async def registrar_todos(url: str, sementes: list, tamanho: int, concorrencia: int) -> tuple:
+    medicoes = Medicoes()
+    fila = asyncio.Queue()
+    for i, semente in enumerate(sementes):
+        fila.put_nowait((i, semente))
+
+    async def trabalhador(cliente):
+        while not fila.empty():
+            i, semente = fila.get_nowait()
+            dados = {
+                "nome": f"Motorista {i}", "email": f"upload{i}@bench.local", "senha": "bench",
+                "telefone": "71999990000", "tipo": "motorista", "numero_cnh": f"{i:011d}",
+                "modelo_carro": "Fiat Uno", "placa_carro": f"UPL-{i:04d}",
+            }
+            arquivos = {"documento": (f"cnh{i}.pdf", gerar(semente, tamanho), "application/pdf")}
+            await medicoes.chamar("registrar", lambda: cliente.post("/auth/registrar", data=dados, files=arquivos))
+
+    limites = httpx.Limits(max_connections=concorrencia, max_keepalive_connections=concorrencia)
+    async with httpx.AsyncClient(base_url=url, limits=limites, timeout=300) as cliente:
+        inicio = time.perf_counter()
+        await asyncio.gather(*[trabalhador(cliente) for _ in range(concorrencia)])
+        duracao = time.perf_counter() - inicio
+    return medicoes, duracao
+
+
+def medir_api(sementes: list, tamanho: int, concorrencia: int, porta: int) -> dict:
+    database_url = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="bench-"), "bench.db")
+    semear(database_url, 0, 0, 0)  # só as tabelas
+    raiz = tempfile.mkdtemp(prefix="bench-uploads-")
+    os.environ["UPLOAD_DIR"] = raiz
+    os.environ["UPLOAD_TAMANHO_MAXIMO_MB"] = str(max(10, -(-tamanho // 2 ** 20)))
+    # Sem 429 do pool de hash: cada nova tentativa reenviaria o arquivo inteiro
+    os.environ["HASH_MAX_PENDENTES"] = str(concorrencia)
+    servidor = subir_servidor(database_url, porta, 1)
+    try:
+        url = f"http://127.0.0.1:{porta}"
+        asyncio.run(aguardar_servidor(url))
+        medicoes, duracao = asyncio.run(registrar_todos(url, sementes, tamanho, concorrencia))
+    finally:
+        servidor.terminate()
+        servidor.wait()
+    r = resumir(medicoes, duracao)["registrar"]
+    r.update(duracao=duracao, mb_em_disco=_mb_em_disco(os.path.join(raiz, "documentos")))
+    return r
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=100)
+    parser.add_argument("--concorrencia", type=int, default=16, help="uploads simultâneos")
+    parser.add_argument("--mb", type=float, default=10, help="tamanho de cada arquivo")
+    parser.add_argument("--duplicados", type=float, default=0.2, help="fração de arquivos com conteúdo repetido")
+    parser.add_argument("--medidas", nargs="+", choices=["armazenamento", "api"], default=["armazenamento", "api"])
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--porta", type=int, default=8769)
+    args = parser.parse_args()
+
+    # Precisa vir antes de importar app.*
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="bench-"), "bench.db")
+    tamanho = int(args.mb * 2 ** 20)
+    sementes = conteudos(args.uploads, args.duplicados, args.semente)
+
+    resultados = {}
+    for medida in args.medidas:
+        print(f"Medindo {medida}: {args.uploads} uploads de {args.mb:g} MB, {args.concorrencia} simultâneos...")
+        if medida == "armazenamento":
+            resultados[medida] = medir_armazenamento(sementes, tamanho, args.concorrencia)
+        else:
+            resultados[medida] = medir_api(sementes, tamanho, args.concorrencia, args.porta)
+
+    enviados = args.uploads * tamanho / 2 ** 20
+    print(f"\n{len(set(sementes))} arquivos distintos em {args.uploads} uploads ({enviados:.0f} MB enviados)")
+    print(f"{'medida':<15}{'n':>6}{'falhas':>8}{'uploads/s':>11}{'MB/s':>8}{'p50 ms':>10}{'p95 ms':>10}{'MB em disco':>13}")
+    for medida, r in resultados.items():
+        print(f"{medida:<15}{r['n']:>6}{r['falhas']:>8}{args.uploads / r['duracao']:>11.1f}{enviados / r['duracao']:>8.1f}"
+              f"{r['p50_ms']:>10}{r['p95_ms']:>10}{r['mb_em_disco']:>13.0f}")
+        if r.get("falhas_por_status"):
+            print(f"  falhas por status HTTP: {r['falhas_por_status']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+import itertools
+import os
+import re
+import tempfile
+from datetime import datetime, timedelta
+
+# Banco e uploads temporários: precisa vir antes de qualquer import de `app`
+_TMP = tempfile.mkdtemp(prefix="rota_certa_testes_")
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP}/testes.db"
+os.environ["UPLOAD_DIR"] = os.path.join(_TMP, "uploads")
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import models
+from app.main import app
+from app.db import SessionLocal
+from app.busca import cache_busca
+from app.routers.auth import criar_token, cache_usuarios
+
+INICIO = datetime(2026, 3, 2, 8, 0)
+QUANTIDADE = 20
+
+
+def cabecalho(usuario: models.Usuario) -> dict:
+    """Authorization de um usuário já gravado (sem passar pelo login/bcrypt)."""
+    token = criar_token({"sub": usuario.email, "id": usuario.id, "tipo": usuario.tipo})
+    return {"Authorization": f"Bearer {token}"}
+
+
+_sequencia = itertools.count()
+
+
+def novo_usuario(tipo: str, nome: str = None) -> models.Usuario:
+    """Grava um usuário com e-mail único (para testes que não podem mexer na massa de `dados`)."""
+    n = next(_sequencia)
+    with SessionLocal() as db:
+        usuario = models.Usuario(nome=nome or f"{tipo.title()} Avulso {n}", email=f"{tipo}.avulso{n}@teste",
+                                 senha_hash="x", tipo=tipo)
+        db.add(usuario)
+        db.commit()
+        return usuario
+
+
+def nova_viagem(motorista: models.Usuario, horario_partida: datetime, vagas: int = 4, **campos) -> models.Viagem:
+    with SessionLocal() as db:
+        campos = {"origem": "Salvador", "destino": "Serrinha", "status": "agendada", **campos}
+        viagem = models.Viagem(horario_partida=horario_partida, vagas_disponiveis=vagas,
+                               motorista_id=motorista.id, **campos)
+        db.add(viagem)
+        db.commit()
+        return viagem
+
+
+def consultas(resposta) -> int:
+    """Nº de consultas SQL da requisição, lido do cabeçalho Server-Timing."""
+    return int(re.search(r'desc="(\d+) consultas"', resposta.headers["Server-Timing"]).group(1))
+
+
+@pytest.fixture(scope="session")
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def db():
+    sessao = SessionLocal()
+    try:
+        yield sessao
+    finally:
+        sessao.close()
+
+
+@pytest.fixture(scope="session")
+def dados():
+    """
+    Massa de dados das listagens: QUANTIDADE viagens de um motorista principal e
+    QUANTIDADE viagens de motoristas diferentes (cada uma reservada pelo mesmo
+    passageiro), para que um carregamento por linha (N+1) apareça na contagem.
+    """
+    with SessionLocal() as db:
+        def usuario(nome, tipo):
+            u = models.Usuario(nome=nome, email=f"{nome.lower().replace(' ', '.')}@teste", senha_hash="x", tipo=tipo)
+            db.add(u)
+            return u
+
+        motorista = usuario("Motorista Principal", "motorista")
+        passageiro = usuario("Passageiro Teste", "passageiro")
+        outros_passageiros = [usuario(f"Passageiro {i}", "passageiro") for i in range(3)]
+        outros_motoristas = [usuario(f"Motorista {i}", "motorista") for i in range(QUANTIDADE)]
+        db.flush()
+
+        for i in range(QUANTIDADE):
+            viagem = models.Viagem(
+                origem="Salvador", destino="Serrinha", horario_partida=INICIO + timedelta(hours=3 * i),
+                vagas_disponiveis=4, status="agendada", motorista_id=motorista.id,
+            )
+            db.add(viagem)
+            db.flush()
+            for p in outros_passageiros:
+                db.add(models.Reserva(viagem_id=viagem.id, passageiro_id=p.id, status="confirmada"))
+
+        for i, m in enumerate(outros_motoristas):
+            viagem = models.Viagem(
+                origem="Feira de Santana", destino="Salvador", horario_partida=INICIO + timedelta(hours=3 * i + 1),
+                vagas_disponiveis=3, status="agendada", motorista_id=m.id,
+            )
+            db.add(viagem)
+            db.flush()
+            db.add(models.Reserva(viagem_id=viagem.id, passageiro_id=passageiro.id, status="confirmada"))
+            db.add(models.TicketSuporte(usuario_id=passageiro.id, assunto=f"Assunto {i}", mensagem="Mensagem"))
+
+        db.commit()
+        return {"motorista": motorista, "passageiro": passageiro}
+
+
+@pytest.fixture(autouse=True)
+def caches_vazios():
+    """Cada teste começa sem respostas de busca nem usuários em cache."""
+    cache_busca.limpar()
+    cache_usuarios.limpar()
@@ -0,0 +1,68 @@
+from app import models
+from app.db import SessionLocal
+from app.routers.auth import emitir_refresh_token
+from tests.conftest import novo_usuario
+
+
+def _abrir_sessao(usuario: models.Usuario) -> str:
+    """Refresh token de um login novo (sem passar pelo bcrypt do /auth/login)."""
+    with SessionLocal() as db:
+        token = emitir_refresh_token(db, usuario.id)
+        db.commit()
+        return token
+
+
+def _renovar(client, refresh_token: str):
+    return client.post("/auth/refresh", data={"refresh_token": refresh_token})
+
+
+def _familia_revogada(db, usuario_id: int) -> bool:
+    tokens = db.query(models.RefreshToken).filter(models.RefreshToken.usuario_id == usuario_id).all()
+    return all(t.revogado_em is not None for t in tokens)
+
+
+# --------------------------------
+# Refresh token
+# --------------------------------
+def test_refresh_troca_o_token_por_um_novo(client):
+    usuario = novo_usuario("passageiro")
+    primeiro = _abrir_sessao(usuario)
+
+    resposta = _renovar(client, primeiro)
+    assert resposta.status_code == 200
+    corpo = resposta.json()
+    assert corpo["refresh_token"] != primeiro
+    me = client.get("/auth/me", headers={"Authorization": f"Bearer {corpo['access_token']}"})
+    assert me.json()["id"] == usuario.id
+
+    # O novo token também renova, e assim por diante
+    assert _renovar(client, corpo["refresh_token"]).status_code == 200
+
+
+def test_reusar_refresh_token_trocado_revoga_a_sessao_inteira(client, db):
+    usuario = novo_usuario("passageiro")
+    primeiro = _abrir_sessao(usuario)
+    segundo = _renovar(client, primeiro).json()["refresh_token"]
+
+    resposta = _renovar(client, primeiro)
+    assert resposta.status_code == 401
+    assert "reutilizado" in resposta.json()["detail"]
+
+    # O token legítimo mais recente também deixa de valer
+    assert _renovar(client, segundo).status_code == 401
+    assert _familia_revogada(db, usuario.id)
+
+
+def test_logout_invalida_o_refresh_token_e_preserva_outras_sessoes(client):
+    usuario = novo_usuario("passageiro")
+    celular = _renovar(client, _abrir_sessao(usuario)).json()["refresh_token"]
+    computador = _abrir_sessao(usuario)
+
+    assert client.post("/auth/logout", data={"refresh_token": celular}).status_code == 200
+
+    assert _renovar(client, celular).status_code == 401
+    assert _renovar(client, computador).status_code == 200
+
+
+def test_refresh_token_desconhecido_e_recusado(client):
+    assert _renovar(client, "token-que-nao-existe").status_code == 401
@@ -0,0 +1,56 @@
+from datetime import datetime
+
+from app import models
+from tests.conftest import cabecalho, consultas, nova_viagem, novo_usuario
+
+
+# --------------------------------
+# Cache do usuário autenticado
+# --------------------------------
+def test_me_mostra_os_dados_novos_depois_de_atualizar_o_usuario(client, db):
+    usuario = novo_usuario("passageiro", nome="Nome Antigo")
+    cabecalhos = cabecalho(usuario)
+    assert client.get("/auth/me", headers=cabecalhos).json()["nome"] == "Nome Antigo"
+    assert consultas(client.get("/auth/me", headers=cabecalhos)) == 0  # veio do cache
+
+    gravado = db.get(models.Usuario, usuario.id)
+    gravado.nome = "Nome Novo"
+    gravado.email = "nome.novo@teste"
+    db.commit()
+
+    resposta = client.get("/auth/me", headers=cabecalhos)
+    assert resposta.json()["nome"] == "Nome Novo"
+    assert resposta.json()["email"] == "nome.novo@teste"
+
+
+def test_me_recusa_token_de_usuario_excluido_mesmo_em_cache(client, db):
+    usuario = novo_usuario("passageiro")
+    cabecalhos = cabecalho(usuario)
+    assert client.get("/auth/me", headers=cabecalhos).status_code == 200
+
+    db.delete(db.get(models.Usuario, usuario.id))
+    db.commit()
+
+    assert client.get("/auth/me", headers=cabecalhos).status_code == 401
+
+
+# --------------------------------
+# Cache da busca de viagens
+# --------------------------------
+def _vagas_na_busca(client, origem: str) -> tuple:
+    resposta = client.get("/viagens/", params={"origem": origem})
+    assert resposta.status_code == 200
+    return resposta.json()["itens"][0]["vagas_disponiveis"], consultas(resposta)
+
+
+def test_busca_em_cache_mostra_as_vagas_depois_de_reservar_e_cancelar(client):
+    viagem = nova_viagem(novo_usuario("motorista"), datetime(2026, 6, 1, 8, 0), vagas=4, origem="Monte Santo")
+    passageiro = cabecalho(novo_usuario("passageiro"))
+    assert _vagas_na_busca(client, "Monte Santo") == (4, 1)
+    assert _vagas_na_busca(client, "Monte Santo") == (4, 0)  # veio do cache
+
+    reserva = client.post("/reservas/", params={"viagem_id": viagem.id}, headers=passageiro).json()["reserva"]
+    assert _vagas_na_busca(client, "Monte Santo")[0] == 3
+
+    client.put(f"/reservas/{reserva['id']}/cancelar", headers=passageiro)
+    assert _vagas_na_busca(client, "Monte Santo")[0] == 4
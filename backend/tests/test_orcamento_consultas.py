@@ -0,0 +1,48 @@
+import pytest
+
+from tests.conftest import QUANTIDADE, cabecalho, consultas
+
+# --------------------------------
+# Orçamento de consultas SQL por listagem
+# --------------------------------
+# Nº fixo de consultas por requisição, qualquer que seja o tamanho da página.
+# Endpoints autenticados gastam 1 consulta para carregar o usuário (cache vazio).
+# Se um teste falhar com mais consultas, provavelmente voltou um N+1
+# (relacionamento carregado linha a linha).
+ORCAMENTOS = [
+    # (rota, parâmetros, usuário, consultas)
+    ("/viagens/", {}, None, 1),
+    ("/viagens/", {"origem": "salvador"}, None, 1),
+    ("/viagens/", {"origem": "sa"}, None, 1),
+    ("/viagens/", {"motorista": "motorista"}, None, 1),
+    ("/viagens/calendario", {"inicio": "01/03/2026", "fim": "31/03/2026"}, None, 1),
+    ("/viagens/minhas", {}, "motorista", 3),   # usuário + viagens + reservas da página
+    ("/reservas/minhas", {}, "passageiro", 2),  # usuário + reservas com a viagem (JOIN)
+    ("/suporte/", {}, "passageiro", 2),
+    ("/motoristas/", {}, None, 1),
+    ("/passageiros/", {}, None, 1),
+    ("/sync/", {}, "passageiro", 5),            # usuário + uma consulta por lista
+]
+
+
+@pytest.mark.parametrize("rota, parametros, usuario, orcamento", ORCAMENTOS)
+def test_listagem_respeita_orcamento_de_consultas(client, dados, rota, parametros, usuario, orcamento):
+    cabecalhos = cabecalho(dados[usuario]) if usuario else {}
+    resposta = client.get(rota, params={"limite": QUANTIDADE, **parametros}, headers=cabecalhos)
+
+    assert resposta.status_code == 200
+    assert consultas(resposta) == orcamento
+
+
+@pytest.mark.parametrize("rota, usuario", [
+    ("/viagens/", None),
+    ("/viagens/minhas", "motorista"),
+    ("/reservas/minhas", "passageiro"),
+])
+def test_consultas_nao_crescem_com_a_pagina(client, dados, rota, usuario):
+    cabecalhos = cabecalho(dados[usuario]) if usuario else {}
+    pequena = client.get(rota, params={"limite": 2}, headers=cabecalhos)
+    grande = client.get(rota, params={"limite": QUANTIDADE}, headers=cabecalhos)
+
+    assert len(grande.json()["itens"]) == QUANTIDADE
+    assert consultas(grande) <= consultas(pequena)
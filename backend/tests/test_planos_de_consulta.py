@@ -0,0 +1,81 @@
+import re
+
+import pytest
+from sqlalchemy import event
+
+from app.db import async_engine, engine
+from tests.conftest import cabecalho
+
+# --------------------------------
+# Índices usados pelas listagens (EXPLAIN QUERY PLAN do SQLite)
+# --------------------------------
+# Roda o endpoint, captura o SQL realmente executado e pede o plano ao SQLite.
+# Cada caso lista expressões regulares que precisam aparecer no plano (índices esperados).
+PLANOS = [
+    # (rota, parâmetros, usuário, padrões esperados no plano)
+    ("/viagens/", {"origem": "sa"}, None, [
+        r"USING INDEX ix_viagens_origem_destino_horario \(origem_norm>\? AND origem_norm<\?\)",
+    ]),
+    ("/viagens/", {"origem": "salvador"}, None, [
+        r"SCAN viagens_busca VIRTUAL TABLE INDEX 0:M",
+        r"SEARCH viagens USING INTEGER PRIMARY KEY",
+    ]),
+    ("/viagens/", {"motorista": "principal"}, None, [
+        r"SCAN usuarios_busca VIRTUAL TABLE INDEX 0:M",
+        r"USING INDEX ix_viagens_motorista_horario \(motorista_id=\?\)",
+    ]),
+    ("/viagens/", {"data": "02/03/2026"}, None, [
+        r"USING INDEX ix_viagens_horario_partida \(horario_partida>\? AND horario_partida<\?\)",
+    ]),
+    ("/viagens/minhas", {}, "motorista", [
+        r"USING INDEX ix_viagens_motorista_horario \(motorista_id=\?\)",
+        r"USING INDEX ix_reservas_viagem_status \(viagem_id=\?\)",
+    ]),
+    # Os dois índices que começam por passageiro_id atendem igualmente; sem estatísticas
+    # (ANALYZE), o SQLite desempata pela ordem de criação, que varia entre execuções
+    ("/reservas/minhas", {}, "passageiro", [
+        r"SEARCH reservas USING INDEX ix_reservas_passageiro_(viagem|atualizado) \(passageiro_id=\?\)",
+    ]),
+    ("/suporte/", {}, "passageiro", [
+        r"USING INDEX ix_tickets_suporte_usuario_criado \(usuario_id=\?\)",
+    ]),
+]
+
+# Engine que executa as consultas das rotas (com DB_ASYNC, o síncrono por baixo do AsyncEngine)
+ENGINE_DAS_ROTAS = async_engine.sync_engine if async_engine is not None else engine
+
+# Varredura completa de uma tabela que cresce com o uso
+VARREDURAS = ("SCAN viagens", "SCAN reservas", "SCAN tickets_suporte", "SCAN usuarios")
+
+
+def _planos(client, rota, parametros, cabecalhos) -> str:
+    """Planos de todas as consultas executadas pela requisição, um passo por linha."""
+    executadas = []
+
+    def capturar(conn, cursor, sql, parametros_sql, context, executemany):
+        executadas.append((sql, parametros_sql))
+
+    event.listen(ENGINE_DAS_ROTAS, "before_cursor_execute", capturar)
+    try:
+        resposta = client.get(rota, params=parametros, headers=cabecalhos)
+    finally:
+        event.remove(ENGINE_DAS_ROTAS, "before_cursor_execute", capturar)
+    assert resposta.status_code == 200
+
+    passos = []
+    with engine.connect() as conexao:
+        for sql, parametros_sql in executadas:
+            passos += [linha[3] for linha in conexao.exec_driver_sql("EXPLAIN QUERY PLAN " + sql, parametros_sql)]
+    return "\n".join(passos)
+
+
+@pytest.mark.parametrize("rota, parametros, usuario, esperados", PLANOS)
+def test_listagem_usa_indices(client, dados, rota, parametros, usuario, esperados):
+    cabecalhos = cabecalho(dados[usuario]) if usuario else {}
+    plano = _planos(client, rota, parametros, cabecalhos)
+
+    for padrao in esperados:
+        assert re.search(padrao, plano), f"{padrao!r} não aparece no plano:\n{plano}"
+    # "SCAN viagens_busca ..." é a consulta ao índice FTS, não uma varredura da tabela
+    varreduras = [p for p in plano.splitlines() if p.startswith(VARREDURAS) and "VIRTUAL TABLE" not in p]
+    assert varreduras == []
@@ -0,0 +1,109 @@
+import asyncio
+from datetime import datetime
+
+import httpx
+
+from app import models
+from app.db import async_engine
+from app.main import app
+from tests.conftest import cabecalho, nova_viagem, novo_usuario
+
+VAGAS = 5
+TENTATIVAS = 60
+
+
+def _vagas_e_confirmadas(db, viagem_id: int) -> tuple:
+    vagas = db.query(models.Viagem.vagas_disponiveis).filter(models.Viagem.id == viagem_id).scalar()
+    confirmadas = (
+        db.query(models.Reserva)
+        .filter(models.Reserva.viagem_id == viagem_id, models.Reserva.status == "confirmada")
+        .count()
+    )
+    return vagas, confirmadas
+
+
+def _reservar_ao_mesmo_tempo(viagem_id: int, cabecalhos: list) -> list:
+    """
+    Um POST /reservas/ por cabeçalho, todos disparados juntos num mesmo event loop
+    (as rotas síncronas rodam no threadpool; com DB_ASYNC, no próprio loop).
+    Retorna os status HTTP.
+    """
+    async def disparar():
+        if async_engine is not None:
+            # A fila do pool async fica presa ao event loop em que esperou; este é um loop novo
+            await async_engine.dispose(close=False)
+        transporte = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://teste") as cliente:
+            respostas = await asyncio.gather(*[
+                cliente.post("/reservas/", params={"viagem_id": viagem_id}, headers=c) for c in cabecalhos
+            ])
+        return [r.status_code for r in respostas]
+
+    return asyncio.run(disparar())
+
+
+# --------------------------------
+# Concorrência na reserva
+# --------------------------------
+def test_reservas_simultaneas_nao_vendem_vagas_a_mais(db):
+    viagem = nova_viagem(novo_usuario("motorista"), datetime(2026, 5, 4, 8, 0), vagas=VAGAS)
+    cabecalhos = [cabecalho(novo_usuario("passageiro")) for _ in range(TENTATIVAS)]
+
+    status = _reservar_ao_mesmo_tempo(viagem.id, cabecalhos)
+
+    assert status.count(200) == VAGAS
+    assert status.count(400) == TENTATIVAS - VAGAS
+    assert _vagas_e_confirmadas(db, viagem.id) == (0, VAGAS)
+
+
+def test_mesmo_passageiro_reservando_ao_mesmo_tempo_fica_com_uma_reserva(db):
+    viagem = nova_viagem(novo_usuario("motorista"), datetime(2026, 5, 4, 8, 0), vagas=VAGAS)
+    passageiro = cabecalho(novo_usuario("passageiro"))
+
+    status = _reservar_ao_mesmo_tempo(viagem.id, [passageiro] * TENTATIVAS)
+
+    assert status.count(200) == 1
+    # a vaga pega pelas tentativas duplicadas volta no rollback
+    assert _vagas_e_confirmadas(db, viagem.id) == (VAGAS - 1, 1)
+
+
+# --------------------------------
+# Status alterado pelo motorista
+# --------------------------------
+def _reservar(client, viagem_id: int) -> int:
+    resposta = client.post("/reservas/", params={"viagem_id": viagem_id}, headers=cabecalho(novo_usuario("passageiro")))
+    assert resposta.status_code == 200
+    return resposta.json()["reserva"]["id"]
+
+
+def test_motorista_cancelar_devolve_a_vaga_uma_vez(client, db):
+    motorista = novo_usuario("motorista")
+    viagem = nova_viagem(motorista, datetime(2026, 5, 5, 8, 0), vagas=2)
+    reserva_id = _reservar(client, viagem.id)
+    _reservar(client, viagem.id)
+
+    for _ in range(2):
+        resposta = client.put(f"/reservas/{reserva_id}/status", params={"status": "cancelada"},
+                              headers=cabecalho(motorista))
+        assert resposta.status_code == 200
+
+    assert _vagas_e_confirmadas(db, viagem.id) == (1, 1)
+
+
+def test_motorista_reconfirmar_ocupa_vaga_e_recusa_viagem_lotada(client, db):
+    motorista = novo_usuario("motorista")
+    viagem = nova_viagem(motorista, datetime(2026, 5, 6, 8, 0), vagas=1)
+    reserva_id = _reservar(client, viagem.id)
+    url = f"/reservas/{reserva_id}/status"
+
+    assert client.put(url, params={"status": "cancelada"}, headers=cabecalho(motorista)).status_code == 200
+    assert client.put(url, params={"status": "confirmada"}, headers=cabecalho(motorista)).status_code == 200
+    assert _vagas_e_confirmadas(db, viagem.id) == (0, 1)
+
+    # outro passageiro pega a vaga liberada; reconfirmar a primeira reserva não cabe mais
+    assert client.put(url, params={"status": "cancelada"}, headers=cabecalho(motorista)).status_code == 200
+    _reservar(client, viagem.id)
+    resposta = client.put(url, params={"status": "confirmada"}, headers=cabecalho(motorista))
+
+    assert resposta.status_code == 400
+    assert _vagas_e_confirmadas(db, viagem.id) == (0, 1)
@@ -0,0 +1,58 @@
+from datetime import date, datetime
+
+import pytest
+from fastapi import HTTPException
+
+from app.utils import parse_datetime
+
+ANO_ATUAL = date.today().year
+
+
+# --------------------------------
+# parse_datetime
+# --------------------------------
+@pytest.mark.parametrize("texto, esperado", [
+    # DD/MM/YYYY HH:MM
+    ("18/08/2025 20:30", datetime(2025, 8, 18, 20, 30)),
+    ("1/8/2025 9:05", datetime(2025, 8, 1, 9, 5)),
+    # DD/MM/YYYY
+    ("18/08/2025", datetime(2025, 8, 18)),
+    ("1/8/2025", datetime(2025, 8, 1)),
+    # DD/MM - HH:MM (ano atual)
+    ("18/08 - 20:30", datetime(ANO_ATUAL, 8, 18, 20, 30)),
+    ("1/8 - 20:30", datetime(ANO_ATUAL, 8, 1, 20, 30)),
+    # DD/MM (ano atual)
+    ("18/08", datetime(ANO_ATUAL, 8, 18)),
+    ("1/8", datetime(ANO_ATUAL, 8, 1)),
+    # YYYY-MM-DDTHH:MM
+    ("2025-08-18T20:30", datetime(2025, 8, 18, 20, 30)),
+    ("2025-08-18 20:30", datetime(2025, 8, 18, 20, 30)),
+    # YYYY-MM-DD
+    ("2025-08-18", datetime(2025, 8, 18)),
+    ("2025-8-1", datetime(2025, 8, 1)),
+    # espaços nas pontas são ignorados
+    ("  18/08/2025  ", datetime(2025, 8, 18)),
+])
+def test_parse_datetime_formatos_aceitos(texto, esperado):
+    assert parse_datetime(texto) == esperado
+
+
+@pytest.mark.parametrize("texto", [
+    "31/02/2025",       # dia inexistente
+    "18/08/2025 25:00",  # hora inexistente
+    "2025-02-30",
+    "2025-8-1T10:00",
+    "18/08/25",
+    "amanhã",
+    "",
+])
+def test_parse_datetime_formato_invalido(texto):
+    with pytest.raises(HTTPException) as erro:
+        parse_datetime(texto)
+    assert erro.value.status_code == 400
+    assert "Exemplos aceitos" in erro.value.detail
+
+
+def test_parse_datetime_nao_texto():
+    with pytest.raises(HTTPException):
+        parse_datetime(None)
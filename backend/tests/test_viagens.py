@@ -0,0 +1,182 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import models
+from app.config import DURACAO_VIAGEM_PADRAO_MIN
+from app.notificacoes import drenar_pendentes
+from app.routers.viagens import _horarios_em_conflito
+from tests.conftest import cabecalho, nova_viagem, novo_usuario
+
+
+def _reservar(client, viagem_id: int, passageiro: models.Usuario) -> int:
+    resposta = client.post("/reservas/", params={"viagem_id": viagem_id}, headers=cabecalho(passageiro))
+    assert resposta.status_code == 200
+    return resposta.json()["reserva"]["id"]
+
+
+def _alterar_status(client, viagem_id: int, motorista: models.Usuario, status: str):
+    return client.put(f"/viagens/{viagem_id}/status", params={"status": status}, headers=cabecalho(motorista))
+
+
+# --------------------------------
+# Cancelamento em cascata
+# --------------------------------
+def test_cancelar_viagem_cancela_reservas_devolve_vagas_e_notifica(client, db):
+    motorista = novo_usuario("motorista")
+    viagem = nova_viagem(motorista, datetime(2026, 7, 1, 8, 0), vagas=4)
+    passageiros = [novo_usuario("passageiro") for _ in range(3)]
+    reservas = [_reservar(client, viagem.id, p) for p in passageiros]
+    # Uma reserva já cancelada pelo passageiro: não volta vaga nem recebe aviso de novo
+    client.put(f"/reservas/{reservas[0]}/cancelar", headers=cabecalho(passageiros[0]))
+
+    resposta = _alterar_status(client, viagem.id, motorista, "cancelada")
+
+    assert resposta.status_code == 200
+    assert resposta.json()["reservas_canceladas"] == 2
+    gravada = db.get(models.Viagem, viagem.id)
+    assert (gravada.status, gravada.vagas_disponiveis) == ("cancelada", 4)
+    status_reservas = db.query(models.Reserva.status).filter(models.Reserva.viagem_id == viagem.id)
+    assert {s for (s,) in status_reservas} == {"cancelada"}
+
+    notificacoes = db.query(models.Notificacao).filter(models.Notificacao.viagem_id == viagem.id).all()
+    assert sorted((n.usuario_id, n.reserva_id) for n in notificacoes) == [
+        (p.id, r) for p, r in zip(passageiros[1:], reservas[1:])
+    ]
+    assert all(n.tipo == "viagem_cancelada" and n.enviada_em is None for n in notificacoes)
+
+
+def test_cancelar_viagem_duas_vezes_nao_devolve_vagas_nem_notifica_de_novo(client, db):
+    motorista = novo_usuario("motorista")
+    viagem = nova_viagem(motorista, datetime(2026, 7, 2, 8, 0), vagas=2)
+    _reservar(client, viagem.id, novo_usuario("passageiro"))
+
+    assert _alterar_status(client, viagem.id, motorista, "cancelada").json()["reservas_canceladas"] == 1
+    assert _alterar_status(client, viagem.id, motorista, "cancelada").json()["reservas_canceladas"] == 0
+
+    assert db.get(models.Viagem, viagem.id).vagas_disponiveis == 2
+    assert db.query(models.Notificacao).filter(models.Notificacao.viagem_id == viagem.id).count() == 1
+
+
+def test_notificacoes_da_viagem_cancelada_saem_da_fila_ao_drenar(client, db):
+    motorista = novo_usuario("motorista")
+    viagem = nova_viagem(motorista, datetime(2026, 7, 3, 8, 0), vagas=2)
+    _reservar(client, viagem.id, novo_usuario("passageiro"))
+    _alterar_status(client, viagem.id, motorista, "cancelada")
+
+    while drenar_pendentes():
+        pass
+
+    notificacoes = db.query(models.Notificacao).filter(models.Notificacao.viagem_id == viagem.id).all()
+    assert len(notificacoes) == 1
+    assert notificacoes[0].enviada_em is not None
+
+
+# --------------------------------
+# Criação em lote
+# --------------------------------
+def _criar_lote(client, motorista: models.Usuario, **corpo):
+    corpo = {"origem": "Cansanção", "destino": "Queimadas", "vagas_disponiveis": 3, **corpo}
+    return client.post("/viagens/lote", json=corpo, headers=cabecalho(motorista))
+
+
+def _partidas(db, motorista: models.Usuario) -> list:
+    consulta = db.query(models.Viagem.horario_partida).filter(models.Viagem.motorista_id == motorista.id)
+    return [h for (h,) in consulta.order_by(models.Viagem.horario_partida)]
+
+
+def test_lote_com_recorrencia_cria_as_datas_dos_dias_da_semana(client, db):
+    motorista = novo_usuario("motorista")
+    # 01/06/2026 é uma segunda-feira; segundas e quartas às 06:30 por duas semanas
+    recorrencia = {"dias_semana": [0, 2], "hora": "06:30", "inicio": "01/06/2026", "fim": "14/06/2026"}
+
+    resposta = _criar_lote(client, motorista, recorrencia=recorrencia)
+
+    assert resposta.status_code == 200
+    assert resposta.json()["quantidade"] == 4
+    assert _partidas(db, motorista) == [
+        datetime(2026, 6, 1, 6, 30), datetime(2026, 6, 3, 6, 30),
+        datetime(2026, 6, 8, 6, 30), datetime(2026, 6, 10, 6, 30),
+    ]
+
+
+def test_viagens_criadas_em_lote_aparecem_na_busca(client):
+    motorista = novo_usuario("motorista", nome="Motorista Lote Busca")
+    horarios = ["15/06/2026 08:00", "2026-06-16T08:00"]
+    assert _criar_lote(client, motorista, horarios=horarios).status_code == 200
+
+    def buscar(**filtros):
+        resposta = client.get("/viagens/", params={"motorista": motorista.nome, **filtros})
+        return [v["horario_partida"] for v in resposta.json()["itens"]]
+
+    # Sem acento, por trecho e por data: as colunas normalizadas e o índice de trecho foram preenchidos
+    assert buscar(origem="cansancao", destino="Queimadas") == ["15/06 - 08:00", "16/06 - 08:00"]
+    assert buscar(origem="sanca", data="16/06/2026") == ["16/06 - 08:00"]
+
+
+def test_lote_com_conflito_nao_cria_nenhuma_viagem(client, db):
+    motorista = novo_usuario("motorista")
+    horarios = ["22/06/2026 08:00", "23/06/2026 08:00", "23/06/2026 09:00"]
+
+    resposta = _criar_lote(client, motorista, horarios=horarios)
+
+    assert resposta.status_code == 400
+    assert "Conflito de horário" in resposta.json()["detail"]
+    assert _partidas(db, motorista) == []
+
+
+# --------------------------------
+# Conflito de horário
+# --------------------------------
+DURACAO = timedelta(minutes=DURACAO_VIAGEM_PADRAO_MIN)
+MINUTO = timedelta(minutes=1)
+PARTIDA = datetime(2026, 8, 3, 10, 0)
+
+
+@pytest.mark.parametrize("deslocamento, conflita", [
+    (-DURACAO, False),           # termina exatamente quando a existente parte
+    (-DURACAO + MINUTO, True),
+    (timedelta(0), True),
+    (DURACAO - MINUTO, True),
+    (DURACAO, False),            # parte exatamente quando a existente termina
+])
+def test_conflito_nos_limites_da_duracao(db, deslocamento, conflita):
+    motorista = novo_usuario("motorista")
+    nova_viagem(motorista, PARTIDA)
+    horario = PARTIDA + deslocamento
+
+    assert _horarios_em_conflito(db, motorista.id, [horario]) == ([horario] if conflita else [])
+
+
+def test_horarios_encostados_na_mesma_lista_nao_conflitam(db):
+    motorista = novo_usuario("motorista")
+    encostados = [PARTIDA, PARTIDA + DURACAO, PARTIDA + 2 * DURACAO]
+    assert _horarios_em_conflito(db, motorista.id, encostados) == []
+
+    sobrepostos = [PARTIDA, PARTIDA + DURACAO - MINUTO]
+    assert _horarios_em_conflito(db, motorista.id, sobrepostos) == sobrepostos
+
+
+def test_viagem_cancelada_ou_de_outro_motorista_nao_conflita(db):
+    motorista = novo_usuario("motorista")
+    nova_viagem(motorista, PARTIDA, status="cancelada")
+    nova_viagem(novo_usuario("motorista"), PARTIDA)
+
+    assert _horarios_em_conflito(db, motorista.id, [PARTIDA]) == []
+
+
+def test_reativar_viagem_cujo_horario_foi_ocupado_e_recusado(client, db):
+    motorista = novo_usuario("motorista")
+    cancelada = nova_viagem(motorista, PARTIDA, status="cancelada")
+    ocupante = nova_viagem(motorista, PARTIDA + DURACAO - MINUTO)
+
+    resposta = _alterar_status(client, cancelada.id, motorista, "agendada")
+
+    assert resposta.status_code == 400
+    assert "Conflito de horário" in resposta.json()["detail"]
+    db.expire_all()
+    assert db.get(models.Viagem, cancelada.id).status == "cancelada"
+
+    # Liberado o horário, a reativação passa (a própria viagem não conta como conflito)
+    assert _alterar_status(client, ocupante.id, motorista, "cancelada").status_code == 200
+    assert _alterar_status(client, cancelada.id, motorista, "agendada").status_code == 200
@@ -1,6 +1,7 @@
 import React, { useState } from 'react';
 import { useNavigate, useLocation } from "react-router-dom";
 import './Agendamento.css';
+import { apiFetch } from "./api";
 
 function Agendamento() {
   const navigate = useNavigate();
@@ -47,12 +48,7 @@ function Agendamento() {
         vagas_disponiveis: vagas_disponiveis.toString()
       });
 
-      const res = await fetch(`http://127.0.0.1:8000/viagens/?${query.toString()}`, {
-        method: "POST",
-        headers: {
-          "Authorization": `Bearer ${token}`
-        }
-      });
+      const res = await apiFetch(`/viagens/?${query.toString()}`, { method: "POST" });
 
       if (res.ok) {
         alert("Viagem cadastrada com sucesso!");
@@ -9,6 +9,7 @@ import CalendarioMotorista from './CalendarioMotorista';
 import CalendarioPassageiro from './CalendarioPassageiro';
 import Suporte from './Suporte';
 import { parseJwt } from "./Login";
+import { API_URL } from "./api";
 
 function App() {
 
@@ -16,10 +17,29 @@ function App() {
   const [loggedIn, setLoggedIn] = useState(!!localStorage.getItem("token"));
 
   const handleLogout = () => {
+    const refreshToken = localStorage.getItem("refresh_token");
+    if (refreshToken) {
+      fetch(`${API_URL}/auth/logout`, {
+        method: "POST",
+        headers: { "Content-Type": "application/x-www-form-urlencoded" },
+        body: new URLSearchParams({ refresh_token: refreshToken }),
+      }).catch(() => {});
+    }
     localStorage.removeItem("token");
+    localStorage.removeItem("refresh_token");
     setLoggedIn(false);
   };
 
+  // Refresh token recusado pela API (apiFetch já apagou os tokens): volta para o login
+  useEffect(() => {
+    const aoEncerrarSessao = () => {
+      setLoggedIn(false);
+      if (window.location.pathname !== "/") window.location.assign("/");
+    };
+    window.addEventListener("sessao-encerrada", aoEncerrarSessao);
+    return () => window.removeEventListener("sessao-encerrada", aoEncerrarSessao);
+  }, []);
+
   const [tipo, setTipo] = useState(null);
 
   useEffect(() => {
@@ -9,7 +9,7 @@ export default function CalendarioMotorista({ setMostrarLista }) {
     const [ano, setAno] = useState(hoje.getFullYear());
     const [mes, setMes] = useState(hoje.getMonth());
     const [dataSelecionada, setDataSelecionada] = useState(null);
-    const [viagensNaData, setViagensNaData] = useState([]);
+    const [viagensDoMes, setViagensDoMes] = useState({});
     const [loading, setLoading] = useState(false);
 
     const diasSemana = ["Dom", "Seg", "Ter", "Qua", "Qui", "Sex", "Sáb"];
@@ -31,25 +31,36 @@ export default function CalendarioMotorista({ setMostrarLista }) {
         return `${String(dia).padStart(2, "0")}/${String(mes + 1).padStart(2, "0")}/${ano}`;
     };
 
-    // Busca viagens de um dia específico
-    const buscarViagens = async (dataBr) => {
-        try {
-            setLoading(true);
-            const resp = await fetch(`http://127.0.0.1:8000/viagens/?data=${encodeURIComponent(dataBr)}`);
-            if (!resp.ok) throw new Error("Erro ao buscar viagens");
-            const dados = await resp.json();
-            setViagensNaData(dados);
-        } catch (err) {
-            console.error(err);
-            setViagensNaData([]);
-        } finally {
-            setLoading(false);
-        }
-    };
+    // Busca as viagens do mês inteiro de uma vez (o clique no dia só filtra localmente)
+    useEffect(() => {
+        const buscarMes = async () => {
+            try {
+                setLoading(true);
+                const inicio = formatarDataBr(ano, mes, 1);
+                const fim = formatarDataBr(ano, mes, diasNoMes);
+                const resp = await fetch(
+                    `http://127.0.0.1:8000/viagens/calendario?inicio=${encodeURIComponent(inicio)}&fim=${encodeURIComponent(fim)}`
+                );
+                if (!resp.ok) throw new Error("Erro ao buscar viagens");
+                const { dias } = await resp.json();
+                setViagensDoMes(dias);
+            } catch (err) {
+                console.error(err);
+                setViagensDoMes({});
+            } finally {
+                setLoading(false);
+            }
+        };
+        buscarMes();
+    }, [ano, mes]);
+
+    // dd/mm/yyyy -> yyyy-mm-dd (chave dos dias na resposta do calendário)
+    const chaveDia = (dataBr) => dataBr.split("/").reverse().join("-");
+
+    const viagensNaData = dataSelecionada ? viagensDoMes[chaveDia(dataSelecionada)]?.viagens || [] : [];
 
     const handleDiaClick = (dataBr) => {
         setDataSelecionada(dataBr);
-        buscarViagens(dataBr);
 
         if (calendarioRef.current) {
             calendarioRef.current.scrollIntoView({ behavior: "smooth", block: "start" });
@@ -170,7 +181,7 @@ export default function CalendarioMotorista({ setMostrarLista }) {
                                 return (
                                     <li key={v.id} className={`trip ${isOwner ? "trip-owner" : ""}`}>
                                         <p className="item"><strong>🪪 Motorista:</strong> {isOwner ? <strong>Você</strong> : v.motorista.nome}</p>
-                                        <p className="item"><strong>🕒 Horário:</strong> {v.horario_partida.split(" - ")[1]}</p>
+                                        <p className="item"><strong>🕒 Horário:</strong> {v.hora}</p>
                                         <p className="item"><strong>🚗 Origem:</strong> {v.origem}</p>
                                         <p className="item"><strong>📍 Destino:</strong> {v.destino}</p>
                                         <p className="item"><strong>💺 Vagas disponíveis:</strong> {v.vagas_disponiveis}</p>
@@ -1,6 +1,7 @@
 import React, { useState, useEffect, useRef } from "react";
 import { useNavigate } from "react-router-dom";
 import "./CalendarioPassageiro.css";
+import { apiFetch } from "./api";
 
 export default function CalendarioPassageiro({ }) {
     const navigate = useNavigate();
@@ -9,9 +10,8 @@ export default function CalendarioPassageiro({ }) {
     const [ano, setAno] = useState(hoje.getFullYear());
     const [mes, setMes] = useState(hoje.getMonth());
     const [dataSelecionada, setDataSelecionada] = useState(null);
-    const [viagensNaData, setViagensNaData] = useState([]);
+    const [viagensDoMes, setViagensDoMes] = useState({});
     const [loading, setLoading] = useState(false);
-    const [motoristas, setMotoristas] = useState({});
 
     const diasSemana = ["Dom", "Seg", "Ter", "Qua", "Qui", "Sex", "Sáb"];
     const primeiroDiaDoMes = new Date(ano, mes, 1);
@@ -25,55 +25,52 @@ export default function CalendarioPassageiro({ }) {
         return `${String(dia).padStart(2, "0")}/${String(mes + 1).padStart(2, "0")}/${ano}`;
     };
 
-    const buscarViagens = async (dataBr) => {
-        try {
-            setLoading(true);
-            const resp = await fetch(`http://127.0.0.1:8000/viagens/?data=${encodeURIComponent(dataBr)}`);
-            if (!resp.ok) throw new Error("Erro ao buscar viagens");
-            const dados = await resp.json();
-            setViagensNaData(dados);
-
-            const idsMotoristas = [...new Set(dados.map(v => v.motorista_id))];
-            if (idsMotoristas.length > 0) {
-                await buscarMotoristas(idsMotoristas);
+    // Busca as viagens do mês inteiro de uma vez (o clique no dia só filtra localmente)
+    useEffect(() => {
+        const buscarMes = async () => {
+            try {
+                setLoading(true);
+                const inicio = formatarDataBr(ano, mes, 1);
+                const fim = formatarDataBr(ano, mes, diasNoMes);
+                const resp = await fetch(
+                    `http://127.0.0.1:8000/viagens/calendario?inicio=${encodeURIComponent(inicio)}&fim=${encodeURIComponent(fim)}`
+                );
+                if (!resp.ok) throw new Error("Erro ao buscar viagens");
+                const { dias } = await resp.json();
+                setViagensDoMes(dias);
+            } catch (err) {
+                console.error(err);
+                setViagensDoMes({});
+            } finally {
+                setLoading(false);
             }
-        } catch (err) {
-            console.error(err);
-            setViagensNaData([]);
-        } finally {
-            setLoading(false);
-        }
-    };
+        };
+        buscarMes();
+    }, [ano, mes]);
 
-    const buscarMotoristas = async (ids) => {
-        const nomes = {};
-        for (const id of ids) {
-            const resp = await fetch(`http://127.0.0.1:8000/motoristas/${id}/`);
-            if (resp.ok) {
-                const dados = await resp.json();
-                nomes[id] = dados.nome;
-            }
-        }
-        setMotoristas(prev => ({ ...prev, ...nomes }));
-    };
+    // dd/mm/yyyy -> yyyy-mm-dd (chave dos dias na resposta do calendário)
+    const chaveDia = (dataBr) => dataBr.split("/").reverse().join("-");
+
+    const viagensNaData = dataSelecionada ? viagensDoMes[chaveDia(dataSelecionada)]?.viagens || [] : [];
 
     const reservaViagem = async (viagemId) => {
         try {
-            const token = localStorage.getItem("token");
-            const res = await fetch(`http://127.0.0.1:8000/reservas/?viagem_id=${viagemId}`, {
-                method: "POST",
-                headers: { Authorization: `Bearer ${token}` }
-            });
+            const res = await apiFetch(`/reservas/?viagem_id=${viagemId}`, { method: "POST" });
 
             if (res.ok) {
                 alert("Reserva realizada com sucesso!");
-                setViagensNaData(prev =>
-                    prev.map(v =>
-                        v.id === viagemId
-                            ? { ...v, vagas_disponiveis: v.vagas_disponiveis - 1 }
-                            : v
-                    )
-                );
+                const chave = chaveDia(dataSelecionada);
+                setViagensDoMes(prev => ({
+                    ...prev,
+                    [chave]: {
+                        ...prev[chave],
+                        viagens: prev[chave].viagens.map(v =>
+                            v.id === viagemId
+                                ? { ...v, vagas_disponiveis: v.vagas_disponiveis - 1 }
+                                : v
+                        ),
+                    },
+                }));
             } else {
                 const error = await res.json();
                 alert("Erro na reserva: " + JSON.stringify(error));
@@ -85,7 +82,6 @@ export default function CalendarioPassageiro({ }) {
 
     const handleDiaClick = (dataBr) => {
         setDataSelecionada(dataBr);
-        buscarViagens(dataBr);
 
         if (calendarioRef.current) {
             calendarioRef.current.scrollIntoView({ behavior: "smooth", block: "start" });
@@ -191,7 +187,7 @@ export default function CalendarioPassageiro({ }) {
                         <ul className="viagens-list">
                             {viagensNaData.map((v) => (
                                 <li key={v.id} className="trip-item">
-                                    <p className="item"><strong>🕒 Horário:</strong> {v.horario_partida.split(" - ")[1]}</p>
+                                    <p className="item"><strong>🕒 Horário:</strong> {v.hora}</p>
                                     <p className="item"><strong>🚗 Origem:</strong> {v.origem}</p>
                                     <p className="item"><strong>📍 Destino:</strong> {v.destino}</p>
                                     <p className="item"><strong>🪪 Motorista:</strong> {v.motorista?.nome}</p>
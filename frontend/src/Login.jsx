@@ -32,6 +32,7 @@ function Login() {
       if (res.ok) {
         const json = await res.json();
         localStorage.setItem("token", json.access_token);
+        localStorage.setItem("refresh_token", json.refresh_token);
         const token = localStorage.getItem("token");
         const payload = parseJwt(token);
         payload.tipo === "passageiro" 
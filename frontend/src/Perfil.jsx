@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { useNavigate } from "react-router-dom";
 import './Perfil.css';
 import { parseJwt } from "./Login";
+import { apiFetch, apiFetchTodos } from "./api";
 
 function Perfil({ onLogout, mostrarLista, setMostrarLista }) {
   const navigate = useNavigate();
@@ -13,46 +14,38 @@ function Perfil({ onLogout, mostrarLista, setMostrarLista }) {
   const [reservas, setReservas] = useState([]);
   const [rating, setRating] = useState(0);
 
-  // Pega informações do usuário logado
+  // Pega informações do usuário logado (o token já traz id, e-mail e tipo)
   useEffect(() => {
     const token = localStorage.getItem("token");
     if (!token) return;
 
     const payload = parseJwt(token);
+    if (!payload) return;
     setEmail(payload.sub);
     setTipo(payload.tipo);
+    if (payload.tipo === "motorista") setMotoristaId(payload.id);
   }, []);
 
-  // Busca nome e ID do usuário
+  // Busca o nome do usuário
   useEffect(() => {
-    if (!email || !tipo) return;
+    if (!email) return;
     const token = localStorage.getItem("token");
     if (!token) return;
 
     const fetchUsuario = async () => {
       try {
-        const endpoint = tipo === "motorista"
-          ? `http://127.0.0.1:8000/motoristas`
-          : `http://127.0.0.1:8000/passageiros`;
-
-        const res = await fetch(endpoint, {
-          headers: { Authorization: `Bearer ${token}` }
-        });
+        const res = await apiFetch("/auth/me");
         if (!res.ok) return;
 
-        const data = await res.json();
-        const usuario = data.find(u => u.email === email);
-        if (usuario) {
-          setNome(usuario.nome);
-          if (tipo === "motorista") setMotoristaId(usuario.id);
-        }
+        const usuario = await res.json();
+        setNome(usuario.nome);
       } catch (error) {
         console.error("Erro ao buscar usuário:", error);
       }
     };
 
     fetchUsuario();
-  }, [email, tipo]);
+  }, [email]);
 
   // Busca viagens (motorista ou todas para passageiro)
   useEffect(() => {
@@ -68,13 +61,7 @@ function Perfil({ onLogout, mostrarLista, setMostrarLista }) {
     if (!token) return;
 
     try {
-      const res = await fetch(`http://127.0.0.1:8000/viagens`, {
-        headers: { Authorization: `Bearer ${token}` }
-      });
-      if (!res.ok) return;
-
-      const data = await res.json();
-      const minhasViagens = data.filter(v => v.motorista.id === motoristaId);
+      const minhasViagens = await apiFetchTodos("/viagens/minhas");
       setViagens(minhasViagens);
     } catch (error) {
       console.error("Erro ao buscar viagens:", error);
@@ -86,12 +73,7 @@ function Perfil({ onLogout, mostrarLista, setMostrarLista }) {
     if (!token) return;
 
     try {
-      const res = await fetch(`http://127.0.0.1:8000/viagens`, {
-        headers: { Authorization: `Bearer ${token}` }
-      });
-      if (!res.ok) return;
-
-      const data = await res.json();
+      const data = await apiFetchTodos("/viagens/");
       setViagens(data);
     } catch (error) {
       console.error("Erro ao buscar viagens:", error);
@@ -104,12 +86,7 @@ function Perfil({ onLogout, mostrarLista, setMostrarLista }) {
     if (!token) return;
 
     try {
-      const res = await fetch(`http://127.0.0.1:8000/reservas/minhas`, {
-        headers: { Authorization: `Bearer ${token}` }
-      });
-      if (!res.ok) return;
-
-      const data = await res.json();
+      const data = await apiFetchTodos("/reservas/minhas");
       setReservas(data);
     } catch (error) {
       console.error("Erro ao buscar reservas:", error);
@@ -136,9 +113,9 @@ function Perfil({ onLogout, mostrarLista, setMostrarLista }) {
     if (!token) return alert("Usuário não autenticado");
 
     try {
-      const res = await fetch(
-        `http://127.0.0.1:8000/viagens/${id}/status?status=${encodeURIComponent(novoStatus)}`,
-        { method: "PUT", headers: { Authorization: `Bearer ${token}` } }
+      const res = await apiFetch(
+        `/viagens/${id}/status?status=${encodeURIComponent(novoStatus)}`,
+        { method: "PUT" }
       );
 
       if (res.ok) {
@@ -158,10 +135,7 @@ function Perfil({ onLogout, mostrarLista, setMostrarLista }) {
     if (!token) return alert("Usuário não autenticado");
 
     try {
-      const res = await fetch(`http://127.0.0.1:8000/reservas/${id}/cancelar`, {
-        method: "PUT",
-        headers: { Authorization: `Bearer ${token}` }
-      });
+      const res = await apiFetch(`/reservas/${id}/cancelar`, { method: "PUT" });
 
       if (res.ok) {
         setReservas(prev => prev.filter(r => r.reserva_id !== id));
@@ -1,6 +1,7 @@
 import React, { useState, useRef, useEffect } from "react";
 import { useNavigate } from "react-router-dom";
 import './Perfil.css'; // reutilizando o CSS atual
+import { apiFetch, apiFetchTodos } from "./api";
 
 function Suporte({ onLogout }) {
   const navigate = useNavigate();
@@ -27,13 +28,7 @@ function Suporte({ onLogout }) {
       const token = localStorage.getItem("token");
       if (!token) return;
 
-      const res = await fetch(`http://127.0.0.1:8000/suporte/?usuario_id=${usuarioId}`, {
-        headers: { "Authorization": `Bearer ${token}` }
-      });
-
-      if (!res.ok) throw new Error("Erro ao buscar chamados");
-
-      const dados = await res.json();
+      const dados = await apiFetchTodos(`/suporte/?usuario_id=${usuarioId}`);
       setChamados(dados);
     } catch (err) {
       console.error(err);
@@ -57,14 +52,9 @@ function Suporte({ onLogout }) {
       const token = localStorage.getItem("token");
       if (!token) return alert("Usuário não autenticado");
 
-      const url = `http://127.0.0.1:8000/suporte/?assunto=${encodeURIComponent(assunto)}&mensagem=${encodeURIComponent(mensagem)}`;
+      const url = `/suporte/?assunto=${encodeURIComponent(assunto)}&mensagem=${encodeURIComponent(mensagem)}`;
 
-      const res = await fetch(url, {
-        method: "POST",
-        headers: {
-          "Authorization": `Bearer ${token}`
-        }
-      });
+      const res = await apiFetch(url, { method: "POST" });
 
       if (res.ok) {
         alert("Chamado enviado com sucesso!");
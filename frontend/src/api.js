@@ -0,0 +1,81 @@
+// Requisições autenticadas à API, renovando o token de acesso quando ele expira.
+export const API_URL = "http://127.0.0.1:8000";
+
+// Renovação em andamento: o refresh token só pode ser usado uma vez (reusar revoga
+// a sessão), então requisições que recebem 401 ao mesmo tempo esperam a mesma renovação.
+let renovacao = null;
+
+// Resolve true (tokens renovados), false (servidor recusou) ou null (falha de rede)
+const renovarToken = () => {
+  if (!renovacao) {
+    renovacao = (async () => {
+      const refreshToken = localStorage.getItem("refresh_token");
+      try {
+        const res = await fetch(`${API_URL}/auth/refresh`, {
+          method: "POST",
+          headers: { "Content-Type": "application/x-www-form-urlencoded" },
+          body: new URLSearchParams({ refresh_token: refreshToken }),
+        });
+        if (!res.ok) return false;
+
+        const json = await res.json();
+        localStorage.setItem("token", json.access_token);
+        localStorage.setItem("refresh_token", json.refresh_token);
+        return true;
+      } catch (err) {
+        return null;
+      } finally {
+        renovacao = null;
+      }
+    })();
+  }
+  return renovacao;
+};
+
+// Apaga os tokens e avisa o App (evento "sessao-encerrada") para voltar ao login
+const encerrarSessao = () => {
+  localStorage.removeItem("token");
+  localStorage.removeItem("refresh_token");
+  window.dispatchEvent(new Event("sessao-encerrada"));
+};
+
+// fetch com `Authorization: Bearer`. Em 401, renova o token uma vez e repete a
+// requisição; se o servidor recusar a renovação, encerra a sessão.
+export const apiFetch = async (caminho, opcoes = {}) => {
+  const enviar = () => {
+    const token = localStorage.getItem("token");
+    const headers = { ...opcoes.headers };
+    if (token) headers.Authorization = `Bearer ${token}`;
+    return fetch(`${API_URL}${caminho}`, { ...opcoes, headers });
+  };
+
+  const res = await enviar();
+  if (res.status !== 401 || !localStorage.getItem("refresh_token")) return res;
+
+  const renovado = await renovarToken();
+  if (renovado) return enviar();
+  if (renovado === false) encerrarSessao();
+  return res;
+};
+
+// Listagens paginadas: segue `next_cursor` até a última página e devolve todos os
+// itens. Páginas do tamanho máximo aceito pelo servidor, para fazer menos requisições.
+const LIMITE_PAGINA = 200;
+
+export const apiFetchTodos = async (caminho, opcoes = {}) => {
+  const itens = [];
+  let cursor = null;
+  do {
+    const params = new URLSearchParams({ limite: LIMITE_PAGINA });
+    if (cursor) params.set("cursor", cursor);
+    const separador = caminho.includes("?") ? "&" : "?";
+
+    const res = await apiFetch(`${caminho}${separador}${params}`, opcoes);
+    if (!res.ok) throw new Error(`Erro ao buscar ${caminho} (HTTP ${res.status})`);
+
+    const pagina = await res.json();
+    itens.push(...pagina.itens);
+    cursor = pagina.next_cursor;
+  } while (cursor);
+  return itens;
+};